@@ -1 +1,9 @@
 from django.contrib import admin
+
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "project", "status", "progress", "created_by", "created_at")
+    list_filter = ("kind", "status")
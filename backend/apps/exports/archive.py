@@ -0,0 +1,125 @@
+"""Multi-project export archives.
+
+Through the API an archive is an export job that stores the zip like any
+other artifact. On the "process" job backend the job renders its projects
+in parallel on a pool of its own; Celery's prefork workers are daemonic and
+can't start processes, so there it renders them one after another.
+``manage.py export_projects`` streams the same archive, always in parallel.
+"""
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import as_completed
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import get_valid_filename
+
+from apps.projects.models import Project
+
+from .pool import make_pool
+from .reports import PDF_CONTENT_TYPE, _noop_progress, build_artifact, pdf_cache_key
+
+ARCHIVE_KINDS = ("excel", "pdf")
+ZIP_CONTENT_TYPE = "application/zip"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that hands out what was written so far.
+
+    ``zipfile`` falls back to data descriptors on unseekable streams, which
+    lets the archive be produced incrementally.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def render_project_files(project_id, kinds):
+    """Render every requested export of one project as ``[(arcname, content), ...]``.
+
+    Runs inside pool workers, so it takes and returns plain picklable values.
+    """
+    project = Project.objects.get(pk=project_id)
+    folder = get_valid_filename(f"{project.pk}-{project.name}")
+    files = []
+    for kind in kinds:
+        if kind == "pdf" and (cached := cache.get(pdf_cache_key(project))) is not None:
+            content, content_type = cached
+            extension = "pdf" if content_type == PDF_CONTENT_TYPE else "html"
+            filename = f"{project.name}.{extension}"
+        else:
+            content, _, filename = build_artifact(kind, project)
+        files.append((f"{folder}/{get_valid_filename(filename)}", content))
+    return files
+
+
+def _rendered_projects(project_ids, kinds, workers):
+    if workers <= 1:
+        for project_id in project_ids:
+            yield render_project_files(project_id, kinds)
+        return
+
+    pool = make_pool(workers)
+    try:
+        futures = [pool.submit(render_project_files, project_id, kinds) for project_id in project_ids]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_archive(project_ids, kinds=ARCHIVE_KINDS, workers=None):
+    """Yield a zip archive of the given projects' exports chunk by chunk.
+
+    Projects are rendered in parallel and written to the archive in the
+    order they finish, so the first bytes go out as soon as the fastest
+    project is done.
+    """
+    workers = settings.EXPORT_JOB_WORKERS if workers is None else workers
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for files in _rendered_projects(list(project_ids), kinds, workers):
+            for arcname, content in files:
+                archive.writestr(arcname, content)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def archive_options(project_ids, kinds):
+    """Export job options for an archive; equal options mean an equal archive."""
+    revisions = dict(Project.objects.filter(pk__in=project_ids).values_list("pk", "revision"))
+    return {
+        "projects": sorted(revisions),
+        "formats": [kind for kind in ARCHIVE_KINDS if kind in kinds],
+        "revisions": {str(pk): revision for pk, revision in sorted(revisions.items())},
+    }
+
+
+def archive_job_workers():
+    """Processes an archive job running in this process may render projects on."""
+    if settings.EXPORT_JOB_BACKEND != "process" or multiprocessing.current_process().daemon:
+        return 1
+    return settings.EXPORT_JOB_WORKERS
+
+
+def build_archive(project_ids, kinds, progress=_noop_progress, workers=1):
+    """The archive as ``(content, content_type, filename)``."""
+    chunks = []
+    for done, chunk in enumerate(iter_archive(project_ids, kinds, workers=workers), start=1):
+        chunks.append(chunk)
+        progress(min(99, 100 * done // max(len(project_ids), 1)))
+    return b"".join(chunks), ZIP_CONTENT_TYPE, f"ripenet-projects-{date.today()}.zip"
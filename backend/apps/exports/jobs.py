@@ -0,0 +1,132 @@
+"""Export job lifecycle: deduplication, dispatch and execution."""
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.projects.models import Project
+
+from .archive import archive_job_workers, archive_options, build_archive
+from .models import ExportJob
+from .reports import build_artifact
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (ExportJob.Status.PENDING, ExportJob.Status.RUNNING)
+
+
+def fail_stale_jobs(kind):
+    """Mark ``kind`` jobs queued or running for longer than EXPORT_JOB_STALE_AFTER as failed.
+
+    A job whose worker died never leaves RUNNING; without this it would be
+    handed out forever and block every new job it deduplicates with.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER)
+    return (
+        ExportJob.objects.filter(kind=kind, status__in=ACTIVE_STATUSES)
+        .alias(active_since=Coalesce("started_at", "created_at"))
+        .filter(active_since__lt=cutoff)
+        .update(status=ExportJob.Status.FAILED, error="Export job timed out.", finished_at=timezone.now())
+    )
+
+
+def find_reusable_job(kind, project, options=None):
+    """Return a queued, running or finished job that already covers this request.
+
+    Finished jobs only count while their artifact is still on disk and the
+    project has not changed since it was built; archives match on their
+    options, which carry the revision of every project in them. Backups span
+    every project, so only in-flight backup jobs are reused. Jobs in flight
+    for longer than EXPORT_JOB_STALE_AFTER are failed first, never reused.
+    """
+    fail_stale_jobs(kind)
+    if kind == ExportJob.Kind.ARCHIVE:
+        jobs = ExportJob.objects.filter(
+            kind=kind, options=options, status__in=(*ACTIVE_STATUSES, ExportJob.Status.DONE),
+        )
+    elif project is None:
+        return ExportJob.objects.filter(kind=kind, project=None, status__in=ACTIVE_STATUSES).first()
+    else:
+        jobs = ExportJob.objects.filter(
+            kind=kind, project=project, revision=project.revision,
+            status__in=(*ACTIVE_STATUSES, ExportJob.Status.DONE),
+        )
+    for job in jobs:
+        if job.status != ExportJob.Status.DONE or job.artifact_path.exists():
+            return job
+    return None
+
+
+def create_export_job(kind, project=None, user=None, options=None):
+    """Return ``(job, created)``, reusing an equivalent job where possible.
+
+    Archives take ``options`` from ``archive_options``.
+    """
+    with transaction.atomic():
+        if project is not None:
+            # Serialize concurrent requests for the same project so they dedupe
+            project = Project.objects.select_for_update().get(pk=project.pk)
+        job = find_reusable_job(kind, project, options)
+        if job is not None:
+            return job, False
+        job = ExportJob.objects.create(
+            kind=kind, project=project, created_by=user, options=options or {},
+            revision=project.revision if project else None,
+        )
+    dispatch_export_job(job)
+    return job, True
+
+
+def dispatch_export_job(job):
+    backend = settings.EXPORT_JOB_BACKEND
+    if backend == "inline":
+        run_export_job(job.pk)
+    elif backend == "process":
+        from .pool import get_shared_pool
+
+        transaction.on_commit(lambda: get_shared_pool().submit(run_export_job, job.pk))
+    else:
+        from .tasks import run_export_job as task
+
+        transaction.on_commit(lambda: task.delay(job.pk))
+
+
+def run_export_job(job_id):
+    """Build the artifact for a job and store it under EXPORT_ROOT."""
+    job = ExportJob.objects.select_related("project").get(pk=job_id)
+    jobs = ExportJob.objects.filter(pk=job.pk)
+    jobs.update(
+        status=ExportJob.Status.RUNNING, started_at=timezone.now(), progress=0,
+        revision=job.project.revision if job.project else None,
+    )
+
+    def progress(percent):
+        jobs.update(progress=percent)
+
+    try:
+        if job.kind == ExportJob.Kind.ARCHIVE:
+            # Record what actually goes in, so the job is reused only while that is current
+            options = archive_options(job.options["projects"], job.options["formats"])
+            jobs.update(options=options)
+            content, content_type, filename = build_archive(
+                options["projects"], options["formats"], progress, workers=archive_job_workers(),
+            )
+        else:
+            content, content_type, filename = build_artifact(job.kind, job.project, progress)
+        artifact = f"{job.pk}{Path(filename).suffix}"
+        settings.EXPORT_ROOT.mkdir(parents=True, exist_ok=True)
+        (settings.EXPORT_ROOT / artifact).write_bytes(content)
+    except Exception as e:
+        logger.exception("Export job %s failed", job.pk)
+        jobs.update(status=ExportJob.Status.FAILED, error=str(e), finished_at=timezone.now())
+        return
+
+    jobs.update(
+        status=ExportJob.Status.DONE, progress=100,
+        artifact=artifact, filename=filename, content_type=content_type, size=len(content),
+        finished_at=timezone.now(),
+    )
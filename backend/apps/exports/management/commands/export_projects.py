@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.exports.archive import ARCHIVE_KINDS, iter_archive
+from apps.projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Export Excel/PDF documentation for many projects into one zip archive, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int, help="Projects to export (default: all)")
+        parser.add_argument("-o", "--output", required=True, help="Path of the zip archive to write")
+        parser.add_argument(
+            "-f", "--format", dest="formats", action="append", choices=ARCHIVE_KINDS,
+            help="Export format; repeat for several (default: excel and pdf)",
+        )
+        parser.add_argument(
+            "-w", "--workers", type=int, default=settings.EXPORT_JOB_WORKERS,
+            help="Worker processes (default: EXPORT_JOB_WORKERS)",
+        )
+
+    def handle(self, *args, **options):
+        project_ids = options["project_ids"] or list(Project.objects.values_list("pk", flat=True))
+        missing = set(project_ids) - set(Project.objects.filter(pk__in=project_ids).values_list("pk", flat=True))
+        if missing:
+            raise CommandError(f"Unknown project id(s): {', '.join(map(str, sorted(missing)))}")
+
+        kinds = options["formats"] or ARCHIVE_KINDS
+        with open(options["output"], "wb") as f:
+            for chunk in iter_archive(project_ids, kinds, workers=options["workers"]):
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(project_ids)} project(s) to {options['output']}"
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0006_project_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('excel', 'Excel workbook'), ('pdf', 'PDF report'), ('backup', 'Data backup')], max_length=20)),
+                ('revision', models.PositiveBigIntegerField(blank=True, help_text='Project revision the artifact was built from', null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent complete')),
+                ('artifact', models.CharField(blank=True, help_text='Path relative to EXPORT_ROOT', max_length=255)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='projects.project')),
+            ],
+            options={
+                'db_table': 'exports_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'project', 'revision'], name='exports_job_kind_5a67f8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='options',
+            field=models.JSONField(blank=True, default=dict, help_text='Archives: project ids, formats and the revisions they were built from'),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='kind',
+            field=models.CharField(choices=[('excel', 'Excel workbook'), ('pdf', 'PDF report'), ('backup', 'Data backup'), ('archive', 'Multi-project archive')], max_length=20),
+        ),
+    ]
@@ -1 +1,62 @@
+from django.conf import settings
 from django.db import models
+
+
+class ExportJob(models.Model):
+    class Kind(models.TextChoices):
+        EXCEL = "excel", "Excel workbook"
+        PDF = "pdf", "PDF report"
+        BACKUP = "backup", "Data backup"
+        ARCHIVE = "archive", "Multi-project archive"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    project = models.ForeignKey(
+        "projects.Project", on_delete=models.CASCADE, related_name="export_jobs",
+        null=True, blank=True,
+    )
+    revision = models.PositiveBigIntegerField(
+        null=True, blank=True, help_text="Project revision the artifact was built from",
+    )
+    options = models.JSONField(
+        default=dict, blank=True, help_text="Archives: project ids, formats and the revisions they were built from",
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete")
+    artifact = models.CharField(max_length=255, blank=True, help_text="Path relative to EXPORT_ROOT")
+    filename = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="export_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "exports_job"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["kind", "project", "revision"])]
+
+    def __str__(self):
+        if self.project_id:
+            target = self.project.name
+        elif self.kind == self.Kind.ARCHIVE:
+            target = f"{len(self.options.get('projects', []))} projects"
+        else:
+            target = "all data"
+        return f"{self.get_kind_display()} of {target} ({self.status})"
+
+    @property
+    def artifact_path(self):
+        return settings.EXPORT_ROOT / self.artifact if self.artifact else None
@@ -0,0 +1,33 @@
+"""Local process pool for CPU-bound export work.
+
+Workers are spawned rather than forked so they never inherit the parent's
+open database connections; each one sets Django up when it starts.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+_shared_pool = None
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def make_pool(max_workers=None):
+    return ProcessPoolExecutor(
+        max_workers=max_workers or settings.EXPORT_JOB_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+
+
+def get_shared_pool():
+    """Pool reused by every export job dispatched from this process."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = make_pool()
+    return _shared_pool
@@ -0,0 +1,191 @@
+"""Project report rendering shared by the export views and background tasks."""
+import io
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.loader import render_to_string
+
+from apps.ipam.device_types import registry as device_types
+from apps.ipam.models import VLAN, Host, Subnet, Tunnel
+from apps.projects.cache import single_flight
+
+PDF_CONTENT_TYPE = "application/pdf"
+HTML_CONTENT_TYPE = "text/html"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+JSON_CONTENT_TYPE = "application/json"
+BACKUP_APPS = ("projects", "ipam", "accounts", "audit")
+# How long a queued render blocks re-queueing, in case the worker dies mid-job
+PDF_PENDING_TIMEOUT = 60 * 10
+
+
+def pdf_cache_key(project):
+    return f"exports:project-pdf:{project.pk}:{project.revision}"
+
+
+def pdf_pending_key(project):
+    return f"{pdf_cache_key(project)}:pending"
+
+
+def project_report_context(project):
+    """Load everything the report needs in a fixed number of queries.
+
+    One query each for sites, VLANs, subnets and hosts, regardless of how many
+    sites the project has; rows are then grouped in memory.
+    """
+    hosts_by_subnet = defaultdict(list)
+    for host in Host.objects.filter(project=project).values(
+        "subnet_id", "ip_address", "hostname", "device_type",
+    ):
+        hosts_by_subnet[host["subnet_id"]].append(host)
+
+    subnets_by_vlan = defaultdict(list)
+    standalone_by_site = defaultdict(list)
+    for subnet in Subnet.objects.filter(project=project).values("id", "site_id", "vlan_id", "network"):
+        subnet["hosts"] = hosts_by_subnet.get(subnet["id"], [])
+        if subnet["vlan_id"]:
+            subnets_by_vlan[subnet["vlan_id"]].append(subnet)
+        else:
+            standalone_by_site[subnet["site_id"]].append(subnet)
+
+    vlans_by_site = defaultdict(list)
+    for vlan in VLAN.objects.filter(site__project=project).values("id", "site_id", "vlan_id", "name"):
+        vlan["subnets"] = subnets_by_vlan.get(vlan["id"], [])
+        vlans_by_site[vlan["site_id"]].append(vlan)
+
+    sites = [
+        {
+            "name": site["name"],
+            "address": site["address"],
+            "vlans": vlans_by_site.get(site["id"], []),
+            "standalone_subnets": standalone_by_site.get(site["id"], []),
+        }
+        for site in project.sites.values("id", "name", "address")
+    ]
+    return {"project": project, "sites": sites}
+
+
+def _noop_progress(percent):
+    pass
+
+
+def render_project_pdf(project, progress=_noop_progress):
+    """Render the project report, returning ``(content, content_type)``.
+
+    Falls back to the HTML source when WeasyPrint (or its system libraries)
+    is unavailable.
+    """
+    context = project_report_context(project)
+    progress(30)
+    html = render_to_string("exports/project_report.html", context)
+    progress(50)
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError):
+        return html.encode("utf-8"), HTML_CONTENT_TYPE
+    return HTML(string=html).write_pdf(), PDF_CONTENT_TYPE
+
+
+def build_project_workbook(project, progress=_noop_progress):
+    """Build the project's Excel workbook and return it as bytes."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+
+    # Sites sheet
+    ws = wb.active
+    ws.title = "Sites"
+    ws.append(["Name", "Address", "Latitude", "Longitude"])
+    for site in project.sites.all():
+        ws.append([site.name, site.address, str(site.latitude or ""), str(site.longitude or "")])
+    progress(10)
+
+    # VLANs sheet
+    ws2 = wb.create_sheet("VLANs")
+    ws2.append(["Site", "VLAN ID", "Name", "Purpose"])
+    for vlan in VLAN.objects.filter(site__project=project).select_related("site"):
+        ws2.append([vlan.site.name, vlan.vlan_id, vlan.name, vlan.purpose])
+    progress(20)
+
+    # Subnets sheet
+    ws3 = wb.create_sheet("Subnets")
+    ws3.append(["Site", "VLAN", "Network", "Gateway", "Description"])
+    for subnet in Subnet.objects.filter(project=project).select_related("site", "vlan"):
+        site_name = subnet.site.name
+        vlan_label = f"VLAN {subnet.vlan.vlan_id}" if subnet.vlan else "(standalone)"
+        ws3.append([
+            site_name, vlan_label,
+            str(subnet.network), str(subnet.gateway or ""), subnet.description,
+        ])
+    progress(35)
+
+    # Hosts sheet
+    ws4 = wb.create_sheet("Hosts")
+    ws4.append(["Site", "VLAN", "Subnet", "IP", "Hostname", "MAC", "Device Type"])
+    for host in Host.objects.filter(
+        project=project
+    ).select_related("subnet__site", "subnet__vlan"):
+        site_name = host.subnet.site.name
+        vlan_label = f"VLAN {host.subnet.vlan.vlan_id}" if host.subnet.vlan else "(standalone)"
+        ws4.append([
+            site_name,
+            vlan_label,
+            str(host.subnet.network),
+            str(host.ip_address),
+            host.hostname,
+            host.mac_address,
+            device_types.label(host.device_type),
+        ])
+    progress(70)
+
+    # Tunnels sheet
+    ws5 = wb.create_sheet("Tunnels")
+    ws5.append(["Name", "Type", "Subnet", "Site A", "IP A", "Site B", "IP B", "Enabled"])
+    for tunnel in Tunnel.objects.filter(project=project).select_related("site_a", "site_b"):
+        ws5.append([
+            tunnel.name, tunnel.tunnel_type, str(tunnel.tunnel_subnet),
+            tunnel.site_a.name, str(tunnel.ip_a),
+            tunnel.site_b.name if tunnel.site_b else tunnel.external_endpoint, str(tunnel.ip_b),
+            "Yes" if tunnel.enabled else "No",
+        ])
+    progress(80)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def build_backup(progress=_noop_progress):
+    """Dump all application data as a ``loaddata``-compatible JSON document."""
+    output = io.StringIO()
+    call_command("dumpdata", *BACKUP_APPS, format="json", indent=2, stdout=output)
+    progress(80)
+    return output.getvalue().encode("utf-8")
+
+
+def build_artifact(kind, project, progress=_noop_progress):
+    """Build an export of the given kind, returning ``(content, content_type, filename)``."""
+    if kind == "excel":
+        return build_project_workbook(project, progress), XLSX_CONTENT_TYPE, f"{project.name}.xlsx"
+    if kind == "pdf":
+        content, content_type = render_project_pdf(project, progress)
+        extension = "pdf" if content_type == PDF_CONTENT_TYPE else "html"
+        return content, content_type, f"{project.name}.{extension}"
+    if kind == "backup":
+        return build_backup(progress), JSON_CONTENT_TYPE, f"ripenet-backup-{date.today()}.json"
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def build_cached_project_pdf(project):
+    """Render the report and store it against the project's current revision.
+
+    Concurrent requests for the same revision wait for the first render
+    instead of starting their own.
+    """
+    content, content_type = single_flight(
+        pdf_cache_key(project), lambda: render_project_pdf(project), settings.EXPORT_CACHE_TIMEOUT,
+    )
+    cache.delete(pdf_pending_key(project))
+    return content, content_type
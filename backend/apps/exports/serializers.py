@@ -0,0 +1,41 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from apps.projects.models import Project
+
+from .models import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    project = serializers.PrimaryKeyRelatedField(
+        queryset=Project.objects.all(), required=False, allow_null=True,
+    )
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id", "kind", "project", "revision", "status", "progress",
+            "filename", "content_type", "size", "error", "download_url",
+            "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = [f for f in fields if f not in ("kind", "project")]
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.Status.DONE:
+            return None
+        return reverse("export-job-download", args=[obj.pk])
+
+    def validate(self, attrs):
+        kind = attrs["kind"]
+        project = attrs.get("project")
+        if kind == ExportJob.Kind.BACKUP:
+            if project is not None:
+                raise serializers.ValidationError({"project": "Backups cover all projects."})
+            if not self.context["request"].user.is_admin:
+                raise serializers.ValidationError({"kind": "Only admins can export backups."})
+        elif kind == ExportJob.Kind.ARCHIVE:
+            raise serializers.ValidationError({"kind": "Queue archives through /exports/archive/."})
+        elif project is None:
+            raise serializers.ValidationError({"project": "Project is required for this export."})
+        return attrs
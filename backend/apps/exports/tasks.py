@@ -0,0 +1,19 @@
+from celery import shared_task
+
+from apps.projects.models import Project
+
+from . import jobs
+from .reports import build_cached_project_pdf
+
+
+@shared_task
+def render_project_pdf(project_id):
+    """Render a project's PDF report into the cache for the download view to pick up."""
+    project = Project.objects.filter(pk=project_id).first()
+    if project is not None:
+        build_cached_project_pdf(project)
+
+
+@shared_task
+def run_export_job(job_id):
+    jobs.run_export_job(job_id)
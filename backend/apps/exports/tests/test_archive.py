@@ -0,0 +1,95 @@
+import io
+import zipfile
+
+import pytest
+from django.core.management import call_command
+
+from apps.exports.archive import archive_job_workers, archive_options, iter_archive
+from apps.exports.jobs import run_export_job
+from apps.exports.models import ExportJob
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture(autouse=True)
+def single_worker(settings):
+    settings.EXPORT_JOB_WORKERS = 1
+
+
+@pytest.fixture
+def projects(admin_user):
+    projects = []
+    for i in range(3):
+        project = Project.objects.create(name=f"Customer {i}", created_by=admin_user)
+        Site.objects.create(project=project, name="HQ")
+        projects.append(project)
+    return projects
+
+
+@pytest.fixture
+def inline_jobs(settings, tmp_path):
+    settings.EXPORT_JOB_BACKEND = "inline"
+    settings.EXPORT_ROOT = tmp_path / "exports"
+
+
+def archive_names(content):
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    assert archive.testzip() is None
+    return archive.namelist()
+
+
+@pytest.mark.django_db
+class TestProjectArchive:
+    def test_archive_job_contains_every_project(self, api_client, projects, inline_jobs):
+        response = api_client.post("/api/v1/exports/archive/", {}, format="json")
+        assert response.status_code == 201
+        job = response.json()
+        assert (job["kind"], job["status"]) == ("archive", "done")
+        names = archive_names(b"".join(api_client.get(job["download_url"]).streaming_content))
+        assert len(names) == 6
+        for project in projects:
+            assert any(name.startswith(f"{project.pk}-") and name.endswith(".xlsx") for name in names)
+
+    def test_archive_subset_and_reuse(self, api_client, projects, inline_jobs):
+        body = {"projects": [projects[0].pk], "formats": ["excel"]}
+        job = api_client.post("/api/v1/exports/archive/", body, format="json").json()
+        names = archive_names(b"".join(api_client.get(job["download_url"]).streaming_content))
+        assert names == [f"{projects[0].pk}-Customer_0/Customer_0.xlsx"]
+
+        again = api_client.post("/api/v1/exports/archive/", body, format="json")
+        assert (again.status_code, again.json()["id"]) == (200, job["id"])
+        Site.objects.create(project=projects[0], name="Branch")
+        assert api_client.post("/api/v1/exports/archive/", body, format="json").status_code == 201
+
+    def test_invalid_format(self, api_client, projects):
+        response = api_client.post("/api/v1/exports/archive/", {"formats": ["docx"]}, format="json")
+        assert response.status_code == 400
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "archive"})
+        assert response.status_code == 400
+
+    def test_management_command(self, projects, tmp_path):
+        output = tmp_path / "all.zip"
+        call_command("export_projects", "--output", str(output), "--format", "excel", stdout=io.StringIO())
+        assert len(zipfile.ZipFile(output).namelist()) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_archive(projects, pool_database):
+    names = archive_names(b"".join(iter_archive([p.pk for p in projects], ["excel"], workers=2)))
+    assert sorted(names) == sorted(f"{p.pk}-Customer_{i}/Customer_{i}.xlsx" for i, p in enumerate(projects))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_archive_job_renders_in_parallel_on_process_backend(projects, pool_database, settings, tmp_path):
+    settings.EXPORT_ROOT = tmp_path / "exports"
+    settings.EXPORT_JOB_BACKEND = "celery"
+    assert archive_job_workers() == 1
+
+    settings.EXPORT_JOB_BACKEND = "process"
+    settings.EXPORT_JOB_WORKERS = 2
+    assert archive_job_workers() == 2
+    # Run here rather than on the shared pool, as a job worker would
+    job = ExportJob.objects.create(kind="archive", options=archive_options([p.pk for p in projects], ["excel"]))
+    run_export_job(job.pk)
+    job.refresh_from_db()
+    assert job.status == "done", job.error
+    assert len(archive_names(job.artifact_path.read_bytes())) == 3
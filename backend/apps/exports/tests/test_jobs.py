@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.exports.models import ExportJob
+from apps.ipam.models import Host, Subnet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture(autouse=True)
+def inline_jobs(settings, tmp_path):
+    settings.EXPORT_JOB_BACKEND = "inline"
+    settings.EXPORT_ROOT = tmp_path / "exports"
+
+
+@pytest.fixture
+def project(admin_user):
+    project = Project.objects.create(name="Job Project", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+    Host.objects.create(subnet=subnet, ip_address="10.0.0.10", hostname="srv")
+    return project
+
+
+@pytest.mark.django_db
+class TestExportJobs:
+    def test_excel_job_runs_and_downloads(self, api_client, project):
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "excel", "project": project.id})
+        assert response.status_code == 201
+        job = response.json()
+        assert job["status"] == "done"
+        assert job["progress"] == 100
+
+        response = api_client.get(f"/api/v1/exports/jobs/{job['id']}/")
+        assert response.json()["filename"] == "Job Project.xlsx"
+
+        response = api_client.get(job["download_url"])
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content)[:2] == b"PK"
+
+    def test_identical_request_reuses_artifact(self, api_client, project):
+        first = api_client.post("/api/v1/exports/jobs/", {"kind": "pdf", "project": project.id}).json()
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "pdf", "project": project.id})
+        assert response.status_code == 200
+        assert response.json()["id"] == first["id"]
+        assert ExportJob.objects.count() == 1
+
+    def test_project_change_invalidates_artifact(self, api_client, project):
+        first = api_client.post("/api/v1/exports/jobs/", {"kind": "excel", "project": project.id}).json()
+        Site.objects.create(project=project, name="Branch")
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "excel", "project": project.id})
+        assert response.status_code == 201
+        assert response.json()["id"] != first["id"]
+
+    def test_project_required_for_project_exports(self, api_client):
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "excel"})
+        assert response.status_code == 400
+
+    def test_backup_requires_admin(self, project):
+        viewer = User.objects.create_user(username="viewer", password="x", role=User.Role.VIEWER)
+        client = APIClient()
+        client.force_authenticate(user=viewer)
+        response = client.post("/api/v1/exports/jobs/", {"kind": "backup"})
+        assert response.status_code == 400
+
+    def test_unfinished_job_not_downloadable(self, api_client, project):
+        job = ExportJob.objects.create(kind="excel", project=project, revision=project.revision)
+        response = api_client.get(f"/api/v1/exports/jobs/{job.id}/download/")
+        assert response.status_code == 409
+
+    def test_reused_job_visible_to_second_user(self, api_client, project):
+        first = api_client.post("/api/v1/exports/jobs/", {"kind": "excel", "project": project.id}).json()
+        viewer = User.objects.create_user(username="viewer", password="x", role=User.Role.VIEWER)
+        client = APIClient()
+        client.force_authenticate(user=viewer)
+
+        response = client.post("/api/v1/exports/jobs/", {"kind": "excel", "project": project.id})
+        assert response.status_code == 200
+        assert response.json()["id"] == first["id"]
+        assert client.get(f"/api/v1/exports/jobs/{first['id']}/").status_code == 200
+        assert client.get(first["download_url"]).status_code == 200
+
+        backup = api_client.post("/api/v1/exports/jobs/", {"kind": "backup"}).json()
+        assert client.get(f"/api/v1/exports/jobs/{backup['id']}/").status_code == 404
+
+    def test_stale_job_is_failed_not_reused(self, api_client, project, settings):
+        settings.EXPORT_JOB_STALE_AFTER = 60
+        # A backup whose worker died two hours ago, and one that is still fresh
+        lost = ExportJob.objects.create(kind="backup", status=ExportJob.Status.RUNNING)
+        ExportJob.objects.filter(pk=lost.pk).update(started_at=timezone.now() - timedelta(hours=2))
+
+        response = api_client.post("/api/v1/exports/jobs/", {"kind": "backup"})
+        assert response.status_code == 201
+        assert response.json()["id"] != lost.id
+        lost.refresh_from_db()
+        assert (lost.status, lost.error) == ("failed", "Export job timed out.")
+
+        running = ExportJob.objects.create(kind="backup", status=ExportJob.Status.RUNNING, started_at=timezone.now())
+        assert api_client.post("/api/v1/exports/jobs/", {"kind": "backup"}).json()["id"] == running.id
@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+from django.core.cache import cache
+
+from apps.exports import tasks
+from apps.ipam.models import VLAN, Host, Subnet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    project = Project.objects.create(name="Report Project", created_by=admin_user)
+    for i in range(3):
+        site = Site.objects.create(project=project, name=f"Site {i}")
+        vlan = VLAN.objects.create(site=site, vlan_id=10, name="Users")
+        subnet = Subnet.objects.create(vlan=vlan, network=f"10.{i}.1.0/24")
+        Host.objects.create(subnet=subnet, ip_address=f"10.{i}.1.10", hostname=f"pc-{i}")
+        standalone = Subnet.objects.create(project=project, site=site, network=f"10.{i}.2.0/24")
+        Host.objects.create(subnet=standalone, ip_address=f"10.{i}.2.10", hostname=f"srv-{i}")
+    cache.clear()
+    return Project.objects.get(pk=project.pk)
+
+
+@pytest.fixture
+def html_reports(monkeypatch):
+    """Serve the report's HTML source, as when WeasyPrint can't load, so its content can be checked."""
+    monkeypatch.setitem(sys.modules, "weasyprint", None)
+
+
+@pytest.mark.django_db
+class TestProjectPDFExport:
+    def test_report_contains_all_sites(self, api_client, project, html_reports):
+        response = api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/html")
+        body = response.content.decode()
+        for i in range(3):
+            assert f"Site {i}" in body
+            assert f"pc-{i}" in body
+            assert f"srv-{i}" in body
+        assert body.count("Standalone Subnets") == 3
+
+    def test_query_count_independent_of_site_count(self, api_client, project, django_assert_max_num_queries):
+        with django_assert_max_num_queries(8):
+            api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+
+    def test_cached_until_project_changes(self, api_client, project, html_reports, django_assert_max_num_queries):
+        api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        with django_assert_max_num_queries(2):
+            api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+
+        Host.objects.create(subnet=Subnet.objects.first(), ip_address="10.0.1.99", hostname="newcomer")
+        response = api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        assert "newcomer" in response.content.decode()
+
+    def test_large_project_rendered_in_background(self, api_client, project, settings, monkeypatch):
+        settings.EXPORT_PDF_ASYNC_HOST_THRESHOLD = 1
+        queued = []
+        monkeypatch.setattr(tasks.render_project_pdf, "delay", queued.append)
+
+        response = api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        assert response.status_code == 202
+        assert queued == [project.id]
+
+        # A second request while the job is pending does not queue it again
+        api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        assert queued == [project.id]
+
+        tasks.render_project_pdf(project.id)
+        response = api_client.get(f"/api/v1/exports/project/{project.id}/pdf/")
+        assert response.status_code == 200
+
+    def test_missing_project(self, api_client):
+        response = api_client.get("/api/v1/exports/project/999999/pdf/")
+        assert response.status_code == 404
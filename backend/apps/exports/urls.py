@@ -1,10 +1,16 @@
-from django.urls import path
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
 
 from . import views
 
+router = DefaultRouter()
+router.register(r"exports/jobs", views.ExportJobViewSet, basename="export-job")
+
 urlpatterns = [
     path("exports/project/<int:project_id>/excel/", views.ProjectExcelView.as_view(), name="export-excel"),
     path("exports/project/<int:project_id>/pdf/", views.ProjectPDFView.as_view(), name="export-pdf"),
+    path("exports/archive/", views.ProjectArchiveView.as_view(), name="export-archive"),
     path("backup/export/", views.DataExportView.as_view(), name="backup-export"),
     path("backup/import/", views.DataImportView.as_view(), name="backup-import"),
+    path("", include(router.urls)),
 ]
@@ -1,18 +1,39 @@
-import io
 import json
 import tempfile
 from datetime import date
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.management import call_command
-from django.http import HttpResponse
-from rest_framework import status
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.ipam.models import VLAN, Host, Subnet, Tunnel
-from apps.projects.models import Project, Site
+from apps.ipam.models import Host
+from apps.projects.models import Project
+
+from .archive import ARCHIVE_KINDS, archive_options
+from .jobs import create_export_job
+from .models import ExportJob
+from .reports import (
+    JSON_CONTENT_TYPE,
+    PDF_CONTENT_TYPE,
+    PDF_PENDING_TIMEOUT,
+    XLSX_CONTENT_TYPE,
+    build_backup,
+    build_cached_project_pdf,
+    build_project_workbook,
+    pdf_cache_key,
+    pdf_pending_key,
+)
+from .serializers import ExportJobSerializer
+from .tasks import render_project_pdf
 
 
 class IsAdmin(IsAuthenticated):
@@ -24,16 +45,7 @@ class DataExportView(APIView):
     permission_classes = [IsAdmin]
 
     def get(self, request):
-        output = io.StringIO()
-        call_command(
-            "dumpdata",
-            "projects", "ipam", "accounts", "audit",
-            format="json",
-            indent=2,
-            stdout=output,
-        )
-        content = output.getvalue()
-        response = HttpResponse(content, content_type="application/json")
+        response = HttpResponse(build_backup(), content_type=JSON_CONTENT_TYPE)
         response["Content-Disposition"] = f'attachment; filename="ripenet-backup-{date.today()}.json"'
         return response
 
@@ -86,130 +98,130 @@ class ProjectExcelView(APIView):
 
     def get(self, request, project_id):
         try:
-            import openpyxl
+            import openpyxl  # noqa: F401
         except ImportError:
             return HttpResponse("openpyxl not installed", status=500)
 
-        project = Project.objects.get(pk=project_id)
-        wb = openpyxl.Workbook()
-
-        # Sites sheet
-        ws = wb.active
-        ws.title = "Sites"
-        ws.append(["Name", "Address", "Latitude", "Longitude"])
-        for site in project.sites.all():
-            ws.append([site.name, site.address, str(site.latitude or ""), str(site.longitude or "")])
-
-        # VLANs sheet
-        ws2 = wb.create_sheet("VLANs")
-        ws2.append(["Site", "VLAN ID", "Name", "Purpose"])
-        for vlan in VLAN.objects.filter(site__project=project).select_related("site"):
-            ws2.append([vlan.site.name, vlan.vlan_id, vlan.name, vlan.purpose])
-
-        # Subnets sheet
-        ws3 = wb.create_sheet("Subnets")
-        ws3.append(["Site", "VLAN", "Network", "Gateway", "Description"])
-        for subnet in Subnet.objects.filter(project=project).select_related("site", "vlan"):
-            site_name = subnet.site.name
-            vlan_label = f"VLAN {subnet.vlan.vlan_id}" if subnet.vlan else "(standalone)"
-            ws3.append([
-                site_name, vlan_label,
-                str(subnet.network), str(subnet.gateway or ""), subnet.description,
-            ])
-
-        # Hosts sheet
-        ws4 = wb.create_sheet("Hosts")
-        ws4.append(["Site", "VLAN", "Subnet", "IP", "Hostname", "MAC", "Device Type"])
-        for host in Host.objects.filter(
-            subnet__project=project
-        ).select_related("subnet__site", "subnet__vlan"):
-            site_name = host.subnet.site.name
-            vlan_label = f"VLAN {host.subnet.vlan.vlan_id}" if host.subnet.vlan else "(standalone)"
-            ws4.append([
-                site_name,
-                vlan_label,
-                str(host.subnet.network),
-                str(host.ip_address),
-                host.hostname,
-                host.mac_address,
-                host.device_type,
-            ])
-
-        # Tunnels sheet
-        ws5 = wb.create_sheet("Tunnels")
-        ws5.append(["Name", "Type", "Subnet", "Site A", "IP A", "Site B", "IP B", "Enabled"])
-        for tunnel in Tunnel.objects.filter(project=project).select_related("site_a", "site_b"):
-            ws5.append([
-                tunnel.name, tunnel.tunnel_type, str(tunnel.tunnel_subnet),
-                tunnel.site_a.name, str(tunnel.ip_a),
-                tunnel.site_b.name, str(tunnel.ip_b),
-                "Yes" if tunnel.enabled else "No",
-            ])
-
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-
-        response = HttpResponse(
-            buffer.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+        project = get_object_or_404(Project, pk=project_id)
+        response = HttpResponse(build_project_workbook(project), content_type=XLSX_CONTENT_TYPE)
         response["Content-Disposition"] = f'attachment; filename="{project.name}.xlsx"'
         return response
 
 
 class ProjectPDFView(APIView):
+    """Project report as PDF, cached per project revision.
+
+    Large projects are rendered on the Celery worker; until the report is
+    ready the view answers 202 and the client retries the same URL.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, project_id):
-        project = Project.objects.get(pk=project_id)
-        sites = project.sites.all()
-
-        html = f"""
-        <html>
-        <head><style>
-            body {{ font-family: sans-serif; font-size: 12px; }}
-            h1 {{ color: #1a1a2e; }}
-            table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
-            th, td {{ border: 1px solid #ddd; padding: 6px 8px; text-align: left; }}
-            th {{ background-color: #f0f0f0; }}
-        </style></head>
-        <body>
-        <h1>{project.name}</h1>
-        <p>{project.description}</p>
-        <p>Supernet: {project.supernet or 'N/A'}</p>
-        """
-
-        for site in sites:
-            html += f"<h2>{site.name}</h2><p>{site.address}</p>"
-            vlans = site.vlans.prefetch_related("subnets__hosts")
-            for vlan in vlans:
-                html += f"<h3>VLAN {vlan.vlan_id} - {vlan.name}</h3>"
-                for subnet in vlan.subnets.all():
-                    html += f"<h4>{subnet.network}</h4>"
-                    html += "<table><tr><th>IP</th><th>Hostname</th><th>Type</th></tr>"
-                    for host in subnet.hosts.all():
-                        html += f"<tr><td>{host.ip_address}</td><td>{host.hostname}</td><td>{host.device_type}</td></tr>"
-                    html += "</table>"
-
-            # Standalone subnets for this site
-            standalone = Subnet.objects.filter(site=site, vlan__isnull=True).prefetch_related("hosts")
-            if standalone.exists():
-                html += "<h3>Standalone Subnets</h3>"
-                for subnet in standalone:
-                    html += f"<h4>{subnet.network}</h4>"
-                    html += "<table><tr><th>IP</th><th>Hostname</th><th>Type</th></tr>"
-                    for host in subnet.hosts.all():
-                        html += f"<tr><td>{host.ip_address}</td><td>{host.hostname}</td><td>{host.device_type}</td></tr>"
-                    html += "</table>"
-
-        html += "</body></html>"
+        project = get_object_or_404(Project, pk=project_id)
+
+        cached = cache.get(pdf_cache_key(project))
+        if cached is None:
+            host_count = Host.objects.filter(project=project).count()
+            if host_count > settings.EXPORT_PDF_ASYNC_HOST_THRESHOLD:
+                if cache.add(pdf_pending_key(project), True, timeout=PDF_PENDING_TIMEOUT):
+                    render_project_pdf.delay(project.pk)
+                response = Response(
+                    {"detail": "Report is being generated. Retry shortly.", "status": "pending"},
+                    status=status.HTTP_202_ACCEPTED,
+                )
+                response["Retry-After"] = "5"
+                return response
+            cached = build_cached_project_pdf(project)
 
-        try:
-            from weasyprint import HTML
-            pdf = HTML(string=html).write_pdf()
-            response = HttpResponse(pdf, content_type="application/pdf")
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        if content_type == PDF_CONTENT_TYPE:
             response["Content-Disposition"] = f'attachment; filename="{project.name}.pdf"'
-            return response
-        except ImportError:
-            return HttpResponse(html, content_type="text/html")
+        return response
+
+
+class ProjectArchiveView(APIView):
+    """Queue a zip archive of Excel/PDF exports of many projects as an export job.
+
+    Body: ``{"projects": [ids], "formats": ["excel", "pdf"]}``; both keys are
+    optional and default to every project and both formats. Answers like
+    ``POST /exports/jobs/``: 201 with a new job, or 200 with an existing job
+    that already covers the same projects at their current revisions.
+    """
+    permission_classes = [IsAdmin]
+
+    def post(self, request):
+        kinds = request.data.get("formats") or list(ARCHIVE_KINDS)
+        if not isinstance(kinds, list) or not set(kinds) <= set(ARCHIVE_KINDS):
+            return Response(
+                {"detail": f"formats must be a list of: {', '.join(ARCHIVE_KINDS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        projects = Project.objects.all()
+        requested = request.data.get("projects")
+        if requested:
+            if not isinstance(requested, list):
+                return Response({"detail": "projects must be a list of ids"}, status=status.HTTP_400_BAD_REQUEST)
+            projects = projects.filter(pk__in=requested)
+        project_ids = list(projects.values_list("pk", flat=True))
+        if not project_ids:
+            return Response({"detail": "No projects to export."}, status=status.HTTP_400_BAD_REQUEST)
+
+        job, created = create_export_job(
+            ExportJob.Kind.ARCHIVE, user=request.user, options=archive_options(project_ids, kinds),
+        )
+        job.refresh_from_db()
+        return Response(
+            ExportJobSerializer(job).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class ExportJobViewSet(
+    mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet,
+):
+    """Background exports: POST to queue, poll the job, then download the artifact.
+
+    Requesting an export that already exists for the project's current
+    revision returns the existing job (200) instead of queueing a new one.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        qs = ExportJob.objects.select_related("project")
+        if not self.request.user.is_admin:
+            # Every user can read every project, so project exports are shared like their
+            # dedup is; backups stay with whoever asked for them
+            qs = qs.filter(Q(created_by=self.request.user) | Q(project__isnull=False))
+        return qs
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job, created = create_export_job(
+            serializer.validated_data["kind"],
+            project=serializer.validated_data.get("project"),
+            user=request.user,
+        )
+        job.refresh_from_db()
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["get"], url_path="download", url_name="download")
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ExportJob.Status.DONE:
+            return Response(
+                {"detail": f"Export is {job.status}.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if not job.artifact_path.exists():
+            return Response({"detail": "Export artifact has been removed."}, status=status.HTTP_410_GONE)
+        return FileResponse(
+            job.artifact_path.open("rb"), as_attachment=True,
+            filename=job.filename, content_type=job.content_type,
+        )
@@ -0,0 +1,109 @@
+"""Address conversions shared by models, validators, views and bulk paths.
+
+Inet values come back from the database as ``ipaddress`` interface objects,
+so the helpers here take the address straight off them and only fall back
+to parsing for strings. For IPv4, hosts, pools, subnets and tunnels also
+carry generated integer columns (``*_int``) that the database keeps in step
+with the inet fields, so hot paths can read plain integers without touching
+the inet values at all.
+"""
+import ipaddress
+
+from django.db.models import BigIntegerField, CharField, F, Func, GeneratedField
+
+_ADDRESS_TYPES = (ipaddress.IPv4Address, ipaddress.IPv6Address)
+_INTERFACE_TYPES = (ipaddress.IPv4Interface, ipaddress.IPv6Interface)
+_NETWORK_TYPES = (ipaddress.IPv4Network, ipaddress.IPv6Network)
+
+# Offset that keeps IPv6 keys clear of every IPv4 key
+_IPV6_OFFSET = 1 << 128
+
+
+def ip(value):
+    """The address of an inet value (interface, address or string, with or without a mask)."""
+    if isinstance(value, _INTERFACE_TYPES):
+        return value.ip
+    if isinstance(value, _ADDRESS_TYPES):
+        return value
+    return ipaddress.ip_address(str(value).split("/")[0])
+
+
+def ip_int(value):
+    """Integer of an inet value's address."""
+    return int(ip(value))
+
+
+def network(value):
+    """Network of a cidr value, accepting host bits."""
+    if isinstance(value, _NETWORK_TYPES):
+        return value
+    return ipaddress.ip_network(str(value), strict=False)
+
+
+def ip_key(address):
+    """Integer key for an address, keeping IPv4 and IPv6 keys disjoint."""
+    return int(address) if address.version == 4 else int(address) + _IPV6_OFFSET
+
+
+def host_bounds(net):
+    """Integers of the first and last addresses ``net.hosts()`` yields."""
+    first, last = int(net.network_address), int(net.broadcast_address)
+    if net.num_addresses <= 2:
+        return first, last
+    return first + 1, last - 1 if net.version == 4 else last
+
+
+def int_to_ip(value, version=4):
+    return ipaddress.IPv4Address(value) if version == 4 else ipaddress.IPv6Address(value)
+
+
+def address_ints(queryset, field, version):
+    """Integers of the ``version`` addresses in ``field`` over ``queryset``.
+
+    IPv4 reads the generated ``<field>_int`` column and never sees an inet value.
+    """
+    if version == 4:
+        return [v for v in queryset.values_list(f"{field}_int", flat=True) if v is not None]
+    addresses = (ip(v) for v in queryset.values_list(field, flat=True) if v is not None)
+    return [int(a) for a in addresses if a.version == version]
+
+
+def address_ranges(queryset, start, end, version):
+    """``(start, end)`` integer pairs of two address fields over ``queryset``, like ``address_ints``."""
+    if version == 4:
+        rows = queryset.values_list(f"{start}_int", f"{end}_int")
+        return [(a, b) for a, b in rows if a is not None and b is not None]
+    pairs = ((ip(a), ip(b)) for a, b in queryset.values_list(start, end))
+    return [(int(a), int(b)) for a, b in pairs if a.version == version]
+
+
+class HostAddress(Func):
+    """``host(inet)``: the address as text without its mask, so ``10.0.0.5/24`` and ``10.0.0.5`` compare equal."""
+    function = "host"
+    output_field = CharField()
+
+    def __init__(self, field):
+        super().__init__(F(field) if isinstance(field, str) else field)
+
+
+class IPv4Int(Func):
+    """Integer of an IPv4 inet/cidr address (the network address for cidr); NULL for IPv6.
+
+    Postgres' ``inet - inet`` is a bigint, which cannot hold IPv6 addresses.
+    """
+    template = "CASE WHEN family(%(expressions)s) = 4 THEN %(expressions)s - '0.0.0.0'::inet END"
+    output_field = BigIntegerField()
+
+    def __init__(self, field):
+        super().__init__(F(field))
+
+
+class IPv4BroadcastInt(IPv4Int):
+    """Integer of the last address of an IPv4 cidr; NULL for IPv6."""
+    template = "CASE WHEN family(%(expressions)s) = 4 THEN broadcast(%(expressions)s) - '0.0.0.0'::inet END"
+
+
+def ipv4_int_field(source, broadcast=False):
+    """Generated integer column mirroring the inet/cidr field ``source``."""
+    expression = IPv4BroadcastInt(source) if broadcast else IPv4Int(source)
+    return GeneratedField(expression=expression, output_field=BigIntegerField(), db_persist=True, serialize=False)
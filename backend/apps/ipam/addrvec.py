@@ -0,0 +1,171 @@
+"""Vectorized address arithmetic for bulk paths.
+
+IPv4 sets are uint32 arrays. IPv6 sets are structured arrays of two uint64
+fields (``hi``, ``lo``), which NumPy sorts, searches and de-duplicates
+lexicographically, so both versions go through the same code. Intervals are
+inclusive ``(start, end)`` integer pairs as elsewhere in ipam; results come
+back as plain Python ints.
+
+Converting to arrays has a fixed cost, so callers keep their plain Python
+path for small inputs and only switch here above ``THRESHOLD`` items.
+"""
+import numpy as np
+
+THRESHOLD = 256
+
+_V6 = np.dtype([("hi", np.uint64), ("lo", np.uint64)])
+_LOW64 = (1 << 64) - 1
+
+
+def pack(values, version=4):
+    """Array of the integer addresses ``values``."""
+    if version == 4:
+        return np.fromiter(values, dtype=np.uint32)
+    values = list(values)
+    packed = np.empty(len(values), dtype=_V6)
+    packed["hi"] = np.fromiter((v >> 64 for v in values), dtype=np.uint64, count=len(values))
+    packed["lo"] = np.fromiter((v & _LOW64 for v in values), dtype=np.uint64, count=len(values))
+    return packed
+
+
+def unpack(array):
+    """Python ints of a packed array."""
+    if array.dtype == _V6:
+        return [(hi << 64) | lo for hi, lo in zip(array["hi"].tolist(), array["lo"].tolist())]
+    return array.tolist()
+
+
+def _pack_pairs(pairs, version):
+    pairs = list(pairs)
+    return pack((p[0] for p in pairs), version), pack((p[1] for p in pairs), version)
+
+
+def _le(a, b):
+    if a.dtype == _V6:
+        return (a["hi"] < b["hi"]) | ((a["hi"] == b["hi"]) & (a["lo"] <= b["lo"]))
+    return a <= b
+
+
+def _succ(a):
+    """Next address; wraps at the top of the space, so callers never rely on it there."""
+    if a.dtype == _V6:
+        out = a.copy()
+        out["lo"] += np.uint64(1)
+        out["hi"] += out["lo"] == 0
+        return out
+    return a + np.uint32(1)
+
+
+def _pred(a):
+    """Previous address; wraps at zero like ``_succ``."""
+    if a.dtype == _V6:
+        out = a.copy()
+        out["hi"] -= out["lo"] == 0
+        out["lo"] -= np.uint64(1)
+        return out
+    return a - np.uint32(1)
+
+
+def _running_max(a):
+    if a.dtype == _V6:
+        # No ufunc orders structured values, but their ranks are plain ints
+        keys = np.unique(a)
+        return keys[np.maximum.accumulate(np.searchsorted(keys, a))]
+    return np.maximum.accumulate(a)
+
+
+def _merge(starts, ends):
+    """Sorted, disjoint runs covering the intervals; overlapping and adjacent ones are joined."""
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = _running_max(ends)
+    # An interval starts a new run unless it overlaps or touches everything before it
+    new_run = np.ones(len(starts), dtype=bool)
+    new_run[1:] = ~(_le(starts[1:], reach[:-1]) | (starts[1:] == _succ(reach[:-1])))
+    firsts = np.flatnonzero(new_run)
+    lasts = np.append(firsts[1:] - 1, len(starts) - 1)
+    return starts[firsts], reach[lasts]
+
+
+def merge_intervals(pairs, version=4):
+    """Merge ``(start, end)`` pairs into sorted, disjoint pairs."""
+    starts, ends = _merge(*_pack_pairs(pairs, version))
+    return list(zip(unpack(starts), unpack(ends)))
+
+
+def _gaps(pairs, first, last, version):
+    """Sorted ``(starts, ends)`` arrays of the ranges in ``[first, last]`` no pair covers."""
+    starts, ends = _merge(*_pack_pairs(pairs, version))
+    lo, hi = pack([first], version), pack([last], version)
+    keep = _le(lo, ends) & _le(starts, hi)
+    starts, ends = starts[keep], ends[keep]
+    if not len(starts):
+        return lo, hi
+    # Runs are disjoint and not adjacent, so every inner gap is non-empty
+    gap_starts, gap_ends = _succ(ends[:-1]), _pred(starts[1:])
+    if not _le(starts[:1], lo)[0]:
+        gap_starts, gap_ends = np.concatenate([lo, gap_starts]), np.concatenate([_pred(starts[:1]), gap_ends])
+    if not _le(hi, ends[-1:])[0]:
+        gap_starts, gap_ends = np.concatenate([gap_starts, _succ(ends[-1:])]), np.concatenate([gap_ends, hi])
+    return gap_starts, gap_ends
+
+
+def first_free(pairs, first, last, version=4):
+    """Lowest address in ``[first, last]`` outside every pair, or None."""
+    starts, _ = _gaps(pairs, first, last, version)
+    return unpack(starts[:1])[0] if len(starts) else None
+
+
+def largest_gap(pairs, first, last, version=4):
+    """``(start, end, size)`` of the largest free range in ``[first, last]`` (the lowest on ties), or None."""
+    starts, ends = _gaps(pairs, first, last, version)
+    if not len(starts):
+        return None
+    if starts.dtype == _V6:
+        # 128-bit end - start + 1, carried by hand across the two halves
+        size_lo = ends["lo"] - starts["lo"] + np.uint64(1)
+        borrow = ends["lo"] < starts["lo"]
+        size_hi = ends["hi"] - starts["hi"] - borrow + (size_lo == 0)
+        widest = np.flatnonzero(size_hi == size_hi.max())
+        best = widest[np.argmax(size_lo[widest])]
+    else:
+        best = np.argmax(ends.astype(np.int64) - starts.astype(np.int64))
+    start, end = unpack(starts[best:best + 1])[0], unpack(ends[best:best + 1])[0]
+    return start, end, end - start + 1
+
+
+def isin(values, members, version=4):
+    """Boolean array: which of ``values`` are in ``members``."""
+    values, keys = pack(values, version), np.unique(pack(members, version))
+    if not len(keys):
+        return np.zeros(len(values), dtype=bool)
+    i = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return keys[i] == values
+
+
+def contains(pairs, values, version=4):
+    """Boolean array: which of ``values`` fall inside any of the ``(start, end)`` pairs."""
+    starts, ends = _merge(*_pack_pairs(pairs, version))
+    values = pack(values, version)
+    i = np.searchsorted(starts, values, side="right") - 1
+    inside = i >= 0
+    inside[inside] = _le(values[inside], ends[i[inside]])
+    return inside
+
+
+def overlapping(pairs, version=4):
+    """Boolean array: which of the ``(start, end)`` pairs overlap at least one other pair."""
+    starts, ends = _pack_pairs(pairs, version)
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    sorted_mask = np.zeros(len(starts), dtype=bool)
+    if len(starts) > 1:
+        # Sorted by start, a pair overlaps an earlier one when it starts before
+        # their furthest end, and a later one when the next pair starts before its end
+        sorted_mask[1:] = _le(starts[1:], _running_max(ends)[:-1])
+        sorted_mask[:-1] |= _le(starts[1:], ends[:-1])
+    mask = np.empty_like(sorted_mask)
+    mask[order] = sorted_mask
+    return mask
@@ -32,7 +32,7 @@ class SubnetAdmin(admin.ModelAdmin):
 @admin.register(Host)
 class HostAdmin(admin.ModelAdmin):
     list_display = ("ip_address", "hostname", "device_type", "subnet")
-    list_filter = ("device_type", "subnet__project")
+    list_filter = ("device_type", "project")
     search_fields = ("hostname", "description")
 
 
@@ -0,0 +1,224 @@
+"""In-memory address allocation.
+
+Carving hundreds of blocks by querying the database for each one is slow;
+BlockAllocator loads what is already taken once and hands out aligned free
+blocks from a sorted interval list. AddressOccupancy does the same for single
+addresses inside one subnet, so picking an address costs in proportion to
+what is allocated, not to the size of the prefix (an IPv6 /64 has 2^64).
+"""
+import bisect
+import ipaddress
+import itertools
+import random
+import re
+
+from . import addrvec
+from .addresses import host_bounds
+
+ALLOCATION_STRATEGIES = ("sequential", "eui64", "random")
+# Random draws before falling back to picking among the free ranges directly
+RANDOM_ATTEMPTS = 32
+
+_random = random.SystemRandom()
+
+
+class AllocationError(Exception):
+    pass
+
+
+def prefix_for_hosts(hosts, version=4):
+    """Smallest prefix length whose subnet has at least ``hosts`` usable addresses."""
+    bits = 32 if version == 4 else 128
+    prefix = bits
+    while prefix > 0 and (2 ** (bits - prefix) - 2) < hosts:
+        prefix -= 1
+    return prefix
+
+
+class BlockAllocator:
+    """Hands out the lowest free, aligned blocks of a parent network."""
+
+    def __init__(self, parent, used=()):
+        self.parent = ipaddress.ip_network(str(parent), strict=False)
+        self._first = int(self.parent.network_address)
+        self._last = int(self.parent.broadcast_address)
+        self._intervals = []  # sorted, non-overlapping (first, last) ints
+        used = list(used)
+        if len(used) > addrvec.THRESHOLD:
+            self._load(used)
+        else:
+            for network in used:
+                self.reserve(network)
+
+    def _load(self, used):
+        """Reserve many networks at once; each ``reserve`` shifts the list, so one merge is much cheaper."""
+        intervals = []
+        for network in used:
+            net = ipaddress.ip_network(str(network), strict=False)
+            if net.version != self.parent.version:
+                continue
+            first = max(int(net.network_address), self._first)
+            last = min(int(net.broadcast_address), self._last)
+            if first <= last:
+                intervals.append((first, last))
+        # reserve() also joins adjacent blocks, as merge_intervals does
+        self._intervals = addrvec.merge_intervals(intervals, self.parent.version)
+
+    def reserve(self, network):
+        """Mark ``network`` as taken; parts outside the parent are ignored."""
+        net = ipaddress.ip_network(str(network), strict=False)
+        if net.version != self.parent.version:
+            return
+        first = max(int(net.network_address), self._first)
+        last = min(int(net.broadcast_address), self._last)
+        if first > last:
+            return
+        i = bisect.bisect_left(self._intervals, (first, first))
+        # Merge with overlapping or adjacent neighbours so the list stays disjoint
+        if i > 0 and self._intervals[i - 1][1] >= first - 1:
+            i -= 1
+        j = i
+        while j < len(self._intervals) and self._intervals[j][0] <= last + 1:
+            first = min(first, self._intervals[j][0])
+            last = max(last, self._intervals[j][1])
+            j += 1
+        self._intervals[i:j] = [(first, last)]
+
+    def allocate(self, prefix, within=None):
+        """Reserve and return the lowest free ``/prefix`` block, optionally inside ``within``.
+
+        Raises AllocationError when there is no room left.
+        """
+        within = self.parent if within is None else ipaddress.ip_network(str(within), strict=False)
+        if within.version != self.parent.version or not within.subnet_of(self.parent):
+            raise AllocationError(f"{within} is outside {self.parent}")
+        if not within.prefixlen <= prefix <= within.max_prefixlen:
+            raise AllocationError(f"/{prefix} does not fit in {within}")
+        size = 1 << (within.max_prefixlen - prefix)
+        start, end = int(within.network_address), int(within.broadcast_address)
+
+        candidate = start
+        i = bisect.bisect_left(self._intervals, (start, start))
+        if i > 0 and self._intervals[i - 1][1] >= start:
+            i -= 1
+        for first, last in itertools.islice(self._intervals, i, None):
+            if candidate + size - 1 < first or candidate > end:
+                break
+            candidate = max(candidate, -(-(last + 1) // size) * size)
+        if candidate + size - 1 > end:
+            raise AllocationError(f"No free /{prefix} left in {within}")
+        block = type(self.parent)((candidate, prefix))
+        self.reserve(block)
+        return block
+
+
+def _merge(pairs):
+    pairs = sorted(pairs)
+    merged = []
+    for start, end in pairs:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class AddressOccupancy:
+    """Allocated addresses of one subnet as sorted, disjoint ``(first, last)`` integer intervals."""
+
+    def __init__(self, network, addresses=(), ranges=()):
+        self.network = ipaddress.ip_network(str(network), strict=False)
+        self.version = self.network.version
+        pairs = [(a, a) for a in addresses]
+        pairs.extend(ranges)
+        if len(pairs) > addrvec.THRESHOLD:
+            self._intervals = addrvec.merge_intervals(pairs, self.version)
+        else:
+            self._intervals = _merge(pairs)
+        self._starts = [first for first, _ in self._intervals]
+
+    def is_free(self, value):
+        i = bisect.bisect_right(self._starts, value) - 1
+        return i < 0 or value > self._intervals[i][1]
+
+    def free_ranges(self, first, last):
+        """Yield the free ``(start, end)`` ranges within ``[first, last]`` in ascending order."""
+        candidate = first
+        i = max(bisect.bisect_right(self._starts, first) - 1, 0)
+        for start, end in itertools.islice(self._intervals, i, None):
+            if start > last:
+                break
+            if start > candidate:
+                yield candidate, start - 1
+            candidate = max(candidate, end + 1)
+        if candidate <= last:
+            yield candidate, last
+
+    def first_free(self, first, last):
+        return next(self.free_ranges(first, last), (None,))[0]
+
+    def largest_free(self, first, last):
+        """``(start, end, size)`` of the largest free range in ``[first, last]`` (the lowest on ties), or None."""
+        if len(self._intervals) > addrvec.THRESHOLD:
+            return addrvec.largest_gap(self._intervals, first, last, self.version)
+        best = None
+        for start, end in self.free_ranges(first, last):
+            if best is None or end - start + 1 > best[2]:
+                best = (start, end, end - start + 1)
+        return best
+
+    def random_free(self, first, last):
+        """A uniformly random free address in ``[first, last]``, or None."""
+        # Allocated space is usually sparse, so a few blind draws almost always hit
+        for _ in range(RANDOM_ATTEMPTS):
+            value = _random.randint(first, last)
+            if self.is_free(value):
+                return value
+        ranges = list(self.free_ranges(first, last))
+        total = sum(end - start + 1 for start, end in ranges)
+        if not total:
+            return None
+        n = _random.randrange(total)
+        for start, end in ranges:
+            if n <= end - start:
+                return start + n
+            n -= end - start + 1
+
+
+def eui64_address(network, mac):
+    """Modified EUI-64 address (RFC 4291) of ``mac`` in the first /64 of an IPv6 ``network``."""
+    network = ipaddress.ip_network(str(network), strict=False)
+    if network.version != 6 or network.prefixlen > 64:
+        raise AllocationError("EUI-64 needs an IPv6 subnet of /64 or larger.")
+    digits = re.sub(r"[\s:.-]", "", str(mac or ""))
+    if not re.fullmatch(r"[0-9a-fA-F]{12}", digits):
+        raise AllocationError("EUI-64 needs a valid MAC address.")
+    value = int(digits, 16)
+    interface_id = ((value >> 24) << 40 | 0xFFFE << 24 | value & 0xFFFFFF) ^ (1 << 57)
+    return int(network.network_address) | interface_id
+
+
+def allocate_address(occupancy, strategy="sequential", first=None, last=None, mac=None):
+    """Pick a free address of ``occupancy`` in ``[first, last]`` (default: its usable hosts).
+
+    Strategies: ``sequential`` takes the lowest free address, ``eui64``
+    derives it from ``mac``, ``random`` draws one uniformly. Returns an int,
+    or None when the range is full; raises AllocationError for an unknown
+    strategy, a bad MAC or an EUI-64 address that is taken or out of range.
+    """
+    default_first, default_last = host_bounds(occupancy.network)
+    first = default_first if first is None else first
+    last = default_last if last is None else last
+    if strategy == "sequential":
+        return occupancy.first_free(first, last)
+    if strategy == "random":
+        return occupancy.random_free(first, last) if first <= last else None
+    if strategy == "eui64":
+        value = eui64_address(occupancy.network, mac)
+        address = ipaddress.IPv6Address(value)
+        if not first <= value <= last:
+            raise AllocationError(f"EUI-64 address {address} is outside the allowed range.")
+        if not occupancy.is_free(value):
+            raise AllocationError(f"EUI-64 address {address} is already in use.")
+        return value
+    raise AllocationError(f"Unknown strategy: {strategy}. Choose from: {', '.join(ALLOCATION_STRATEGIES)}.")
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class IpamConfig(AppConfig):
+    name = "apps.ipam"
+    label = "ipam"
+
+    def ready(self):
+        from . import device_types  # noqa: F401
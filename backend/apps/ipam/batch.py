@@ -0,0 +1,268 @@
+"""Ordered create/update/delete operations applied in one transaction.
+
+Consecutive creates of the same resource are validated together and
+inserted with a single ``bulk_create``. Creates can name themselves with
+``ref`` and later operations can point at them with ``"$<ref>"`` wherever a
+primary key is expected.
+"""
+from django.db import IntegrityError, transaction
+
+from apps.projects.models import Project, Site, SiteWanAddress
+from apps.projects.serializers import ProjectSerializer, SiteSerializer
+from apps.projects.signals import bump_project_revision
+
+from .addresses import ip as _ip
+from .addresses import network as _network
+from .models import VLAN, DHCPPool, Host, Subnet, Tunnel
+from .serializers import DHCPPoolSerializer, HostSerializer, SubnetSerializer, TunnelSerializer, VLANSerializer
+
+RESOURCES = {
+    "project": (Project, ProjectSerializer),
+    "site": (Site, SiteSerializer),
+    "vlan": (VLAN, VLANSerializer),
+    "subnet": (Subnet, SubnetSerializer),
+    "dhcp_pool": (DHCPPool, DHCPPoolSerializer),
+    "host": (Host, HostSerializer),
+    "tunnel": (Tunnel, TunnelSerializer),
+}
+OPERATIONS = ("create", "update", "delete")
+MAX_OPERATIONS = 5000
+
+
+class BatchError(Exception):
+    def __init__(self, index, detail):
+        super().__init__(detail)
+        self.index = index
+        self.detail = detail
+
+
+def _project_ids(resource, instance):
+    """Projects whose revision must move when ``instance`` is bulk-created."""
+    if resource == "project":
+        return [instance.pk]
+    if resource in ("site", "subnet"):
+        return [instance.project_id]
+    if resource == "vlan":
+        return [instance.site.project_id]
+    if resource == "tunnel":
+        return [instance.project_id, instance.site_b.project_id if instance.site_b_id else None]
+    return [instance.subnet.project_id]
+
+
+def _group_conflicts(resource, items):
+    """Check validated creates of one group against each other.
+
+    Each item was validated against the database on its own; this catches
+    conflicts between rows that are about to be inserted together.
+    Yields ``(position, message)``.
+    """
+    seen = {}
+    for position, attrs in enumerate(items):
+        if resource == "site":
+            keys = [(attrs["project"], attrs["name"])]
+            message = f"Duplicate site name {attrs['name']} in this batch."
+        elif resource == "vlan":
+            keys = [(attrs["site"].pk, attrs["vlan_id"])]
+            message = f"Duplicate VLAN {attrs['vlan_id']} for this site in this batch."
+        elif resource == "host":
+            keys = [(attrs["subnet"].project_id, _ip(attrs["ip_address"]))]
+            message = f"IP {attrs['ip_address']} is used twice in this batch."
+        elif resource == "tunnel":
+            keys = [(attrs["project"].pk, _ip(attrs["ip_a"])), (attrs["project"].pk, _ip(attrs["ip_b"]))]
+            message = f"Tunnel IP {attrs['ip_a']} or {attrs['ip_b']} is used twice in this batch."
+        else:
+            continue
+        if any(key in seen for key in keys) or len(set(keys)) < len(keys):
+            yield position, message
+        seen.update(dict.fromkeys(keys, position))
+
+    if resource in ("subnet", "tunnel"):
+        field, label = ("network", "Subnet") if resource == "subnet" else ("tunnel_subnet", "Tunnel subnet")
+        # Sort on plain integers: IPv4 and IPv6 networks don't compare with each other
+        ranges = sorted(
+            (attrs["project"].pk, net.version, int(net.network_address), int(net.broadcast_address), position, net)
+            for position, attrs in enumerate(items)
+            for net in [_network(attrs[field])]
+        )
+        for (project_a, version_a, _, end_a, _, net_a), (project_b, version_b, start_b, _, position, net_b) in zip(
+            ranges, ranges[1:]
+        ):
+            if project_a == project_b and version_a == version_b and start_b <= end_a:
+                yield position, f"{label} {net_b} overlaps with {net_a} in this batch."
+    elif resource == "dhcp_pool":
+        ranges = sorted(
+            (attrs["subnet"].pk, int(_ip(attrs["start_ip"])), int(_ip(attrs["end_ip"])), position)
+            for position, attrs in enumerate(items)
+        )
+        for (subnet_a, _, end_a, _), (subnet_b, start_b, _, position) in zip(ranges, ranges[1:]):
+            if subnet_a == subnet_b and start_b <= end_a:
+                yield position, "DHCP pool overlaps with another pool in this batch."
+
+
+class Batch:
+    def __init__(self, operations, request):
+        self.operations = operations
+        self.request = request
+        self.refs = {}
+        self.results = [None] * len(operations)
+        self.touched_projects = set()
+        self._pending = []  # [(index, op, attrs)] of one resource, awaiting bulk_create
+
+    # --- reference resolution ---
+
+    def _resolve(self, index, value):
+        if isinstance(value, str) and value.startswith("$"):
+            name = value[1:]
+            if name not in self.refs:
+                raise BatchError(index, f"Unknown reference {value}.")
+            return self.refs[name]
+        if isinstance(value, list):
+            return [self._resolve(index, v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._resolve(index, v) for k, v in value.items()}
+        return value
+
+    @staticmethod
+    def _references(value):
+        if isinstance(value, str) and value.startswith("$"):
+            yield value[1:]
+        elif isinstance(value, list):
+            for v in value:
+                yield from Batch._references(v)
+        elif isinstance(value, dict):
+            for v in value.values():
+                yield from Batch._references(v)
+
+    # --- operations ---
+
+    def run(self):
+        with transaction.atomic():
+            for index, op in enumerate(self.operations):
+                self._check_shape(index, op)
+                if op["op"] == "create":
+                    pending_refs = {pending_op.get("ref") for _, pending_op, _ in self._pending}
+                    if self._pending and (
+                        self._pending[0][1]["resource"] != op["resource"]
+                        or pending_refs.intersection(self._references(op.get("data")))
+                    ):
+                        self._flush()
+                    self._queue_create(index, op)
+                else:
+                    self._flush()
+                    if op["op"] == "update":
+                        self._update(index, op)
+                    else:
+                        self._delete(index, op)
+            self._flush()
+            bump_project_revision(*self.touched_projects)
+        return self.results
+
+    def _check_shape(self, index, op):
+        if not isinstance(op, dict):
+            raise BatchError(index, "Each operation must be an object.")
+        if op.get("op") not in OPERATIONS:
+            raise BatchError(index, f"op must be one of: {', '.join(OPERATIONS)}.")
+        if op.get("resource") not in RESOURCES:
+            raise BatchError(index, f"resource must be one of: {', '.join(RESOURCES)}.")
+        if op["op"] != "create" and "id" not in op:
+            raise BatchError(index, "id is required for update and delete.")
+        if op["op"] != "delete" and not isinstance(op.get("data"), dict):
+            raise BatchError(index, "data must be an object.")
+        ref = op.get("ref")
+        taken = ref in self.refs or any(pending_op.get("ref") == ref for _, pending_op, _ in self._pending)
+        if ref is not None and (op["op"] != "create" or not isinstance(ref, str) or taken):
+            raise BatchError(index, "ref must be a unique string on a create operation.")
+
+    def _serializer(self, resource, *args, **kwargs):
+        serializer_class = RESOURCES[resource][1]
+        return serializer_class(*args, context={"request": self.request}, **kwargs)
+
+    def _get(self, index, op):
+        model = RESOURCES[op["resource"]][0]
+        pk = self._resolve(index, op["id"])
+        try:
+            return model.objects.get(pk=pk)
+        except (model.DoesNotExist, ValueError, TypeError):
+            raise BatchError(index, f"{op['resource']} {op['id']} not found.")
+
+    def _queue_create(self, index, op):
+        data = self._resolve(index, op["data"])
+        serializer = self._serializer(op["resource"], data=data)
+        if not serializer.is_valid():
+            raise BatchError(index, serializer.errors)
+        attrs = dict(serializer.validated_data)
+        if op["resource"] == "site":
+            # SiteSerializer takes the project from the URL; here it comes with the data
+            project_id = str(data.get("project", ""))
+            project = Project.objects.filter(pk=project_id).first() if project_id.isdigit() else None
+            if project is None:
+                raise BatchError(index, {"project": "A valid project is required."})
+            attrs["project"] = project
+        self._pending.append((index, op, attrs))
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        resource = pending[0][1]["resource"]
+        model = RESOURCES[resource][0]
+
+        for position, message in _group_conflicts(resource, [attrs for _, _, attrs in pending]):
+            raise BatchError(pending[position][0], message)
+
+        wan_addresses = []
+        instances = []
+        for _, _, attrs in pending:
+            if resource == "site":
+                wan_addresses.append(attrs.pop("wan_addresses", []))
+            if resource == "project":
+                attrs["created_by"] = self.request.user
+            instances.append(model(**attrs))
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(instances)
+                if resource == "site":
+                    SiteWanAddress.objects.bulk_create([
+                        SiteWanAddress(site=site, **wa)
+                        for site, addresses in zip(instances, wan_addresses) for wa in addresses
+                    ])
+        except IntegrityError as e:
+            raise BatchError(pending[0][0], f"Could not create {resource} rows: {e}")
+
+        for (index, op, _), instance in zip(pending, instances):
+            if op.get("ref"):
+                self.refs[op["ref"]] = instance.pk
+            self.results[index] = {"op": "create", "resource": resource, "id": instance.pk, "ref": op.get("ref")}
+            self.touched_projects.update(_project_ids(resource, instance))
+
+    def _update(self, index, op):
+        instance = self._get(index, op)
+        serializer = self._serializer(op["resource"], instance, data=self._resolve(index, op["data"]), partial=True)
+        if not serializer.is_valid():
+            raise BatchError(index, serializer.errors)
+        serializer.save()
+        self.results[index] = {"op": "update", "resource": op["resource"], "id": instance.pk}
+
+    def _delete(self, index, op):
+        if not self.request.user.is_admin:
+            raise BatchError(index, "Only admins can delete.")
+        instance = self._get(index, op)
+        if op["resource"] == "dhcp_pool" and instance.leases.exists():
+            raise BatchError(index, "Cannot delete pool with existing leases. Remove leases first.")
+        pk = instance.pk
+        instance.delete()
+        self.results[index] = {"op": "delete", "resource": op["resource"], "id": pk}
+
+
+def apply_batch(operations, request):
+    """Apply ``operations`` atomically, returning one result per operation.
+
+    Raises BatchError (after rolling everything back) on the first invalid
+    operation.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchError(None, "operations must be a non-empty list.")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(None, f"At most {MAX_OPERATIONS} operations per batch.")
+    return Batch(operations, request).run()
@@ -0,0 +1,212 @@
+"""Set-based bulk operations on hosts.
+
+Validating hosts one at a time through HostSerializer costs several queries
+per row. ProjectAddressIndex loads a project's address plan once into
+integer-keyed structures so thousands of rows can be checked in memory with
+the same rules as the serializer.
+"""
+import bisect
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.projects.models import Project
+from apps.projects.signals import bump_project_revision
+
+from .addresses import ip as _ip
+from .addresses import ip_key
+from .addresses import network as parse_network
+from .device_types import registry as device_types
+from .models import DHCPPool, Host, Subnet, Tunnel
+
+HOST_IMPORT_FIELDS = [
+    "subnet", "ip_address", "hostname", "mac_address", "device_type", "ip_type", "dhcp_pool", "description",
+]
+# Fields whose validity doesn't depend on the individual host, so one check covers any number of rows
+HOST_BULK_UPDATE_FIELDS = ["device_type", "description"]
+
+
+class ProjectAddressIndex:
+    """In-memory snapshot of one project's subnets, pools and used IPs."""
+
+    def __init__(self, project):
+        self.project = project
+
+        self.subnets = {}  # id -> (network, first_key, last_key)
+        self.subnet_by_network = {}
+        ranges = []
+        for subnet_id, network in Subnet.objects.filter(project=project).values_list("id", "network"):
+            net = parse_network(network)
+            first, last = ip_key(net.network_address), ip_key(net.broadcast_address)
+            self.subnets[subnet_id] = (net, first, last)
+            self.subnet_by_network[str(net)] = subnet_id
+            ranges.append((first, last, subnet_id))
+        # Subnets within a project never overlap, so sorted starts are enough to bisect
+        ranges.sort()
+        self._subnet_starts = [r[0] for r in ranges]
+        self._subnet_ranges = ranges
+
+        self.pools = {}  # id -> (subnet_id, start_key, end_key)
+        self.pools_by_subnet = {}
+        for pool_id, subnet_id, start_ip, end_ip in DHCPPool.objects.filter(
+            project=project,
+        ).values_list("id", "subnet_id", "start_ip", "end_ip"):
+            pool = (subnet_id, ip_key(_ip(start_ip)), ip_key(_ip(end_ip)))
+            self.pools[pool_id] = pool
+            self.pools_by_subnet.setdefault(subnet_id, []).append((pool[1], pool[2], pool_id))
+
+        self.used = {
+            ip_key(_ip(ip)) for ip in Host.objects.filter(project=project).values_list("ip_address", flat=True)
+        }
+        for ip_a, ip_b in Tunnel.objects.filter(project=project).values_list("ip_a", "ip_b"):
+            self.used.add(ip_key(_ip(ip_a)))
+            self.used.add(ip_key(_ip(ip_b)))
+
+    def subnet_containing(self, key):
+        i = bisect.bisect_right(self._subnet_starts, key) - 1
+        if i >= 0:
+            first, last, subnet_id = self._subnet_ranges[i]
+            if key <= last:
+                return subnet_id
+        return None
+
+    def pool_containing(self, subnet_id, key):
+        for start, end, pool_id in self.pools_by_subnet.get(subnet_id, ()):
+            if start <= key <= end:
+                return pool_id
+        return None
+
+    def resolve_subnet(self, value, key):
+        """Subnet given by id or CIDR, or the one containing the IP when blank."""
+        value = str(value or "").strip()
+        if not value:
+            return self.subnet_containing(key)
+        if value.isdigit():
+            return int(value) if int(value) in self.subnets else None
+        try:
+            return self.subnet_by_network.get(str(parse_network(value)))
+        except ValueError:
+            return None
+
+    def validate_host(self, row):
+        """Check one row against the index, returning ``(host, errors)``.
+
+        A valid row's IP is claimed immediately so later rows in the same
+        batch see it as taken.
+        """
+        errors = {}
+        device_type = str(row.get("device_type") or "other").strip()
+        if not device_types.is_known(device_type):
+            errors["device_type"] = f"Unknown device type: {device_type}"
+        ip_type = str(row.get("ip_type") or Host.IPType.STATIC).strip()
+        if ip_type not in Host.IPType.values:
+            errors["ip_type"] = f"Unknown IP type: {ip_type}"
+        hostname = str(row.get("hostname") or "").strip()
+        if len(hostname) > 255:
+            errors["hostname"] = "Ensure this field has no more than 255 characters."
+        mac_address = str(row.get("mac_address") or "").strip()
+        if len(mac_address) > 17:
+            errors["mac_address"] = "Ensure this field has no more than 17 characters."
+
+        try:
+            ip = _ip(str(row.get("ip_address") or "").strip())
+        except ValueError:
+            errors["ip_address"] = "Enter a valid IP address."
+            return None, errors
+        key = ip_key(ip)
+
+        subnet_id = self.resolve_subnet(row.get("subnet"), key)
+        if subnet_id is None:
+            errors["subnet"] = f"No subnet in this project matches {row.get('subnet') or ip}."
+            return None, errors
+        network, first, last = self.subnets[subnet_id]
+        if not first <= key <= last:
+            errors["ip_address"] = f"IP {ip} is not within subnet {network}"
+        elif key in self.used:
+            errors["ip_address"] = f"IP {ip} is already used in this project"
+
+        dhcp_pool_id = None
+        pool_value = str(row.get("dhcp_pool") or "").strip()
+        if ip_type == Host.IPType.STATIC:
+            if pool_value:
+                errors["dhcp_pool"] = "Static IP hosts cannot have a DHCP pool."
+            elif self.pool_containing(subnet_id, key) is not None:
+                errors["ip_address"] = f"Static IP {ip} falls within a DHCP pool"
+        elif ip_type == Host.IPType.DHCP_LEASE:
+            dhcp_pool_id = int(pool_value) if pool_value.isdigit() else self.pool_containing(subnet_id, key)
+            pool = self.pools.get(dhcp_pool_id)
+            if pool is None:
+                errors["dhcp_pool"] = "DHCP lease hosts must have a DHCP pool."
+            elif pool[0] != subnet_id:
+                errors["dhcp_pool"] = "DHCP pool must belong to the same subnet as the host."
+            elif not pool[1] <= key <= pool[2]:
+                errors["ip_address"] = f"Lease IP {ip} is not within the pool range"
+
+        if errors:
+            return None, errors
+        self.used.add(key)
+        return Host(
+            subnet_id=subnet_id, ip_address=str(ip), hostname=hostname, mac_address=mac_address,
+            device_type=device_type, ip_type=ip_type, dhcp_pool_id=dhcp_pool_id,
+            description=str(row.get("description") or ""),
+        ), None
+
+
+def import_hosts(project, rows, atomic=False, dry_run=False):
+    """Validate ``rows`` (dicts keyed by HOST_IMPORT_FIELDS) and bulk-insert the valid ones.
+
+    With ``atomic`` nothing is inserted if any row fails. Returns a summary
+    with the number of hosts created and a list of per-row errors (rows are
+    numbered from 1).
+    """
+    with transaction.atomic():
+        # Serialize imports into the same project so the index stays authoritative
+        Project.objects.select_for_update().filter(pk=project.pk).first()
+        index = ProjectAddressIndex(project)
+
+        hosts, errors = [], []
+        for number, row in enumerate(rows, start=1):
+            host, row_errors = index.validate_host(row)
+            if row_errors:
+                errors.append({"row": number, "errors": row_errors})
+            else:
+                hosts.append(host)
+
+        if dry_run or (atomic and errors):
+            hosts = []
+        if hosts:
+            Host.objects.bulk_create(hosts, batch_size=1000)
+            bump_project_revision(project.pk)
+
+    return {"total": len(rows), "created": len(hosts), "errors": errors}
+
+
+def _project_ids(hosts):
+    return list(hosts.order_by().values_list("project_id", flat=True).distinct())
+
+
+def update_hosts(hosts, values):
+    """Apply already-validated ``values`` to every host in ``hosts`` with one UPDATE."""
+    with transaction.atomic():
+        project_ids = _project_ids(hosts)
+        count = Host.objects.filter(pk__in=hosts.order_by().values("pk")).update(
+            **values, updated_at=timezone.now(),
+        )
+        bump_project_revision(*project_ids)
+    return count
+
+
+def delete_hosts(hosts):
+    """Delete every host in ``hosts`` with one DELETE.
+
+    Nothing references hosts, so this skips Django's deletion collector,
+    which would otherwise load each row to send delete signals.
+    """
+    with transaction.atomic():
+        project_ids = _project_ids(hosts)
+        ids = list(hosts.order_by().values_list("pk", flat=True))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {Host._meta.db_table} WHERE {Host._meta.pk.column} = ANY(%s)", [ids])
+            count = cursor.rowcount
+        bump_project_revision(*project_ids)
+    return count
@@ -0,0 +1,126 @@
+"""Find address space that collides across projects.
+
+``check_subnet_overlap`` and ``check_ip_duplicate_in_project`` only look
+inside one project, but tunnels can join projects, so two customers'
+10.0.0.0/16 may end up routed to each other. Overlapping prefixes are found
+with one sorted sweep over integer ranges; duplicate addresses with one
+grouped query over hosts and tunnel endpoints.
+"""
+import heapq
+
+from django.db import connection
+
+from .addresses import network as parse_network
+from .models import Subnet, Tunnel
+
+DEFAULT_REPORT_LIMIT = 1000
+MAX_REPORT_LIMIT = 100000
+
+
+class ConflictReportError(Exception):
+    pass
+
+
+def _ranges():
+    """``(version, first, last, item)`` for every subnet and tunnel subnet, as plain ints."""
+    sources = [
+        ("subnet", Subnet.objects.order_by().values_list("id", "project_id", "network")),
+        ("tunnel", Tunnel.objects.order_by().values_list("id", "project_id", "tunnel_subnet")),
+    ]
+    for kind, rows in sources:
+        for pk, project_id, network in rows.iterator(chunk_size=10000):
+            net = parse_network(network)
+            item = {"kind": kind, "id": pk, "project_id": project_id, "network": str(net)}
+            yield net.version, int(net.network_address), int(net.broadcast_address), item
+
+
+def overlapping_prefixes():
+    """Yield ``(a, b)`` for every pair of prefixes from different projects that share addresses.
+
+    Ranges are visited in order of their first address while a heap keeps the
+    ones still open, so each range is compared only with those it overlaps.
+    """
+    ranges = sorted(_ranges(), key=lambda r: (r[0], r[1], -r[2]))
+    open_ranges = []
+    version = None
+    for i, (ver, first, last, item) in enumerate(ranges):
+        if ver != version:
+            open_ranges, version = [], ver
+        while open_ranges and open_ranges[0][0] < first:
+            heapq.heappop(open_ranges)
+        for _, j in open_ranges:
+            other = ranges[j][3]
+            if other["project_id"] != item["project_id"]:
+                yield other, item
+        heapq.heappush(open_ranges, (last, i))
+
+
+# Every host and tunnel endpoint address with the project it belongs to. A
+# tunnel's B side belongs to site B's project, which differs from the
+# tunnel's own project for cross-project tunnels.
+DUPLICATE_ADDRESSES_SQL = """
+    SELECT host(ip), json_agg(json_build_object(
+        'kind', kind, 'id', id, 'project_id', project_id, 'name', name
+    ) ORDER BY project_id, kind, id)
+    FROM (
+        SELECT set_masklen(addr, CASE WHEN family(addr) = 4 THEN 32 ELSE 128 END) AS ip, project_id, kind, id, name
+        FROM (
+            SELECT h.ip_address AS addr, s.project_id, 'host' AS kind, h.id, h.hostname AS name
+            FROM ipam_host h JOIN ipam_subnet s ON s.id = h.subnet_id
+            UNION ALL
+            SELECT t.ip_a, t.project_id, 'tunnel_a', t.id, t.name FROM ipam_tunnel t
+            UNION ALL
+            SELECT t.ip_b, COALESCE(sb.project_id, t.project_id), 'tunnel_b', t.id, t.name
+            FROM ipam_tunnel t LEFT JOIN projects_site sb ON sb.id = t.site_b_id
+        ) owned
+    ) addresses
+    GROUP BY ip
+    HAVING count(DISTINCT project_id) > 1
+    ORDER BY ip
+"""
+
+
+def duplicate_addresses():
+    """Yield ``(ip, owners)`` for every address held by hosts or tunnel endpoints of more than one project."""
+    with connection.cursor() as cursor:
+        cursor.execute(DUPLICATE_ADDRESSES_SQL)
+        while rows := cursor.fetchmany(5000):
+            for ip, owners in rows:
+                yield ip, owners
+
+
+def conflict_report(project_ids=None, limit=DEFAULT_REPORT_LIMIT):
+    """Overlapping prefixes and duplicate addresses across projects, at most ``limit`` of each.
+
+    With ``project_ids``, only conflicts involving one of those projects are
+    reported. ``counts`` always has the full totals.
+    """
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 0 <= limit <= MAX_REPORT_LIMIT:
+        raise ConflictReportError(f"limit must be between 0 and {MAX_REPORT_LIMIT}.")
+    if project_ids is not None:
+        project_ids = set(project_ids)
+
+    overlaps = []
+    overlap_count = 0
+    for a, b in overlapping_prefixes():
+        if project_ids is not None and a["project_id"] not in project_ids and b["project_id"] not in project_ids:
+            continue
+        overlap_count += 1
+        if len(overlaps) < limit:
+            overlaps.append({"a": a, "b": b})
+
+    duplicates = []
+    duplicate_count = 0
+    for ip, owners in duplicate_addresses():
+        if project_ids is not None and not any(o["project_id"] in project_ids for o in owners):
+            continue
+        duplicate_count += 1
+        if len(duplicates) < limit:
+            duplicates.append({"ip": ip, "owners": owners})
+
+    return {
+        "overlaps": overlaps,
+        "duplicates": duplicates,
+        "counts": {"overlaps": overlap_count, "duplicates": duplicate_count},
+        "truncated": overlap_count > len(overlaps) or duplicate_count > len(duplicates),
+    }
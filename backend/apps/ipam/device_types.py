@@ -0,0 +1,79 @@
+"""Process-local registry of device types.
+
+Every host write checks its device type, and device types change maybe once
+a month, so each process keeps them in memory. A committed write moves a
+version key in the shared cache; processes compare it at most every
+``DEVICE_TYPE_CHECK_INTERVAL`` seconds and reload when it has changed. An
+unknown value always triggers a check first, so a type just added on
+another worker is accepted straight away.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DeviceType
+
+VERSION_KEY = "ipam:device-types:version"
+
+
+class DeviceTypeRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels = None  # value -> label, in display order
+        self._version = None
+        self._checked_at = 0.0
+
+    def _shared_version(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # Never set or evicted: agree on a fresh one, which makes everyone reload once
+            cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def _current(self, check=False):
+        now = time.monotonic()
+        with self._lock:
+            fresh = now - self._checked_at < settings.DEVICE_TYPE_CHECK_INTERVAL
+            if self._labels is not None and fresh and not check:
+                return self._labels
+            version = self._shared_version()
+            if self._labels is None or version != self._version:
+                self._labels = dict(DeviceType.objects.values_list("value", "label"))
+                self._version = version
+            self._checked_at = now
+            return self._labels
+
+    def labels(self):
+        """``{value: label}`` of every device type, in display order."""
+        return dict(self._current())
+
+    def label(self, value):
+        return self._current().get(value, value)
+
+    def is_known(self, value):
+        return value in self._current() or value in self._current(check=True)
+
+    def invalidate(self):
+        """Drop this process's copy; the next lookup reloads."""
+        with self._lock:
+            self._labels = None
+
+    def changed(self):
+        """Reload here now and everywhere else once the current transaction commits."""
+        self.invalidate()
+        transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+registry = DeviceTypeRegistry()
+
+
+@receiver([post_save, post_delete], sender=DeviceType)
+def device_type_changed(sender, **kwargs):
+    registry.changed()
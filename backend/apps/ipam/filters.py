@@ -39,8 +39,8 @@ class TunnelFilter(django_filters.FilterSet):
 
 
 class HostFilter(django_filters.FilterSet):
-    project = django_filters.NumberFilter(field_name="subnet__project_id")
-    site = django_filters.NumberFilter(field_name="subnet__site_id")
+    project = django_filters.NumberFilter(field_name="project_id")
+    site = django_filters.NumberFilter(field_name="site_id")
     vlan = django_filters.NumberFilter(field_name="subnet__vlan_id")
     subnet = django_filters.NumberFilter(field_name="subnet_id")
     dhcp_pool = django_filters.NumberFilter(field_name="dhcp_pool_id")
@@ -52,8 +52,8 @@ class HostFilter(django_filters.FilterSet):
 
 
 class DHCPPoolFilter(django_filters.FilterSet):
-    project = django_filters.NumberFilter(field_name="subnet__project_id")
-    site = django_filters.NumberFilter(field_name="subnet__site_id")
+    project = django_filters.NumberFilter(field_name="project_id")
+    site = django_filters.NumberFilter(field_name="site_id")
     subnet = django_filters.NumberFilter(field_name="subnet_id")
 
     class Meta:
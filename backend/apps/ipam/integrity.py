@@ -0,0 +1,166 @@
+"""Whole-database consistency checks for data that bypassed the validators.
+
+Restores through ``DataImportView`` and ``loaddata`` write rows directly, so
+nothing guarantees what ``validators.py`` enforces on the API path. Each
+check here is one set-based query per project that returns the offending
+rows; projects are checked in parallel on a process pool.
+"""
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.db import connection
+
+from apps.exports.pool import make_pool
+from apps.projects.models import Project
+
+
+def _addr(column):
+    """SQL for the bare address of an inet column, ignoring any stored mask."""
+    return f"host({column})::inet"
+
+
+# name -> SQL returning (kind, id, detail) for one project (%(project)s)
+CHECKS = {
+    "host_in_subnet": f"""
+        SELECT 'host', h.id, host(h.ip_address) || ' is outside ' || s.network::text
+        FROM ipam_host h JOIN ipam_subnet s ON s.id = h.subnet_id
+        WHERE s.project_id = %(project)s AND NOT {_addr('h.ip_address')} <<= s.network
+    """,
+    "lease_in_pool": f"""
+        SELECT 'host', h.id, host(h.ip_address) || ' is outside pool '
+            || host(p.start_ip) || '-' || host(p.end_ip)
+            || CASE WHEN p.subnet_id <> h.subnet_id THEN ' of another subnet' ELSE '' END
+        FROM ipam_host h
+        JOIN ipam_subnet s ON s.id = h.subnet_id
+        JOIN ipam_dhcp_pool p ON p.id = h.dhcp_pool_id
+        WHERE s.project_id = %(project)s AND h.ip_type = 'dhcp_lease' AND (
+            p.subnet_id <> h.subnet_id
+            OR {_addr('h.ip_address')} NOT BETWEEN {_addr('p.start_ip')} AND {_addr('p.end_ip')}
+        )
+    """,
+    "static_not_in_pool": f"""
+        SELECT 'host', h.id, 'static ' || host(h.ip_address) || ' is inside pool '
+            || host(p.start_ip) || '-' || host(p.end_ip)
+        FROM ipam_host h
+        JOIN ipam_subnet s ON s.id = h.subnet_id
+        JOIN ipam_dhcp_pool p ON p.subnet_id = h.subnet_id
+        WHERE s.project_id = %(project)s AND h.ip_type = 'static'
+            AND {_addr('h.ip_address')} BETWEEN {_addr('p.start_ip')} AND {_addr('p.end_ip')}
+    """,
+    "pool_in_subnet": f"""
+        SELECT 'dhcp_pool', p.id, host(p.start_ip) || '-' || host(p.end_ip) || CASE
+            WHEN {_addr('p.start_ip')} > {_addr('p.end_ip')} THEN ' starts after it ends'
+            ELSE ' is not inside ' || s.network::text END
+        FROM ipam_dhcp_pool p JOIN ipam_subnet s ON s.id = p.subnet_id
+        WHERE s.project_id = %(project)s AND (
+            NOT {_addr('p.start_ip')} <<= s.network
+            OR NOT {_addr('p.end_ip')} <<= s.network
+            OR {_addr('p.start_ip')} > {_addr('p.end_ip')}
+        )
+    """,
+    "pool_overlap": f"""
+        SELECT 'dhcp_pool', a.id, host(a.start_ip) || '-' || host(a.end_ip) || ' overlaps pool '
+            || b.id || ' (' || host(b.start_ip) || '-' || host(b.end_ip) || ')'
+        FROM ipam_dhcp_pool a
+        JOIN ipam_dhcp_pool b ON b.subnet_id = a.subnet_id AND b.id > a.id
+        JOIN ipam_subnet s ON s.id = a.subnet_id
+        WHERE s.project_id = %(project)s
+            AND {_addr('a.start_ip')} <= {_addr('b.end_ip')} AND {_addr('b.start_ip')} <= {_addr('a.end_ip')}
+    """,
+    # Hosts plus both tunnel endpoints; as in the conflict report, a tunnel's
+    # B side counts towards site B's project.
+    "ip_unique": f"""
+        SELECT (array_agg(kind ORDER BY kind, id))[1], (array_agg(id ORDER BY kind, id))[1],
+            host(ip) || ' is used ' || count(*) || ' times: ' || string_agg(kind || ' ' || id, ', ' ORDER BY kind, id)
+        FROM (
+            SELECT {_addr('h.ip_address')} AS ip, 'host' AS kind, h.id
+            FROM ipam_host h JOIN ipam_subnet s ON s.id = h.subnet_id
+            WHERE s.project_id = %(project)s
+            UNION ALL
+            SELECT {_addr('t.ip_a')}, 'tunnel', t.id FROM ipam_tunnel t WHERE t.project_id = %(project)s
+            UNION ALL
+            SELECT {_addr('t.ip_b')}, 'tunnel', t.id
+            FROM ipam_tunnel t LEFT JOIN projects_site sb ON sb.id = t.site_b_id
+            WHERE COALESCE(sb.project_id, t.project_id) = %(project)s
+        ) addresses
+        GROUP BY ip HAVING count(*) > 1
+    """,
+    "subnet_overlap": """
+        SELECT 'subnet', a.id, a.network::text || ' overlaps subnet ' || b.id || ' (' || b.network::text || ')'
+        FROM ipam_subnet a
+        JOIN ipam_subnet b ON b.project_id = a.project_id AND b.id > a.id AND a.network && b.network
+        WHERE a.project_id = %(project)s
+    """,
+}
+
+
+class IntegrityCheckError(Exception):
+    pass
+
+
+def check_project(project_id, checks):
+    """Run ``checks`` against one project; returns ``[{check, kind, id, detail}, ...]``.
+
+    Runs inside pool workers, so it takes and returns plain picklable values.
+    """
+    problems = []
+    with connection.cursor() as cursor:
+        for name in checks:
+            cursor.execute(CHECKS[name], {"project": project_id})
+            problems.extend(
+                {"check": name, "project_id": project_id, "kind": kind, "id": pk, "detail": detail}
+                for kind, pk, detail in cursor.fetchall()
+            )
+    return problems
+
+
+def _checked_projects(project_ids, checks, workers):
+    if workers <= 1:
+        for project_id in project_ids:
+            yield check_project(project_id, checks)
+        return
+
+    pool = make_pool(workers)
+    try:
+        futures = [pool.submit(check_project, project_id, checks) for project_id in project_ids]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_integrity_checks(project_ids=None, checks=None, workers=None):
+    """Check the given projects (default: all) and return a report.
+
+    ``{"ok", "projects", "checks", "counts": {check: n}, "problems": [...]}``
+    with problems sorted by project, check and object id.
+    """
+    checks = list(checks or CHECKS)
+    unknown = [name for name in checks if name not in CHECKS]
+    if unknown:
+        raise IntegrityCheckError(f"Unknown check(s): {', '.join(unknown)}. Choose from: {', '.join(CHECKS)}.")
+    existing = Project.objects.order_by("pk").values_list("pk", flat=True)
+    if project_ids is not None:
+        existing = existing.filter(pk__in=project_ids)
+        missing = set(project_ids) - set(existing)
+        if missing:
+            raise IntegrityCheckError(f"Unknown project id(s): {', '.join(map(str, sorted(missing)))}")
+    project_ids = list(existing)
+
+    workers = settings.IPAM_CHECK_WORKERS if workers is None else workers
+    problems = [
+        problem
+        for found in _checked_projects(project_ids, checks, min(workers, len(project_ids)))
+        for problem in found
+    ]
+    problems.sort(key=lambda p: (p["project_id"], checks.index(p["check"]), p["id"]))
+    counts = dict.fromkeys(checks, 0)
+    for problem in problems:
+        counts[problem["check"]] += 1
+    return {
+        "ok": not problems,
+        "projects": len(project_ids),
+        "checks": checks,
+        "counts": counts,
+        "problems": problems,
+    }
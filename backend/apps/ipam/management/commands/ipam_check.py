@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ipam.integrity import CHECKS, IntegrityCheckError, run_integrity_checks
+
+
+class Command(BaseCommand):
+    help = "Verify IPAM invariants across the whole database and print a JSON report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int, help="Projects to check (default: all)")
+        parser.add_argument(
+            "-c", "--check", dest="checks", action="append", choices=list(CHECKS),
+            help="Check to run; repeat for several (default: all)",
+        )
+        parser.add_argument("-w", "--workers", type=int, help="Worker processes (default: IPAM_CHECK_WORKERS)")
+        parser.add_argument(
+            "--fail-on-problems", action="store_true", help="Exit with an error status if anything is found",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = run_integrity_checks(
+                options["project_ids"] or None, options["checks"], options["workers"],
+            )
+        except IntegrityCheckError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if options["fail_on_problems"] and not report["ok"]:
+            raise CommandError(f"{len(report['problems'])} problem(s) found")
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ipam.conflicts import MAX_REPORT_LIMIT, ConflictReportError, conflict_report
+
+
+class Command(BaseCommand):
+    help = "Report subnets that overlap and addresses that are duplicated across projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int, help="Only conflicts involving these projects")
+        parser.add_argument(
+            "-l", "--limit", type=int, default=MAX_REPORT_LIMIT,
+            help=f"Most conflicts of each kind to list (default: {MAX_REPORT_LIMIT})",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            report = conflict_report(options["project_ids"] or None, options["limit"])
+        except ConflictReportError as e:
+            raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for pair in report["overlaps"]:
+            a, b = pair["a"], pair["b"]
+            self.stdout.write(
+                f"overlap  {a['network']} ({a['kind']} {a['id']}, project {a['project_id']})"
+                f"  {b['network']} ({b['kind']} {b['id']}, project {b['project_id']})"
+            )
+        for duplicate in report["duplicates"]:
+            owners = ", ".join(f"{o['kind']} {o['id']} (project {o['project_id']})" for o in duplicate["owners"])
+            self.stdout.write(f"duplicate  {duplicate['ip']}  {owners}")
+
+        counts = report["counts"]
+        style = self.style.WARNING if counts["overlaps"] or counts["duplicates"] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{counts['overlaps']} overlapping prefix pair(s), {counts['duplicates']} duplicate address(es)"
+            + (" (list truncated)" if report["truncated"] else "")
+        ))
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:16
+
+import apps.ipam.addresses
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipam', '0008_device_type_configurable'),
+        ('projects', '0007_deletion_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dhcppool',
+            name='end_ip_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('end_ip'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='dhcppool',
+            name='start_ip_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('start_ip'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='host',
+            name='ip_address_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('ip_address'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='subnet',
+            name='broadcast_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4BroadcastInt('network'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='subnet',
+            name='gateway_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('gateway'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='subnet',
+            name='network_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('network'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='tunnel',
+            name='ip_a_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('ip_a'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddField(
+            model_name='tunnel',
+            name='ip_b_int',
+            field=models.GeneratedField(db_persist=True, expression=apps.ipam.addresses.IPv4Int('ip_b'), output_field=models.BigIntegerField(), serialize=False),
+        ),
+        migrations.AddIndex(
+            model_name='dhcppool',
+            index=models.Index(fields=['subnet', 'start_ip_int'], name='ipam_dhcp_p_subnet__6ea786_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='host',
+            index=models.Index(fields=['subnet', 'ip_address_int'], name='ipam_host_subnet__aba38b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subnet',
+            index=models.Index(fields=['project', 'network_int'], name='ipam_subnet_project_85d3bb_idx'),
+        ),
+    ]
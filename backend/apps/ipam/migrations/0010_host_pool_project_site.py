@@ -0,0 +1,148 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:32
+
+import apps.ipam.addresses
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+UPDATE ipam_host h SET project_id = s.project_id, site_id = s.site_id FROM ipam_subnet s WHERE s.id = h.subnet_id;
+UPDATE ipam_dhcp_pool p SET project_id = s.project_id, site_id = s.site_id FROM ipam_subnet s WHERE s.id = p.subnet_id;
+"""
+
+# Hosts and pools copy project/site from their subnet whenever they are
+# inserted or change subnet, and follow a subnet that moves. bulk_create,
+# loaddata and set-based updates never call save(), so this lives here.
+TRIGGERS_SQL = """
+CREATE FUNCTION ipam_copy_subnet_scope() RETURNS trigger AS $$
+BEGIN
+    SELECT s.project_id, s.site_id INTO NEW.project_id, NEW.site_id FROM ipam_subnet s WHERE s.id = NEW.subnet_id;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ipam_host_subnet_scope
+    BEFORE INSERT OR UPDATE OF subnet_id, project_id, site_id ON ipam_host
+    FOR EACH ROW EXECUTE FUNCTION ipam_copy_subnet_scope();
+
+CREATE TRIGGER ipam_dhcp_pool_subnet_scope
+    BEFORE INSERT OR UPDATE OF subnet_id, project_id, site_id ON ipam_dhcp_pool
+    FOR EACH ROW EXECUTE FUNCTION ipam_copy_subnet_scope();
+
+CREATE FUNCTION ipam_move_subnet_scope() RETURNS trigger AS $$
+BEGIN
+    UPDATE ipam_host SET project_id = NEW.project_id, site_id = NEW.site_id WHERE subnet_id = NEW.id;
+    UPDATE ipam_dhcp_pool SET project_id = NEW.project_id, site_id = NEW.site_id WHERE subnet_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ipam_subnet_move_scope
+    AFTER UPDATE OF project_id, site_id ON ipam_subnet
+    FOR EACH ROW WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id OR OLD.site_id IS DISTINCT FROM NEW.site_id)
+    EXECUTE FUNCTION ipam_move_subnet_scope();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER ipam_subnet_move_scope ON ipam_subnet;
+DROP FUNCTION ipam_move_subnet_scope();
+DROP TRIGGER ipam_dhcp_pool_subnet_scope ON ipam_dhcp_pool;
+DROP TRIGGER ipam_host_subnet_scope ON ipam_host;
+DROP FUNCTION ipam_copy_subnet_scope();
+"""
+
+DUPLICATE_IPS_SQL = """
+SELECT project_id, host(ip_address), string_agg(id::text, ', ' ORDER BY id), count(*) OVER ()
+FROM ipam_host GROUP BY project_id, host(ip_address) HAVING count(*) > 1
+ORDER BY project_id, host(ip_address) LIMIT 20
+"""
+
+
+def check_duplicate_host_ips(apps, schema_editor):
+    """Fail with the offending hosts before ipam_host_project_ip_unique would fail on them."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DUPLICATE_IPS_SQL)
+        rows = cursor.fetchall()
+    if not rows:
+        return
+    lines = [f"  project {project_id}, {ip}: hosts {ids}" for project_id, ip, ids, _ in rows]
+    if rows[0][3] > len(rows):
+        lines.append(f"  ... and {rows[0][3] - len(rows)} more")
+    raise RuntimeError(
+        f"{rows[0][3]} IP address(es) are assigned to more than one host in the same project, so the "
+        "ipam_host_project_ip_unique constraint can't be added. Delete or renumber the extra hosts "
+        "(`manage.py ipam_check --check ip_unique` lists them) and migrate again:\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipam', '0009_ipv4_int_columns'),
+        ('projects', '0007_deletion_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dhcppool',
+            name='project',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dhcp_pools', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='dhcppool',
+            name='site',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dhcp_pools', to='projects.site'),
+        ),
+        migrations.AddField(
+            model_name='host',
+            name='project',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hosts', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='host',
+            name='site',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hosts', to='projects.site'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='dhcppool',
+            name='project',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='dhcp_pools', to='projects.project'),
+        ),
+        migrations.AlterField(
+            model_name='dhcppool',
+            name='site',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='dhcp_pools', to='projects.site'),
+        ),
+        migrations.AlterField(
+            model_name='host',
+            name='project',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='hosts', to='projects.project'),
+        ),
+        migrations.AlterField(
+            model_name='host',
+            name='site',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='hosts', to='projects.site'),
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+        migrations.AddIndex(
+            model_name='dhcppool',
+            index=models.Index(fields=['project', 'start_ip'], name='ipam_dhcp_p_project_690225_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dhcppool',
+            index=models.Index(fields=['site', 'start_ip'], name='ipam_dhcp_p_site_id_fddae6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='host',
+            index=models.Index(fields=['project', 'ip_address'], name='ipam_host_project_0f495b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='host',
+            index=models.Index(fields=['site', 'ip_address'], name='ipam_host_site_id_8561f8_idx'),
+        ),
+        migrations.RunPython(check_duplicate_host_ips, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='host',
+            constraint=models.UniqueConstraint(models.F('project'), apps.ipam.addresses.HostAddress('ip_address'), name='ipam_host_project_ip_unique', violation_error_message='This IP address is already assigned to a host in this project.'),
+        ),
+    ]
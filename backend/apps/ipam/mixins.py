@@ -0,0 +1,73 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import CSVRenderer, NDJSONRenderer, StreamingRenderer
+
+
+class StreamingListMixin:
+    """Serve ``?format=ndjson`` and ``?format=csv`` list requests as one streamed dump.
+
+    The filtered queryset is read through a server-side cursor in chunks and
+    serialized chunk by chunk, so memory use stays flat regardless of how many
+    rows match. Pagination does not apply to these formats.
+    """
+
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer, CSVRenderer]
+    stream_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, StreamingRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = list(self.get_serializer().fields)
+        response = StreamingHttpResponse(
+            renderer.render_stream(self._stream_rows(queryset), fields),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        if renderer.format == "csv":
+            response["Content-Disposition"] = f'attachment; filename="{self.basename}.csv"'
+        return response
+
+    def _stream_rows(self, queryset):
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(rows, self.stream_chunk_size)):
+            yield from self.get_serializer(chunk, many=True).data
+
+
+class ValuesReadMixin:
+    """Serve list and retrieve from ``read_serializer_class`` rows instead of model instances.
+
+    Filtering, search, ordering and pagination apply to the queryset as
+    usual; only the selected columns are read and no model is built.
+    Object permissions are not checked on retrieve, so this is for views
+    whose permissions allow every safe request.
+    """
+
+    read_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(request.accepted_renderer, StreamingRenderer):
+            return super().list(request, *args, **kwargs)
+        serializer = self.read_serializer_class
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([serializer.to_representation(row) for row in page])
+        return Response([serializer.to_representation(row) for row in rows])
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = self.read_serializer_class.rows(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(rows, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(self.read_serializer_class.to_representation(row))
+
+    def _stream_rows(self, queryset):
+        serializer = self.read_serializer_class
+        for row in serializer.rows(queryset).iterator(chunk_size=self.stream_chunk_size):
+            yield serializer.to_representation(row)
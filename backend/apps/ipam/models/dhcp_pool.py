@@ -1,13 +1,21 @@
 from django.db import models
 from netfields import InetAddressField, NetManager
 
+from ..addresses import ip_int, ipv4_int_field
 from .subnet import Subnet
 
 
 class DHCPPool(models.Model):
     subnet = models.ForeignKey(Subnet, on_delete=models.CASCADE, related_name="dhcp_pools")
+    # Kept equal to subnet.project/site like Host's
+    project = models.ForeignKey(
+        "projects.Project", on_delete=models.CASCADE, related_name="dhcp_pools", editable=False,
+    )
+    site = models.ForeignKey("projects.Site", on_delete=models.CASCADE, related_name="dhcp_pools", editable=False)
     start_ip = InetAddressField(help_text="Start of DHCP range")
     end_ip = InetAddressField(help_text="End of DHCP range")
+    start_ip_int = ipv4_int_field("start_ip")
+    end_ip_int = ipv4_int_field("end_ip")
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -17,18 +25,23 @@ class DHCPPool(models.Model):
     class Meta:
         db_table = "ipam_dhcp_pool"
         ordering = ["start_ip"]
+        indexes = [
+            models.Index(fields=["subnet", "start_ip_int"]),
+            models.Index(fields=["project", "start_ip"]),
+            models.Index(fields=["site", "start_ip"]),
+        ]
 
     def __str__(self):
         return f"{self.start_ip} - {self.end_ip} ({self.subnet.network})"
 
-    @property
-    def project(self):
-        return self.subnet.project
+    def save(self, **kwargs):
+        if self.subnet_id:
+            self.project_id, self.site_id = self.subnet.project_id, self.subnet.site_id
+        super().save(**kwargs)
 
     @property
     def size(self):
         """Number of IP addresses in this pool range."""
-        import ipaddress
-        start = ipaddress.ip_address(str(self.start_ip).split("/")[0])
-        end = ipaddress.ip_address(str(self.end_ip).split("/")[0])
-        return int(end) - int(start) + 1
+        if self.start_ip_int is not None and self.end_ip_int is not None:
+            return self.end_ip_int - self.start_ip_int + 1
+        return ip_int(self.end_ip) - ip_int(self.start_ip) + 1
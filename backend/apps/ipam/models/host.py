@@ -1,12 +1,21 @@
 from django.db import models
 from netfields import InetAddressField, NetManager
 
+from ..addresses import HostAddress, ipv4_int_field
 from .subnet import Subnet
 
 
 class Host(models.Model):
     subnet = models.ForeignKey(Subnet, on_delete=models.CASCADE, related_name="hosts")
+    # Copies of subnet.project/site so project- and site-wide queries need no join.
+    # save() fills them in; a database trigger keeps them in step for bulk
+    # inserts, set-based updates and subnets that move (see migration 0010).
+    project = models.ForeignKey(
+        "projects.Project", on_delete=models.CASCADE, related_name="hosts", editable=False,
+    )
+    site = models.ForeignKey("projects.Site", on_delete=models.CASCADE, related_name="hosts", editable=False)
     ip_address = InetAddressField(help_text="Host IP address")
+    ip_address_int = ipv4_int_field("ip_address")
     hostname = models.CharField(max_length=255, blank=True)
     mac_address = models.CharField(max_length=17, blank=True, help_text="MAC address (XX:XX:XX:XX:XX:XX)")
     device_type = models.CharField(max_length=50, default="other")
@@ -29,11 +38,24 @@ class Host(models.Model):
     class Meta:
         db_table = "ipam_host"
         ordering = ["ip_address"]
+        indexes = [
+            models.Index(fields=["subnet", "ip_address_int"]),
+            models.Index(fields=["project", "ip_address"]),
+            models.Index(fields=["site", "ip_address"]),
+        ]
+        constraints = [
+            # One host per address and project, whatever mask the address was stored with
+            models.UniqueConstraint(
+                "project", HostAddress("ip_address"), name="ipam_host_project_ip_unique",
+                violation_error_message="This IP address is already assigned to a host in this project.",
+            ),
+        ]
 
     def __str__(self):
         name = self.hostname or str(self.ip_address)
         return f"{name} ({self.ip_address})"
 
-    @property
-    def project(self):
-        return self.subnet.project
+    def save(self, **kwargs):
+        if self.subnet_id:
+            self.project_id, self.site_id = self.subnet.project_id, self.subnet.site_id
+        super().save(**kwargs)
@@ -1,6 +1,7 @@
 from django.db import models
 from netfields import CidrAddressField, InetAddressField, NetManager
 
+from ..addresses import ipv4_int_field
 from .vlan import VLAN
 
 
@@ -17,6 +18,9 @@ class Subnet(models.Model):
     )
     network = CidrAddressField(help_text="Network in CIDR notation, e.g. 10.0.1.0/24")
     gateway = InetAddressField(blank=True, null=True, help_text="Gateway IP address")
+    network_int = ipv4_int_field("network")
+    broadcast_int = ipv4_int_field("network", broadcast=True)
+    gateway_int = ipv4_int_field("gateway")
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -26,6 +30,7 @@ class Subnet(models.Model):
     class Meta:
         db_table = "ipam_subnet"
         ordering = ["network"]
+        indexes = [models.Index(fields=["project", "network_int"])]
 
     def __str__(self):
         if self.vlan:
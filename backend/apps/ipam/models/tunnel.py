@@ -3,6 +3,8 @@ from netfields import CidrAddressField, InetAddressField, NetManager
 
 from apps.projects.models import Project, Site
 
+from ..addresses import ipv4_int_field
+
 
 class Tunnel(models.Model):
     class TunnelType(models.TextChoices):
@@ -19,6 +21,8 @@ class Tunnel(models.Model):
     ip_a = InetAddressField(help_text="Tunnel IP for site A")
     site_b = models.ForeignKey(Site, on_delete=models.CASCADE, related_name="tunnels_as_b", null=True, blank=True)
     ip_b = InetAddressField(help_text="Tunnel IP for site B")
+    ip_a_int = ipv4_int_field("ip_a")
+    ip_b_int = ipv4_int_field("ip_b")
     enabled = models.BooleanField(default=True)
     description = models.TextField(blank=True)
     external_endpoint = models.CharField(max_length=300, blank=True, default="", help_text="External endpoint name/IP (when site_b is null)")
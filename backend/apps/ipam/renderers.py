@@ -0,0 +1,59 @@
+"""Line-oriented renderers for streaming full list dumps (see StreamingListMixin)."""
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingRenderer(BaseRenderer):
+    """Renderer that can also encode an iterable of rows lazily."""
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Non-list responses (detail views, errors) are rendered in one go
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0].keys()) if rows and isinstance(rows[0], dict) else []
+        return b"".join(self.render_stream(rows, fields))
+
+    def render_stream(self, rows, fields):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render_stream(self, rows, fields):
+        encoder = JSONEncoder(ensure_ascii=False)
+        for row in rows:
+            yield (encoder.encode(row) + "\n").encode(self.charset)
+
+
+class _LineBuffer:
+    """File-like object that just returns what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render_stream(self, rows, fields):
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([self._cell(row.get(field)) for field in fields]).encode(self.charset)
+
+    @staticmethod
+    def _cell(value):
+        if value is None:
+            return ""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=JSONEncoder)
+        return value
@@ -1,9 +1,13 @@
 import re
+from contextlib import contextmanager
 
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from rest_framework import serializers
 
 from apps.projects.models import Project, Site
 from apps.projects.serializers import SiteWanAddressSerializer
+from .device_types import registry as device_types
 from .models import VLAN, Host, Subnet, Tunnel, DHCPPool, DeviceType
 from .validators import (
     check_ip_duplicate_in_project, check_ip_in_subnet, check_subnet_overlap,
@@ -27,6 +31,19 @@ class DeviceTypeSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+@contextmanager
+def _unique_ip_errors():
+    """Report a host IP taken by a concurrent write as a validation error rather than a 500."""
+    (constraint,) = Host._meta.constraints
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as e:
+        if constraint.name not in str(e):
+            raise
+        raise serializers.ValidationError({"ip_address": [constraint.violation_error_message]})
+
+
 class HostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Host
@@ -39,7 +56,7 @@ class HostSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         device_type = attrs.get("device_type") or (self.instance and self.instance.device_type)
-        if device_type and not DeviceType.objects.filter(value=device_type).exists():
+        if device_type and not device_types.is_known(device_type):
             raise serializers.ValidationError({"device_type": f"Unknown device type: {device_type}"})
 
         subnet = attrs.get("subnet") or (self.instance and self.instance.subnet)
@@ -77,6 +94,15 @@ class HostSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    # validate() checks for duplicates, but two requests can pass it together; the constraint decides
+    def create(self, validated_data):
+        with _unique_ip_errors():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with _unique_ip_errors():
+            return super().update(instance, validated_data)
+
 
 class DHCPPoolSerializer(serializers.ModelSerializer):
     lease_count = serializers.IntegerField(read_only=True, default=0)
@@ -206,6 +232,68 @@ class TunnelSerializer(serializers.ModelSerializer):
         return attrs
 
 
+# --- Fast read serializers (values() rows, list and retrieve only) ---
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+_datetime = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """Same output as a ModelSerializer's ``to_representation``, straight from ``values()`` rows.
+
+    ``fields`` lists the output keys in order; ``sources`` maps keys that
+    come from another lookup, and ``formats`` the keys whose values need
+    converting (inet/cidr objects, datetimes). No model or field instances
+    are created per row.
+    """
+    fields = []
+    sources = {}
+    formats = {}
+
+    @classmethod
+    def rows(cls, queryset):
+        renamed = {name: F(source) for name, source in cls.sources.items()}
+        return queryset.values(*(name for name in cls.fields if name not in renamed), **renamed)
+
+    @classmethod
+    def to_representation(cls, row):
+        data = {name: row[name] for name in cls.fields}
+        for name, convert in cls.formats.items():
+            if data[name] is not None:
+                data[name] = convert(data[name])
+        return data
+
+
+class HostReadSerializer(ValuesSerializer):
+    fields = HostSerializer.Meta.fields
+    formats = {"ip_address": _text, "created_at": _datetime, "updated_at": _datetime}
+
+
+class SubnetReadSerializer(ValuesSerializer):
+    fields = SubnetSerializer.Meta.fields
+    # The pool size is a SUM over numeric, so it comes out of values() as a Decimal
+    formats = {
+        "network": _text, "gateway": _text, "dhcp_pool_total_size": int,
+        "created_at": _datetime, "updated_at": _datetime,
+    }
+
+
+class TunnelReadSerializer(ValuesSerializer):
+    fields = TunnelSerializer.Meta.fields
+    sources = {
+        "site_a_name": "site_a__name",
+        "site_b_name": "site_b__name",
+        "site_b_project_id": "site_b__project_id",
+        "site_b_project_name": "site_b__project__name",
+    }
+    formats = {
+        "tunnel_subnet": _text, "ip_a": _text, "ip_b": _text, "created_at": _datetime, "updated_at": _datetime,
+    }
+
+
 # --- Topology serializers (nested, read-only) ---
 
 class HostTopologySerializer(serializers.ModelSerializer):
@@ -0,0 +1,223 @@
+"""Set-based restructuring of subnets and everything addressed inside them.
+
+Each operation checks the target address space once, then rewrites hosts,
+pools and tunnel endpoints with a handful of UPDATE statements instead of
+saving (and re-validating) rows one at a time.
+"""
+import ipaddress
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils import timezone
+from netfields import InetAddressField
+
+from apps.projects.models import Project
+from apps.projects.signals import bump_project_revision
+
+from .addresses import HostAddress, ip
+from .addresses import network as _network
+from .models import DHCPPool, Host, Subnet, Tunnel
+
+
+class SubnetOperationError(Exception):
+    pass
+
+
+def _shifted(column, old, new, only_inside=False, cast="inet"):
+    """SQL moving ``column`` from ``old`` to the same offset inside ``new``, keeping its mask length.
+
+    With ``only_inside``, values outside ``old`` are left as they are.
+    """
+    sql = f"set_masklen(%s::inet + ({column} - %s::inet), masklen({column}))::{cast}"
+    params = [str(new.network_address), str(old.network_address)]
+    if only_inside:
+        sql = f"CASE WHEN {column} <<= %s::inet THEN {sql} ELSE {column} END"
+        params = [str(old), *params]
+    return RawSQL(sql, params)
+
+
+def renumber_subnet(subnet, target):
+    """Move ``subnet`` to ``target``, shifting everything addressed inside it by the same offset.
+
+    The gateway, hosts, DHCP pool bounds and any tunnel endpoints or tunnel
+    subnets inside the old network keep their position relative to the
+    network address. ``target`` must be the same IP version and at least as
+    large, and must not overlap anything else in the project.
+    """
+    old = _network(subnet.network)
+    try:
+        new = _network(target)
+    except ValueError:
+        raise SubnetOperationError(f"Invalid network: {target}")
+    if new.version != old.version:
+        raise SubnetOperationError("The target network must be the same IP version.")
+    if new.prefixlen > old.prefixlen:
+        raise SubnetOperationError(f"{new} is smaller than {old}; everything in it would not fit.")
+    if new == old:
+        raise SubnetOperationError(f"Subnet is already {old}.")
+
+    with transaction.atomic():
+        Project.objects.select_for_update().filter(pk=subnet.project_id).first()
+
+        clash = (
+            Subnet.objects.filter(project_id=subnet.project_id, network__net_overlaps=str(new))
+            .exclude(pk=subnet.pk).first()
+        )
+        if clash:
+            raise SubnetOperationError(f"{new} overlaps with existing subnet {clash.network}.")
+        tunnels = Tunnel.objects.filter(Q(project_id=subnet.project_id) | Q(site_b__project_id=subnet.project_id))
+        clash = (
+            tunnels.filter(tunnel_subnet__net_overlaps=str(new))
+            .exclude(tunnel_subnet__net_contained_or_equal=str(old)).first()
+        )
+        if clash:
+            raise SubnetOperationError(f"{new} overlaps with tunnel {clash.name} ({clash.tunnel_subnet}).")
+
+        now = timezone.now()
+        counts = {
+            "hosts": Host.objects.filter(subnet=subnet).update(
+                ip_address=_shifted("ip_address", old, new), updated_at=now,
+            ),
+            "dhcp_pools": DHCPPool.objects.filter(subnet=subnet).update(
+                start_ip=_shifted("start_ip", old, new), end_ip=_shifted("end_ip", old, new), updated_at=now,
+            ),
+        }
+
+        # Endpoints may sit inside the subnet even when the tunnel's own /30 doesn't, so each column moves alone
+        moved = tunnels.filter(Q(ip_a__net_contained_or_equal=str(old)) | Q(ip_b__net_contained_or_equal=str(old)))
+        tunnel_project_ids = set(moved.values_list("project_id", flat=True))
+        counts["tunnels"] = moved.update(
+            ip_a=_shifted("ip_a", old, new, only_inside=True),
+            ip_b=_shifted("ip_b", old, new, only_inside=True),
+            tunnel_subnet=_shifted("tunnel_subnet", old, new, only_inside=True, cast="cidr"),
+            updated_at=now,
+        )
+
+        gateway = None
+        if subnet.gateway:
+            gateway = str(new.network_address + (int(ip(subnet.gateway)) - int(old.network_address)))
+        Subnet.objects.filter(pk=subnet.pk).update(network=str(new), gateway=gateway, updated_at=now)
+
+        bump_project_revision(subnet.project_id, *tunnel_project_ids)
+
+    subnet.refresh_from_db()
+    return counts
+
+
+MAX_SPLIT_CHILDREN = 256
+
+
+def _reassign_to_containing(subnet_ids):
+    """Point hosts and pools of ``subnet_ids`` at whichever of those subnets contains their address."""
+    def containing(column):
+        # Compare the bare address: a host stored as 10.0.0.130/24 is not inside 10.0.0.128/25 as an inet
+        address = Cast(HostAddress(OuterRef(column)), InetAddressField())
+        return Subquery(
+            Subnet.objects.filter(pk__in=subnet_ids, network__net_contains_or_equals=address).values("pk")[:1]
+        )
+
+    now = timezone.now()
+    return {
+        "hosts": Host.objects.filter(subnet_id__in=subnet_ids).update(
+            subnet_id=containing("ip_address"), updated_at=now,
+        ),
+        "dhcp_pools": DHCPPool.objects.filter(subnet_id__in=subnet_ids).update(
+            subnet_id=containing("start_ip"), updated_at=now,
+        ),
+    }
+
+
+def split_subnet(subnet, prefix, vlans=None):
+    """Split ``subnet`` into ``/prefix`` children, moving hosts and pools into the child that contains them.
+
+    ``subnet`` itself becomes the first child. Children inherit the VLAN and
+    description unless ``vlans`` gives one VLAN (or None) per child, and get
+    their gateway at the same position within the block as the parent's.
+    Returns ``(children, counts)``.
+    """
+    old = _network(subnet.network)
+    if isinstance(prefix, bool) or not isinstance(prefix, int) or not old.prefixlen < prefix <= old.max_prefixlen:
+        raise SubnetOperationError(f"prefix must be longer than /{old.prefixlen}.")
+    if 2 ** (prefix - old.prefixlen) > MAX_SPLIT_CHILDREN:
+        raise SubnetOperationError(f"At most {MAX_SPLIT_CHILDREN} subnets per split.")
+    networks = list(old.subnets(new_prefix=prefix))
+    if vlans is not None and len(vlans) != len(networks):
+        raise SubnetOperationError(f"vlans must list one VLAN (or null) for each of the {len(networks)} subnets.")
+
+    with transaction.atomic():
+        Project.objects.select_for_update().filter(pk=subnet.project_id).first()
+
+        if networks[0].num_addresses > 2:
+            edges = [str(a) for net in networks for a in (net.network_address, net.broadcast_address)]
+            stranded = (
+                Host.objects.filter(subnet=subnet).alias(address=HostAddress("ip_address"))
+                .filter(address__in=edges).first()
+            )
+            if stranded:
+                raise SubnetOperationError(
+                    f"Host {stranded} would sit on a network or broadcast address after the split."
+                )
+        for pool in DHCPPool.objects.filter(subnet=subnet):
+            start, end = ip(pool.start_ip), ip(pool.end_ip)
+            if not any(start in net and end in net for net in networks):
+                raise SubnetOperationError(f"DHCP pool {start}-{end} would span more than one subnet.")
+
+        gateway_offset = None
+        if subnet.gateway:
+            gateway_offset = int(ip(subnet.gateway)) - int(old.network_address)
+        children = []
+        for i, net in enumerate(networks):
+            child = subnet if i == 0 else Subnet(
+                project_id=subnet.project_id, site_id=subnet.site_id, vlan_id=subnet.vlan_id,
+                description=subnet.description,
+            )
+            child.network = str(net)
+            child.gateway = None
+            if gateway_offset is not None:
+                gateway = net.network_address + gateway_offset % net.num_addresses
+                if net.num_addresses <= 2 or net.network_address < gateway < net.broadcast_address:
+                    child.gateway = str(gateway)
+            if vlans is not None:
+                child.vlan_id = vlans[i]
+            children.append(child)
+
+        subnet.save(update_fields=["network", "gateway", "vlan", "updated_at"])
+        Subnet.objects.bulk_create(children[1:])
+        counts = _reassign_to_containing([c.pk for c in children])
+        bump_project_revision(subnet.project_id)
+    return children, counts
+
+
+def merge_subnets(subnets):
+    """Merge ``subnets`` (same site, together forming exactly one CIDR) into the first of them.
+
+    Hosts and pools of the others move to the merged subnet before those
+    rows are deleted, so nothing is cascaded away. Returns ``(subnet, counts)``.
+    """
+    if len(subnets) < 2:
+        raise SubnetOperationError("Select at least two subnets to merge.")
+    keeper = subnets[0]
+    if any(s.site_id != keeper.site_id for s in subnets):
+        raise SubnetOperationError("Only subnets of the same site can be merged.")
+    networks = [_network(s.network) for s in subnets]
+    if len({n.version for n in networks}) > 1:
+        raise SubnetOperationError("Cannot merge IPv4 and IPv6 subnets.")
+    merged = list(ipaddress.collapse_addresses(networks))
+    if len(merged) != 1:
+        raise SubnetOperationError("The subnets must be adjacent and together form a single network.")
+    merged = merged[0]
+
+    with transaction.atomic():
+        Project.objects.select_for_update().filter(pk=keeper.project_id).first()
+        others = [s.pk for s in subnets[1:]]
+        now = timezone.now()
+        counts = {
+            "hosts": Host.objects.filter(subnet_id__in=others).update(subnet_id=keeper.pk, updated_at=now),
+            "dhcp_pools": DHCPPool.objects.filter(subnet_id__in=others).update(subnet_id=keeper.pk, updated_at=now),
+        }
+        Subnet.objects.filter(pk__in=others).delete()
+        keeper.network = str(merged)
+        keeper.save(update_fields=["network", "updated_at"])
+    return keeper, counts
@@ -0,0 +1,92 @@
+import ipaddress
+
+import pytest
+
+from apps.ipam.addresses import address_ints, ip, ip_int, ip_key, network
+from apps.ipam.models import DHCPPool, Host, Subnet, Tunnel
+from apps.ipam.subnet_ops import renumber_subnet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Campus", created_by=admin_user)
+
+
+@pytest.fixture
+def site(project):
+    return Site.objects.create(project=project, name="HQ")
+
+
+@pytest.fixture
+def subnet(project, site):
+    return Subnet.objects.create(project=project, site=site, network="10.0.0.0/24", gateway="10.0.0.1")
+
+
+class TestConversions:
+    def test_ip_accepts_every_inet_shape(self):
+        expected = ipaddress.ip_address("10.0.0.5")
+        for value in ("10.0.0.5", "10.0.0.5/24", expected, ipaddress.ip_interface("10.0.0.5/24")):
+            assert ip(value) == expected
+        assert ip_int("2001:db8::1/64") == int(ipaddress.ip_address("2001:db8::1"))
+
+    def test_network_and_keys(self):
+        assert str(network("10.0.0.7/24")) == "10.0.0.0/24"
+        assert ip_key(ip("255.255.255.255")) < ip_key(ip("::"))
+
+
+@pytest.mark.django_db
+class TestIntegerColumns:
+    def test_generated_on_insert_and_update(self, project, subnet):
+        host = Host.objects.create(subnet=subnet, ip_address="10.0.0.20/24")
+        pool = DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.199")
+        base = int(ipaddress.ip_address("10.0.0.0"))
+
+        subnet.refresh_from_db()
+        host.refresh_from_db()
+        assert (subnet.network_int, subnet.broadcast_int, subnet.gateway_int) == (base, base + 255, base + 1)
+        assert host.ip_address_int == base + 20
+        assert pool.size == 100
+
+        # Set-based rewrites never call save(), and the columns still follow
+        renumber_subnet(subnet, "10.1.0.0/24")
+        host.refresh_from_db()
+        assert host.ip_address_int == int(ipaddress.ip_address("10.1.0.20"))
+        assert address_ints(Host.objects.filter(subnet=subnet), "ip_address", 4) == [host.ip_address_int]
+
+    def test_ipv6_falls_back_to_inet(self, project, site):
+        subnet = Subnet.objects.create(project=project, site=site, network="2001:db8::/64")
+        Host.objects.create(subnet=subnet, ip_address="2001:db8::10")
+        pool = DHCPPool.objects.create(subnet=subnet, start_ip="2001:db8::100", end_ip="2001:db8::1ff")
+
+        subnet.refresh_from_db()
+        pool.refresh_from_db()
+        assert subnet.network_int is None
+        assert pool.start_ip_int is None
+        assert pool.size == 256
+        assert address_ints(subnet.hosts.all(), "ip_address", 6) == [ip_int("2001:db8::10")]
+
+
+@pytest.mark.django_db
+class TestAddressSuggestions:
+    def test_next_free_ip(self, api_client, project, site, subnet):
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.2")
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.3", end_ip="10.0.0.9")
+        Tunnel.objects.create(
+            project=project, name="gre", tunnel_type="gre", tunnel_subnet="10.0.0.8/30",
+            site_a=site, ip_a="10.0.0.10", ip_b="10.0.0.11",
+        )
+        resp = api_client.get(f"/api/v1/subnets/{subnet.id}/next-free-ip/")
+        assert resp.data == {"next_free_ip": "10.0.0.12"}
+
+    def test_next_free_ip_in_pool(self, api_client, subnet):
+        pool = DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.101")
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.100", ip_type="dhcp_lease", dhcp_pool=pool)
+        resp = api_client.get(f"/api/v1/subnets/{subnet.id}/next-free-ip/?pool={pool.id}")
+        assert resp.data == {"next_free_ip": "10.0.0.101"}
+
+    def test_suggested_pool_range(self, api_client, subnet):
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.50")
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.60", end_ip="10.0.0.99")
+        resp = api_client.get(f"/api/v1/subnets/{subnet.id}/suggested-pool-range/")
+        assert resp.data == {"start_ip": "10.0.0.100", "end_ip": "10.0.0.254", "size": 155}
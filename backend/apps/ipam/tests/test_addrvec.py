@@ -0,0 +1,107 @@
+import ipaddress
+import random
+
+import pytest
+
+from apps.ipam import addrvec
+from apps.ipam.allocation import BlockAllocator
+from apps.ipam.models import DHCPPool, Host, Subnet
+from apps.projects.models import Project, Site
+
+V6_BASE = int(ipaddress.ip_address("2001:db8::"))
+# Straddles the boundary between the two 64-bit halves
+V6_CARRY = int(ipaddress.ip_address("2001:db8:0:0:ffff:ffff:ffff:ff00"))
+
+
+def random_pairs(rng, base, span, count):
+    pairs = []
+    for _ in range(count):
+        start = base + rng.randrange(span)
+        pairs.append((start, start + rng.choice([0, 0, 1, 5, 40])))
+    return pairs
+
+
+def brute_gaps(pairs, first, last):
+    covered = {v for a, b in pairs for v in range(a, b + 1)}
+    gaps, start = [], None
+    for v in range(first, last + 2):
+        free = v <= last and v not in covered
+        if free and start is None:
+            start = v
+        elif not free and start is not None:
+            gaps.append((start, v - 1))
+            start = None
+    return gaps
+
+
+class TestAddrvec:
+    @pytest.mark.parametrize("base,version", [
+        (0, 4), (int(ipaddress.ip_address("10.0.0.0")), 4), (V6_BASE, 6), (V6_CARRY, 6),
+    ])
+    def test_matches_brute_force(self, base, version):
+        rng = random.Random(base)
+        pairs = random_pairs(rng, base, 600, 200)
+        first, last = base, base + 700
+        gaps = brute_gaps(pairs, first, last)
+        covered = {v for a, b in pairs for v in range(a, b + 1)}
+
+        merged = addrvec.merge_intervals(pairs, version)
+        assert {v for a, b in merged for v in range(a, b + 1)} == covered
+        assert all(b1 + 1 < a2 for (_, b1), (a2, _) in zip(merged, merged[1:]))
+
+        assert addrvec.first_free(pairs, first, last, version) == gaps[0][0]
+        best = max(gaps, key=lambda g: (g[1] - g[0], -g[0]))
+        assert addrvec.largest_gap(pairs, first, last, version) == (*best, best[1] - best[0] + 1)
+
+        probes = [base + rng.randrange(700) for _ in range(300)]
+        assert addrvec.contains(pairs, probes, version).tolist() == [p in covered for p in probes]
+        members = [a for a, _ in pairs]
+        assert addrvec.isin(probes, members, version).tolist() == [p in set(members) for p in probes]
+        assert addrvec.unpack(addrvec.pack(probes, version)) == probes
+
+        expected = [
+            any(i != j and a <= d and c <= b for j, (c, d) in enumerate(pairs)) for i, (a, b) in enumerate(pairs)
+        ]
+        assert addrvec.overlapping(pairs, version).tolist() == expected
+
+    def test_edges_of_the_address_space(self):
+        top = 2 ** 32 - 1
+        assert addrvec.first_free([(0, 10), (top - 5, top)], 0, top) == 11
+        assert addrvec.largest_gap([(0, top)], 0, top) is None
+        assert addrvec.largest_gap([(5, 5)], 0, top) == (6, top, top - 5)
+        assert addrvec.merge_intervals([(top, top), (0, top - 1)]) == [(0, top)]
+        top6 = 2 ** 128 - 1
+        assert addrvec.largest_gap([(1, top6 - 1)], 0, top6, 6) == (0, 0, 1)
+        assert addrvec.largest_gap([], 0, top6, 6) == (0, top6, 2 ** 128)
+
+
+@pytest.mark.django_db
+class TestVectorizedCallers:
+    @pytest.fixture
+    def busy_subnet(self, admin_user):
+        project = Project.objects.create(name="Campus", created_by=admin_user)
+        site = Site.objects.create(project=project, name="HQ")
+        subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/20", gateway="10.0.0.1")
+        rng = random.Random(7)
+        taken = rng.sample(range(2, 4000), 600)
+        Host.objects.bulk_create(
+            Host(subnet=subnet, ip_address=str(ipaddress.ip_address("10.0.0.0") + n)) for n in taken
+        )
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.2", end_ip="10.0.0.40")
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.14.0", end_ip="10.0.14.255")
+        return subnet
+
+    @pytest.mark.parametrize("path", ["next-free-ip", "suggested-pool-range"])
+    def test_same_answer_either_side_of_threshold(self, api_client, busy_subnet, monkeypatch, path):
+        url = f"/api/v1/subnets/{busy_subnet.id}/{path}/"
+        vectorized = api_client.get(url).data
+        monkeypatch.setattr(addrvec, "THRESHOLD", 10 ** 9)
+        assert api_client.get(url).data == vectorized
+
+    def test_block_allocator_bulk_load(self, monkeypatch):
+        used = [f"10.{n // 256}.{n % 256}.0/24" for n in range(0, 4000, 3)] + ["192.168.0.0/16"]
+        bulk = BlockAllocator("10.0.0.0/8", used)
+        monkeypatch.setattr(addrvec, "THRESHOLD", 10 ** 9)
+        one_by_one = BlockAllocator("10.0.0.0/8", used)
+        assert bulk._intervals == one_by_one._intervals
+        assert [str(bulk.allocate(23)) for _ in range(3)] == [str(one_by_one.allocate(23)) for _ in range(3)]
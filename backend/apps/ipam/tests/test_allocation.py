@@ -0,0 +1,112 @@
+import ipaddress
+
+import pytest
+
+from apps.ipam.allocation import AddressOccupancy, AllocationError, allocate_address, eui64_address
+from apps.ipam.models import DHCPPool, Host, Subnet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def dual_stack(admin_user):
+    project = Project.objects.create(name="Campus", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    v4 = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24", gateway="10.0.0.1")
+    v6 = Subnet.objects.create(project=project, site=site, network="2001:db8:0:1::/64", gateway="2001:db8:0:1::1")
+    return v4, v6
+
+
+def addr(value):
+    return int(ipaddress.ip_address(value))
+
+
+class TestAddressOccupancy:
+    def test_cost_follows_allocations_not_prefix(self):
+        network = ipaddress.ip_network("2001:db8::/64")
+        # The whole lower half of the /64 is one pool
+        pool = (addr("2001:db8::2"), addr("2001:db8::7fff:ffff:ffff:ffff"))
+        occupancy = AddressOccupancy(network, [addr("2001:db8::1")], [pool])
+        assert occupancy.first_free(addr("2001:db8::1"), int(network.broadcast_address)) == addr("2001:db8::8000:0:0:0")
+        start, end, size = occupancy.largest_free(addr("2001:db8::1"), int(network.broadcast_address))
+        assert (start, end, size) == (addr("2001:db8::8000:0:0:0"), int(network.broadcast_address), 2 ** 63)
+
+    def test_random_is_free_and_in_range(self):
+        occupancy = AddressOccupancy("10.0.0.0/24", [addr("10.0.0.0") + n for n in range(1, 250)])
+        picks = {allocate_address(occupancy, "random") for _ in range(50)}
+        assert picks <= {addr("10.0.0.0") + n for n in range(250, 255)}
+        full = AddressOccupancy("10.0.0.0/30", [addr("10.0.0.1"), addr("10.0.0.2")])
+        assert allocate_address(full, "random") is None
+        assert allocate_address(full, "sequential") is None
+
+    def test_eui64(self):
+        assert eui64_address("2001:db8::/64", "00:1A:2b:3c:4d:5e") == addr("2001:db8::21a:2bff:fe3c:4d5e")
+        assert eui64_address("2001:db8::/48", "021a.2b3c.4d5e") == addr("2001:db8::1a:2bff:fe3c:4d5e")
+        with pytest.raises(AllocationError):
+            eui64_address("2001:db8::/80", "00:1a:2b:3c:4d:5e")
+        with pytest.raises(AllocationError):
+            eui64_address("10.0.0.0/24", "00:1a:2b:3c:4d:5e")
+        with pytest.raises(AllocationError):
+            allocate_address(AddressOccupancy("2001:db8::/64"), "eui64", mac="nope")
+
+
+@pytest.mark.django_db
+class TestIPv6Endpoints:
+    def test_next_free_ip_skips_huge_pool(self, api_client, dual_stack):
+        _, v6 = dual_stack
+        Host.objects.create(subnet=v6, ip_address="2001:db8:0:1::2")
+        DHCPPool.objects.create(subnet=v6, start_ip="2001:db8:0:1::3", end_ip="2001:db8:0:1::ffff:ffff:ffff")
+        resp = api_client.get(f"/api/v1/subnets/{v6.id}/next-free-ip/")
+        assert resp.data == {"next_free_ip": "2001:db8:0:1:1::"}
+
+    def test_strategies(self, api_client, dual_stack):
+        v4, v6 = dual_stack
+        url = f"/api/v1/subnets/{v6.id}/next-free-ip/"
+        resp = api_client.get(url, {"strategy": "eui64", "mac": "00:1a:2b:3c:4d:5e"})
+        assert resp.data == {"next_free_ip": "2001:db8:0:1:21a:2bff:fe3c:4d5e"}
+
+        Host.objects.create(subnet=v6, ip_address="2001:db8:0:1:21a:2bff:fe3c:4d5e", mac_address="00:1a:2b:3c:4d:5e")
+        resp = api_client.get(url, {"strategy": "eui64", "mac": "00:1a:2b:3c:4d:5e"})
+        assert resp.status_code == 400
+        assert "already in use" in resp.data["detail"]
+
+        picked = ipaddress.ip_address(api_client.get(url, {"strategy": "random"}).data["next_free_ip"])
+        assert picked in ipaddress.ip_network("2001:db8:0:1::/64")
+
+        assert api_client.get(f"/api/v1/subnets/{v4.id}/next-free-ip/", {"strategy": "eui64"}).status_code == 400
+        assert api_client.get(url, {"strategy": "nope"}).status_code == 400
+
+    def test_suggested_pool_range_has_no_broadcast(self, api_client, dual_stack):
+        _, v6 = dual_stack
+        DHCPPool.objects.create(subnet=v6, start_ip="2001:db8:0:1:8000::", end_ip="2001:db8:0:1:ffff:ffff:ffff:ffff")
+        resp = api_client.get(f"/api/v1/subnets/{v6.id}/suggested-pool-range/")
+        assert resp.data == {
+            "start_ip": "2001:db8:0:1::2", "end_ip": "2001:db8:0:1:7fff:ffff:ffff:ffff", "size": 2 ** 63 - 2,
+        }
+
+
+class TestDualStackVLSM:
+    def test_plans_both_families(self, api_client):
+        resp = api_client.post("/api/v1/tools/vlsm/", {
+            "cidr": "10.0.0.0/24",
+            "cidr_v6": "2001:db8:10::/48",
+            "requirements": [{"name": "Users", "hosts": 100}, {"name": "Voice", "hosts": 20}],
+        }, format="json")
+        assert resp.status_code == 200
+        assert [(a["subnet"], a["subnet_v6"]) for a in resp.data["allocations"]] == [
+            ("10.0.0.0/25", "2001:db8:10::/64"), ("10.0.0.128/27", "2001:db8:10:1::/64"),
+        ]
+        assert resp.data["parent_v6"] == "2001:db8:10::/48"
+        # Free space comes back as a few aggregated blocks, not 65534 /64s
+        assert len(resp.data["remaining_v6"]) < 20
+
+    def test_ipv6_parent(self, api_client):
+        resp = api_client.post("/api/v1/tools/vlsm/", {
+            "cidr": "2001:db8::/32", "requirements": [{"name": "Core", "hosts": 1000}],
+        }, format="json")
+        assert resp.data["allocations"][0]["subnet"] == "2001:db8::/118"
+        assert resp.data["allocations"][0]["hosts_available"] == 1023
+
+        resp = api_client.post("/api/v1/tools/vlsm/", {
+            "cidr": "2001:db8::/32", "cidr_v6": "2001:db8::/48", "requirements": [{"name": "Core", "hosts": 10}],
+        }, format="json")
+        assert resp.status_code == 400
@@ -0,0 +1,121 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.ipam.models import VLAN, Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+def rollout(site_count):
+    ops = [{"op": "create", "resource": "project", "ref": "p", "data": {"name": "Rollout"}}]
+    for i in range(site_count):
+        ops.append({"op": "create", "resource": "site", "ref": f"s{i}",
+                    "data": {"project": "$p", "name": f"Store {i}"}})
+    for i in range(site_count):
+        ops.append({"op": "create", "resource": "vlan", "ref": f"v{i}",
+                    "data": {"site": f"$s{i}", "vlan_id": 10, "name": "Users"}})
+    for i in range(site_count):
+        ops.append({"op": "create", "resource": "subnet", "ref": f"n{i}",
+                    "data": {"vlan": f"$v{i}", "network": f"10.{i}.0.0/24", "gateway": f"10.{i}.0.1"}})
+    for i in range(1, site_count):
+        ops.append({"op": "create", "resource": "tunnel", "data": {
+            "project": "$p", "name": f"hub-{i}", "tunnel_type": "gre", "tunnel_subnet": f"172.16.{i}.0/30",
+            "site_a": "$s0", "ip_a": f"172.16.{i}.1", "site_b": f"$s{i}", "ip_b": f"172.16.{i}.2",
+        }})
+    return ops
+
+
+@pytest.mark.django_db
+class TestBatch:
+    def test_creates_network_with_references(self, api_client):
+        response = api_client.post("/api/v1/batch/", {"operations": rollout(5)}, format="json")
+        assert response.status_code == 201, response.json()
+        project = Project.objects.get(name="Rollout")
+        assert project.sites.count() == 5
+        assert VLAN.objects.filter(site__project=project).count() == 5
+        assert Subnet.objects.filter(project=project).count() == 5
+        assert Tunnel.objects.filter(project=project).count() == 4
+        results = response.json()["results"]
+        assert results[1]["ref"] == "s0"
+        assert results[1]["id"] == Site.objects.get(name="Store 0").id
+
+    def test_failure_rolls_back_everything(self, api_client):
+        ops = rollout(3)
+        ops.append({"op": "create", "resource": "subnet",
+                    "data": {"vlan": "$v0", "network": "10.0.0.128/25"}})
+        response = api_client.post("/api/v1/batch/", {"operations": ops}, format="json")
+        assert response.status_code == 400
+        assert response.json()["index"] == len(ops) - 1
+        assert not Project.objects.filter(name="Rollout").exists()
+
+    def test_conflicts_within_one_group_are_caught(self, api_client):
+        ops = rollout(1) + [
+            {"op": "create", "resource": "host", "data": {"subnet": "$n0", "ip_address": "10.0.0.5"}},
+            {"op": "create", "resource": "host", "data": {"subnet": "$n0", "ip_address": "10.0.0.5"}},
+        ]
+        response = api_client.post("/api/v1/batch/", {"operations": ops}, format="json")
+        assert response.status_code == 400
+        assert response.json()["index"] == len(ops) - 1
+        assert not Host.objects.exists()
+
+    def test_ipv4_and_ipv6_subnets_in_one_group(self, api_client):
+        ops = rollout(1) + [
+            {"op": "create", "resource": "subnet", "data": {"vlan": "$v0", "network": "2001:db8::/64"}},
+            {"op": "create", "resource": "subnet", "data": {"vlan": "$v0", "network": "10.0.1.0/24"}},
+        ]
+        response = api_client.post("/api/v1/batch/", {"operations": ops}, format="json")
+        assert response.status_code == 201, response.json()
+        assert Subnet.objects.filter(project__name="Rollout").count() == 3
+
+    def test_overlapping_subnets_of_both_families_are_caught(self, api_client):
+        ops = rollout(1) + [
+            {"op": "create", "resource": "subnet", "data": {"vlan": "$v0", "network": "2001:db8::/48"}},
+            {"op": "create", "resource": "subnet", "data": {"vlan": "$v0", "network": "10.0.1.0/24"}},
+            {"op": "create", "resource": "subnet", "data": {"vlan": "$v0", "network": "2001:db8:0:1::/64"}},
+        ]
+        response = api_client.post("/api/v1/batch/", {"operations": ops}, format="json")
+        assert response.status_code == 400
+        assert response.json()["index"] == len(ops) - 1
+        assert not Project.objects.filter(name="Rollout").exists()
+
+    @pytest.mark.parametrize("tunnel_subnet, ip_a, ip_b", [
+        ("172.16.1.0/30", "172.16.9.1", "172.16.9.2"),  # same tunnel subnet as hub-1
+        ("172.16.9.0/30", "172.16.1.1", "172.16.9.2"),  # hub-1's endpoint IP again
+    ])
+    def test_tunnel_conflicts_within_one_group_are_caught(self, api_client, tunnel_subnet, ip_a, ip_b):
+        ops = rollout(3)
+        ops.append({"op": "create", "resource": "tunnel", "data": {
+            "project": "$p", "name": "dup", "tunnel_type": "gre", "tunnel_subnet": tunnel_subnet,
+            "site_a": "$s1", "ip_a": ip_a, "site_b": "$s2", "ip_b": ip_b,
+        }})
+        response = api_client.post("/api/v1/batch/", {"operations": ops}, format="json")
+        assert response.status_code == 400
+        assert response.json()["index"] == len(ops) - 1
+        assert not Tunnel.objects.exists()
+
+    def test_update_and_delete(self, api_client, admin_user):
+        project = Project.objects.create(name="Existing", created_by=admin_user)
+        site = Site.objects.create(project=project, name="Old")
+        doomed = Site.objects.create(project=project, name="Doomed")
+        response = api_client.post("/api/v1/batch/", {"operations": [
+            {"op": "update", "resource": "site", "id": site.id, "data": {"name": "Renamed"}},
+            {"op": "delete", "resource": "site", "id": doomed.id},
+        ]}, format="json")
+        assert response.status_code == 201
+        site.refresh_from_db()
+        assert site.name == "Renamed"
+        assert not Site.objects.filter(pk=doomed.id).exists()
+
+    def test_unknown_reference(self, api_client):
+        response = api_client.post("/api/v1/batch/", {"operations": [
+            {"op": "create", "resource": "site", "data": {"project": "$nope", "name": "X"}},
+        ]}, format="json")
+        assert response.status_code == 400
+        assert response.json()["index"] == 0
+
+    def test_viewer_cannot_write(self, db):
+        viewer = User.objects.create_user(username="viewer", password="x", role=User.Role.VIEWER)
+        client = APIClient()
+        client.force_authenticate(user=viewer)
+        response = client.post("/api/v1/batch/", {"operations": rollout(1)}, format="json")
+        assert response.status_code == 403
@@ -0,0 +1,147 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.ipam.models import DHCPPool, Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    project = Project.objects.create(name="Import Project", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    lan = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24", gateway="10.0.0.1")
+    Subnet.objects.create(project=project, site=site, network="10.0.1.0/24")
+    DHCPPool.objects.create(subnet=lan, start_ip="10.0.0.100", end_ip="10.0.0.199")
+    Host.objects.create(subnet=lan, ip_address="10.0.0.10", hostname="existing")
+    Tunnel.objects.create(
+        project=project, name="t1", tunnel_type="gre", tunnel_subnet="10.255.0.0/30",
+        site_a=site, ip_a="10.0.1.1", ip_b="10.0.1.2", external_endpoint="peer",
+    )
+    return project
+
+
+@pytest.mark.django_db
+class TestHostImport:
+    def test_json_rows_report_per_row_errors(self, api_client, project):
+        response = api_client.post("/api/v1/hosts/import/", {
+            "project": project.id,
+            "rows": [
+                {"ip_address": "10.0.0.20", "hostname": "ok-1"},
+                {"ip_address": "10.0.0.10", "hostname": "duplicate-host"},
+                {"ip_address": "10.0.1.2", "hostname": "duplicate-tunnel"},
+                {"ip_address": "10.0.0.150", "hostname": "static-in-pool"},
+                {"ip_address": "10.0.0.151", "ip_type": "dhcp_lease", "hostname": "lease"},
+                {"ip_address": "10.0.0.20", "hostname": "duplicate-in-batch"},
+                {"ip_address": "10.5.0.1", "hostname": "no-subnet"},
+                {"ip_address": "10.0.1.30", "device_type": "toaster"},
+                {"ip_address": "10.0.1.31", "subnet": "10.0.0.0/24"},
+            ],
+        }, format="json")
+        assert response.status_code == 201
+        data = response.json()
+        assert data["created"] == 2
+        assert [e["row"] for e in data["errors"]] == [2, 3, 4, 6, 7, 8, 9]
+        lease = Host.objects.get(hostname="lease")
+        assert lease.dhcp_pool is not None
+
+    def test_csv_upload(self, api_client, project):
+        content = (
+            "subnet,ip_address,hostname,device_type\n"
+            "10.0.1.0/24,10.0.1.50,csv-1,server\n"
+            ",10.0.1.51,csv-2,printer\n"
+        ).encode()
+        response = api_client.post("/api/v1/hosts/import/", {
+            "project": project.id,
+            "file": SimpleUploadedFile("hosts.csv", content, content_type="text/csv"),
+        }, format="multipart")
+        assert response.status_code == 201
+        assert response.json()["created"] == 2
+        assert Host.objects.get(hostname="csv-2").subnet.network.compressed == "10.0.1.0/24"
+
+    def test_atomic_rejects_whole_batch(self, api_client, project):
+        response = api_client.post("/api/v1/hosts/import/", {
+            "project": project.id,
+            "atomic": True,
+            "rows": [{"ip_address": "10.0.1.60"}, {"ip_address": "not-an-ip"}],
+        }, format="json")
+        assert response.status_code == 400
+        assert not Host.objects.filter(ip_address="10.0.1.60").exists()
+
+    def test_fixed_query_count(self, api_client, project, django_assert_max_num_queries):
+        rows = [{"ip_address": f"10.0.1.{i}", "hostname": f"h{i}"} for i in range(3, 254)]
+        with django_assert_max_num_queries(12):
+            response = api_client.post("/api/v1/hosts/import/", {"project": project.id, "rows": rows}, format="json")
+        assert response.json()["created"] == 251
+
+    def test_project_required(self, api_client):
+        response = api_client.post("/api/v1/hosts/import/", {"rows": []}, format="json")
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestHostBulkEdit:
+    @pytest.fixture
+    def hosts(self, project):
+        subnet = Subnet.objects.get(network="10.0.1.0/24")
+        return Host.objects.bulk_create(
+            Host(subnet=subnet, ip_address=f"10.0.1.{i}", hostname=f"h{i}") for i in range(10, 30)
+        )
+
+    def test_patch_by_filter(self, api_client, project, hosts):
+        subnet = hosts[0].subnet_id
+        revision = project.revision
+        response = api_client.patch(
+            f"/api/v1/hosts/?subnet={subnet}", {"data": {"device_type": "server"}}, format="json",
+        )
+        assert response.status_code == 200
+        assert response.json() == {"updated": 20}
+        assert Host.objects.filter(device_type="server").count() == 20
+        project.refresh_from_db()
+        assert project.revision > revision
+
+    def test_patch_validates_once(self, api_client, hosts, django_assert_max_num_queries):
+        ids = [h.id for h in hosts]
+        with django_assert_max_num_queries(6):
+            response = api_client.patch(
+                "/api/v1/hosts/", {"ids": ids, "data": {"device_type": "toaster"}}, format="json",
+            )
+        assert response.status_code == 400
+        assert not Host.objects.filter(device_type="toaster").exists()
+
+    def test_patch_rejects_per_host_fields(self, api_client, hosts):
+        response = api_client.patch(
+            "/api/v1/hosts/", {"ids": [hosts[0].id], "data": {"ip_address": "10.0.1.99"}}, format="json",
+        )
+        assert response.status_code == 400
+
+    def test_delete_by_ids(self, api_client, hosts):
+        ids = [h.id for h in hosts[:5]]
+        response = api_client.delete("/api/v1/hosts/", {"ids": ids}, format="json")
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 5}
+        assert not Host.objects.filter(pk__in=ids).exists()
+        assert Host.objects.count() == 16
+
+    @pytest.mark.parametrize("query", ["", "?subnet=", "?search=", "?search=%20", "?unknown=1", "?subnet=&site="])
+    def test_empty_selection_rejected(self, api_client, hosts, query):
+        response = api_client.delete(f"/api/v1/hosts/{query}", format="json")
+        assert response.status_code == 400
+        response = api_client.patch(f"/api/v1/hosts/{query}", {"data": {"device_type": "server"}}, format="json")
+        assert response.status_code == 400
+        assert Host.objects.count() == 21
+        assert not Host.objects.filter(device_type="server").exists()
+
+    def test_delete_by_search(self, api_client, hosts):
+        response = api_client.delete("/api/v1/hosts/?search=h1", format="json")
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 10}
+
+    def test_delete_requires_admin(self, project, hosts):
+        editor = User.objects.create_user(username="editor", password="testpass123", role=User.Role.EDITOR)
+        client = APIClient()
+        client.force_authenticate(user=editor)
+        response = client.delete(f"/api/v1/hosts/?project={project.id}", format="json")
+        assert response.status_code == 403
+        assert Host.objects.count() == 21
@@ -0,0 +1,102 @@
+import io
+import json
+import time
+
+import pytest
+from django.core.management import call_command
+
+from apps.ipam.conflicts import overlapping_prefixes
+from apps.ipam.models import Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def customers(admin_user):
+    """Two customers using the same private range, joined by an IPsec tunnel."""
+    acme = Project.objects.create(name="Acme", created_by=admin_user)
+    globex = Project.objects.create(name="Globex", created_by=admin_user)
+    acme_hq = Site.objects.create(project=acme, name="Acme HQ")
+    globex_hq = Site.objects.create(project=globex, name="Globex HQ")
+    acme_lan = Subnet.objects.create(project=acme, site=acme_hq, network="10.0.0.0/16")
+    globex_lan = Subnet.objects.create(project=globex, site=globex_hq, network="10.0.5.0/24")
+    Subnet.objects.create(project=globex, site=globex_hq, network="192.168.0.0/24")
+    Host.objects.create(subnet=acme_lan, ip_address="10.0.5.10", hostname="acme-fs")
+    Host.objects.create(subnet=globex_lan, ip_address="10.0.5.10", hostname="globex-fs")
+    Host.objects.create(subnet=globex_lan, ip_address="10.0.5.11", hostname="globex-db")
+    Tunnel.objects.create(
+        project=acme, name="acme-globex", tunnel_type="ipsec", tunnel_subnet="172.16.0.0/30",
+        site_a=acme_hq, ip_a="172.16.0.1", site_b=globex_hq, ip_b="172.16.0.2",
+    )
+    return acme, globex, acme_lan, globex_lan
+
+
+@pytest.mark.django_db
+class TestConflictReport:
+    def test_reports_cross_project_overlaps_and_duplicates(self, api_client, customers):
+        acme, globex, acme_lan, globex_lan = customers
+        resp = api_client.get("/api/v1/conflicts/")
+        assert resp.status_code == 200
+
+        [pair] = resp.data["overlaps"]
+        assert (pair["a"]["id"], pair["b"]["id"]) == (acme_lan.id, globex_lan.id)
+        assert pair["b"] == {"kind": "subnet", "id": globex_lan.id, "project_id": globex.id, "network": "10.0.5.0/24"}
+
+        [duplicate] = resp.data["duplicates"]
+        assert duplicate["ip"] == "10.0.5.10"
+        assert [(o["project_id"], o["name"]) for o in duplicate["owners"]] == [
+            (acme.id, "acme-fs"), (globex.id, "globex-fs"),
+        ]
+        assert resp.data["counts"] == {"overlaps": 1, "duplicates": 1}
+        assert resp.data["truncated"] is False
+
+    def test_tunnel_endpoint_collides_with_host(self, api_client, customers):
+        acme, globex, _, _ = customers
+        site = Site.objects.create(project=globex, name="Globex DC")
+        transit = Subnet.objects.create(project=globex, site=site, network="172.16.0.0/29")
+        Host.objects.create(subnet=transit, ip_address="172.16.0.1", hostname="globex-rtr")
+
+        data = api_client.get("/api/v1/conflicts/").data
+        assert {o["network"] for pair in data["overlaps"] for o in (pair["a"], pair["b"])} >= {
+            "172.16.0.0/30", "172.16.0.0/29",
+        }
+        owners = {d["ip"]: [o["kind"] for o in d["owners"]] for d in data["duplicates"]}
+        assert owners["172.16.0.1"] == ["tunnel_a", "host"]
+
+    def test_project_filter_and_limit(self, api_client, admin_user, customers):
+        other = Project.objects.create(name="Initech", created_by=admin_user)
+        assert api_client.get(f"/api/v1/conflicts/?project={other.id}").data["counts"] == {
+            "overlaps": 0, "duplicates": 0,
+        }
+
+        data = api_client.get("/api/v1/conflicts/?limit=0").data
+        assert data["overlaps"] == [] and data["duplicates"] == []
+        assert data["truncated"] is True
+
+        assert api_client.get("/api/v1/conflicts/?limit=x").status_code == 400
+        assert api_client.get("/api/v1/conflicts/?limit=-1").status_code == 400
+
+    def test_command(self, customers):
+        out = io.StringIO()
+        call_command("ipam_conflicts", stdout=out)
+        assert "1 overlapping prefix pair(s), 1 duplicate address(es)" in out.getvalue()
+
+        out = io.StringIO()
+        call_command("ipam_conflicts", "--json", stdout=out)
+        assert json.loads(out.getvalue())["counts"] == {"overlaps": 1, "duplicates": 1}
+
+    def test_sweep_scales(self, admin_user):
+        projects = Project.objects.bulk_create(
+            Project(name=f"P{i}", created_by=admin_user) for i in range(10)
+        )
+        sites = Site.objects.bulk_create(Site(project=p, name="S") for p in projects)
+        # 2000 /24s per project, each project in its own /8, plus one /24 shared by two projects
+        Subnet.objects.bulk_create(
+            Subnet(project=p, site=s, network=f"{10 + i}.{n // 256}.{n % 256}.0/24")
+            for i, (p, s) in enumerate(zip(projects, sites)) for n in range(2000)
+        )
+        Subnet.objects.create(project=projects[1], site=sites[1], network="10.0.7.0/24")
+
+        started = time.monotonic()
+        pairs = list(overlapping_prefixes())
+        assert time.monotonic() - started < 5
+        assert [(a["network"], b["network"]) for a, b in pairs] == [("10.0.7.0/24", "10.0.7.0/24")]
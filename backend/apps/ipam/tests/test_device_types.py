@@ -0,0 +1,63 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.ipam.device_types import VERSION_KEY, DeviceTypeRegistry
+from apps.ipam.device_types import registry as device_types
+from apps.ipam.models import DeviceType, Subnet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def subnet(admin_user):
+    project = Project.objects.create(name="Campus", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    return Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+
+
+@pytest.mark.django_db
+class TestDeviceTypeRegistry:
+    def test_host_writes_skip_the_device_type_query(self, api_client, subnet):
+        device_types.labels()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = api_client.post(
+                "/api/v1/hosts/", {"subnet": subnet.id, "ip_address": "10.0.0.6", "device_type": "switch"},
+                format="json",
+            )
+        assert resp.status_code == 201
+        assert not any("ipam_device_type" in q["sql"] for q in ctx.captured_queries)
+
+        resp = api_client.post(
+            "/api/v1/hosts/", {"subnet": subnet.id, "ip_address": "10.0.0.7", "device_type": "toaster"},
+            format="json",
+        )
+        assert resp.data["device_type"] == ["Unknown device type: toaster"]
+
+    def test_writes_reach_other_processes(self, settings, django_capture_on_commit_callbacks):
+        settings.DEVICE_TYPE_CHECK_INTERVAL = 3600
+        # Stands in for another worker with its own copy
+        other = DeviceTypeRegistry()
+        assert not other.is_known("toaster")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            DeviceType.objects.create(value="toaster", label="Toaster")
+        assert device_types.label("toaster") == "Toaster"
+        # Unknown values force a version check, so the new type is accepted at once
+        assert other.is_known("toaster")
+
+        version = cache.get(VERSION_KEY)
+        with django_capture_on_commit_callbacks(execute=True):
+            DeviceType.objects.filter(value="toaster").update(label="Kitchen")
+            DeviceType.objects.get(value="toaster").save()
+        assert cache.get(VERSION_KEY) != version
+        assert other.label("toaster") == "Toaster"  # within the check interval
+        settings.DEVICE_TYPE_CHECK_INTERVAL = 0
+        assert other.label("toaster") == "Kitchen"
+
+    def test_viewset_writes_invalidate(self, api_client):
+        resp = api_client.post("/api/v1/device-types/", {"value": "toaster", "label": "Toaster"}, format="json")
+        assert resp.status_code == 201
+        assert device_types.is_known("toaster")
+        api_client.delete(f"/api/v1/device-types/{resp.data['id']}/")
+        assert not device_types.is_known("toaster")
@@ -0,0 +1,109 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.accounts.models import User
+from apps.ipam.integrity import CHECKS, run_integrity_checks
+from apps.ipam.models import DHCPPool, Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture(autouse=True)
+def single_worker(settings):
+    settings.IPAM_CHECK_WORKERS = 1
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Restored", created_by=admin_user)
+
+
+@pytest.fixture
+def site(project):
+    return Site.objects.create(project=project, name="HQ")
+
+
+@pytest.fixture
+def subnet(project, site):
+    return Subnet.objects.create(project=project, site=site, network="10.0.0.0/24", gateway="10.0.0.1")
+
+
+@pytest.fixture
+def broken(project, site, subnet):
+    """One violation of every invariant, written straight through the ORM as a restore would."""
+    pool = DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.150")
+    DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.140", end_ip="10.0.0.160")
+    DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.250", end_ip="10.0.1.10")
+    return {
+        "outside": Host.objects.create(subnet=subnet, ip_address="10.9.9.9"),
+        "lease": Host.objects.create(subnet=subnet, ip_address="10.0.0.20", ip_type="dhcp_lease", dhcp_pool=pool),
+        "static": Host.objects.create(subnet=subnet, ip_address="10.0.0.120"),
+        # Two hosts can no longer share an address (ipam_host_project_ip_unique), a tunnel still can
+        "duplicate": Tunnel.objects.create(
+            project=project, name="dup", tunnel_type="gre", tunnel_subnet="10.0.0.20/30",
+            site_a=site, ip_a="10.0.0.20/24", ip_b="10.0.0.22",
+        ),
+        "overlap": Subnet.objects.create(project=project, site=site, network="10.0.0.128/25"),
+    }
+
+
+@pytest.mark.django_db
+class TestIntegrityChecks:
+    def test_clean_project(self, project, subnet):
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.150")
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.10")
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.110", ip_type="dhcp_lease")
+        report = run_integrity_checks()
+        assert report["ok"] is True
+        assert report["projects"] == 1
+        assert report["counts"] == dict.fromkeys(CHECKS, 0)
+
+    def test_every_invariant(self, project, broken):
+        report = run_integrity_checks([project.id])
+        assert report["ok"] is False
+        assert report["counts"] == {
+            "host_in_subnet": 1, "lease_in_pool": 1, "static_not_in_pool": 1, "pool_in_subnet": 1,
+            "pool_overlap": 1, "ip_unique": 1, "subnet_overlap": 1,
+        }
+        found = {(p["check"], p["id"]) for p in report["problems"]}
+        assert ("host_in_subnet", broken["outside"].id) in found
+        assert ("lease_in_pool", broken["lease"].id) in found
+        assert ("static_not_in_pool", broken["static"].id) in found
+        assert ("ip_unique", broken["lease"].id) in found
+        [overlap] = [p for p in report["problems"] if p["check"] == "subnet_overlap"]
+        assert overlap["detail"].endswith(f"overlaps subnet {broken['overlap'].id} (10.0.0.128/25)")
+
+    def test_tunnel_endpoint_duplicates_host(self, project, site, subnet):
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        other = Site.objects.create(project=project, name="Branch")
+        Tunnel.objects.create(
+            project=project, name="gre-1", tunnel_type="gre", tunnel_subnet="10.0.0.4/30",
+            site_a=other, ip_a="10.0.0.6", site_b=site, ip_b="10.0.0.5",
+        )
+        [problem] = run_integrity_checks(checks=["ip_unique"])["problems"]
+        assert problem["detail"].startswith("10.0.0.5 is used 2 times")
+
+    def test_command(self, project, broken):
+        out = io.StringIO()
+        call_command("ipam_check", str(project.id), "--check", "subnet_overlap", stdout=out)
+        report = json.loads(out.getvalue())
+        assert report["checks"] == ["subnet_overlap"]
+        assert report["counts"] == {"subnet_overlap": 1}
+
+        with pytest.raises(CommandError):
+            call_command("ipam_check", "--fail-on-problems", stdout=io.StringIO())
+        with pytest.raises(CommandError):
+            call_command("ipam_check", "999999", stdout=io.StringIO())
+
+    def test_endpoint(self, api_client, project, broken):
+        resp = api_client.get(f"/api/v1/ipam-check/?project={project.id}&check=pool_overlap")
+        assert resp.status_code == 200
+        assert resp.data["counts"] == {"pool_overlap": 1}
+        assert api_client.get("/api/v1/ipam-check/?check=nope").status_code == 400
+
+        viewer = User.objects.create_user(username="viewer", password="x", role=User.Role.VIEWER)
+        api_client.force_authenticate(user=viewer)
+        assert api_client.get("/api/v1/ipam-check/").status_code == 403
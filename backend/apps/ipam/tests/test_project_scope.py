@@ -0,0 +1,107 @@
+import importlib
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+
+from apps.ipam.filters import HostFilter
+from apps.ipam.models import DHCPPool, Host, Subnet
+from apps.ipam.validators import check_ip_duplicate_in_project
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def layout(admin_user):
+    project = Project.objects.create(name="Campus", created_by=admin_user)
+    other = Project.objects.create(name="Branch", created_by=admin_user)
+    hq = Site.objects.create(project=project, name="HQ")
+    dc = Site.objects.create(project=project, name="DC")
+    remote = Site.objects.create(project=other, name="Remote")
+    subnet = Subnet.objects.create(project=project, site=hq, network="10.0.0.0/24")
+    return project, other, hq, dc, remote, subnet
+
+
+@pytest.mark.django_db
+class TestProjectScope:
+    def test_copied_from_subnet(self, layout):
+        project, _, hq, _, _, subnet = layout
+        host = Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        assert (host.project_id, host.site_id) == (project.id, hq.id)
+
+        # bulk_create never calls save(); the trigger fills the columns in
+        Host.objects.bulk_create([Host(subnet=subnet, ip_address="10.0.0.6")])
+        DHCPPool.objects.bulk_create([DHCPPool(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.150")])
+        assert set(Host.objects.values_list("project_id", "site_id")) == {(project.id, hq.id)}
+        assert DHCPPool.objects.get().site_id == hq.id
+
+    def test_follows_moving_subnets(self, layout):
+        project, other, _, dc, remote, subnet = layout
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.150")
+
+        Subnet.objects.filter(pk=subnet.pk).update(site=dc)
+        assert Host.objects.get().site_id == dc.id
+        assert DHCPPool.objects.get().site_id == dc.id
+
+        subnet.refresh_from_db()
+        subnet.project, subnet.site = other, remote
+        subnet.save()
+        assert Host.objects.get().project_id == other.id
+        assert DHCPPool.objects.get().project_id == other.id
+
+        # A host moved to another subnet with a set-based update follows it too
+        target = Subnet.objects.create(project=project, site=dc, network="10.1.0.0/24")
+        Host.objects.update(subnet=target)
+        assert Host.objects.values_list("project_id", "site_id").get() == (project.id, dc.id)
+
+    def test_unique_address_per_project(self, layout):
+        project, other, _, _, remote, subnet = layout
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.5", hostname="sw1")
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Host.objects.create(subnet=subnet, ip_address="10.0.0.5/24")
+
+        elsewhere = Subnet.objects.create(project=other, site=remote, network="10.0.0.0/24")
+        Host.objects.create(subnet=elsewhere, ip_address="10.0.0.5")
+
+        with pytest.raises(ValidationError, match="sw1 in HQ"):
+            check_ip_duplicate_in_project("10.0.0.5/24", project)
+
+    def test_constraint_violation_is_a_validation_error(self, layout, api_client, monkeypatch):
+        *_, subnet = layout
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        other = Host.objects.create(subnet=subnet, ip_address="10.0.0.6")
+        # As if a concurrent request took the address after validation passed
+        monkeypatch.setattr("apps.ipam.serializers.check_ip_duplicate_in_project", lambda *args, **kwargs: None)
+
+        response = api_client.post("/api/v1/hosts/", {"subnet": subnet.id, "ip_address": "10.0.0.5"}, format="json")
+        assert response.status_code == 400
+        assert response.json() == {"ip_address": ["This IP address is already assigned to a host in this project."]}
+        response = api_client.patch(f"/api/v1/hosts/{other.id}/", {"ip_address": "10.0.0.5"}, format="json")
+        assert response.status_code == 400
+        assert Host.objects.count() == 2
+
+    def test_migration_reports_duplicates_before_adding_constraint(self, layout):
+        project, *_, subnet = layout
+        migration = importlib.import_module("apps.ipam.migrations.0010_host_pool_project_site")
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX ipam_host_project_ip_unique")
+        first = Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        second = Host.objects.create(subnet=subnet, ip_address="10.0.0.5/24")
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.6")
+
+        with pytest.raises(RuntimeError, match=rf"project {project.id}, 10.0.0.5: hosts {first.id}, {second.id}$"):
+            with connection.schema_editor() as schema_editor:
+                migration.check_duplicate_host_ips(None, schema_editor)
+
+        second.delete()
+        with connection.schema_editor() as schema_editor:
+            migration.check_duplicate_host_ips(None, schema_editor)
+
+    def test_project_filters_need_no_join(self, layout, api_client):
+        project, _, hq, _, _, subnet = layout
+        Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        query = str(HostFilter({"project": project.id, "site": hq.id}, queryset=Host.objects.all()).qs.query)
+        assert "ipam_subnet" not in query
+
+        assert api_client.get(f"/api/v1/hosts/?project={project.id}").data["count"] == 1
+        assert api_client.get(f"/api/v1/dhcp-pools/?site={hq.id}").status_code == 200
@@ -0,0 +1,62 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.ipam.models import DHCPPool, Host, Subnet, Tunnel
+from apps.ipam.serializers import HostSerializer, SubnetSerializer, TunnelSerializer
+from apps.ipam.views import HostViewSet, SubnetViewSet, TunnelViewSet
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def network(admin_user):
+    project = Project.objects.create(name="Campus", created_by=admin_user)
+    other = Project.objects.create(name="Branch", created_by=admin_user)
+    hq = Site.objects.create(project=project, name="HQ")
+    remote = Site.objects.create(project=other, name="Remote")
+    v4 = Subnet.objects.create(project=project, site=hq, network="10.0.0.0/24", gateway="10.0.0.1")
+    v6 = Subnet.objects.create(project=project, site=hq, network="2001:db8::/64")
+    pool = DHCPPool.objects.create(subnet=v4, start_ip="10.0.0.100", end_ip="10.0.0.150")
+    Host.objects.create(subnet=v4, ip_address="10.0.0.5", hostname="sw1", mac_address="00:1a:2b:3c:4d:5e")
+    Host.objects.create(subnet=v4, ip_address="10.0.0.101", ip_type="dhcp_lease", dhcp_pool=pool)
+    Host.objects.create(subnet=v6, ip_address="2001:db8::10", description="zażółć")
+    Tunnel.objects.create(
+        project=project, name="to-branch", tunnel_type="gre", tunnel_subnet="172.16.0.0/30",
+        site_a=hq, ip_a="172.16.0.1", site_b=remote, ip_b="172.16.0.2",
+    )
+    Tunnel.objects.create(
+        project=project, name="to-cloud", tunnel_type="ipsec", tunnel_subnet="172.16.0.4/31",
+        site_a=hq, ip_a="172.16.0.4", ip_b="172.16.0.5", external_endpoint="vpn.example.com",
+    )
+    return project
+
+
+@pytest.mark.django_db
+class TestReadSerializers:
+    @pytest.mark.parametrize("path,viewset,serializer", [
+        ("hosts", HostViewSet, HostSerializer),
+        ("subnets", SubnetViewSet, SubnetSerializer),
+        ("tunnels", TunnelViewSet, TunnelSerializer),
+    ])
+    def test_same_output_as_model_serializer(self, api_client, network, path, viewset, serializer):
+        queryset = viewset(kwargs={}).get_queryset().order_by("pk")
+        expected = serializer(queryset, many=True).data
+        assert expected
+
+        # Bytes, not parsed JSON: 51 and 51.0 compare equal once loaded
+        listed = api_client.get(f"/api/v1/{path}/", {"ordering": "id"})
+        assert listed.content.endswith(b'"results":' + JSONRenderer().render(expected) + b"}")
+
+        for row in expected:
+            assert api_client.get(f"/api/v1/{path}/{row['id']}/").content == JSONRenderer().render(row)
+        assert api_client.get(f"/api/v1/{path}/999999/").status_code == 404
+
+        streamed = api_client.get(f"/api/v1/{path}/", {"ordering": "id", "format": "ndjson"})
+        encoder = JSONEncoder(ensure_ascii=False)
+        assert b"".join(streamed.streaming_content).decode() == "".join(encoder.encode(row) + "\n" for row in expected)
+
+    def test_filters_still_apply(self, api_client, network):
+        response = api_client.get("/api/v1/hosts/", {"search": "sw1"})
+        assert [row["hostname"] for row in response.json()["results"]] == ["sw1"]
+        response = api_client.get("/api/v1/subnets/", {"project": network.id, "ordering": "-network"})
+        assert [row["host_count"] for row in response.json()["results"]] == [1, 2]
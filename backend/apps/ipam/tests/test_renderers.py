@@ -0,0 +1,58 @@
+import ipaddress
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from apps.ipam.models import Host, Subnet
+from apps.projects.models import Project, Site
+from config.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+@pytest.fixture
+def subnet(admin_user):
+    project = Project.objects.create(name="Campus", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24", description="Users LAN")
+    for n in range(2, 12):
+        Host.objects.create(subnet=subnet, ip_address=f"10.0.0.{n}", hostname=f"pc-{n}")
+    return subnet
+
+
+@pytest.mark.django_db
+class TestRenderers:
+    @pytest.mark.parametrize("path", ["hosts/", "subnets/", "projects/{project}/topology/"])
+    def test_same_bytes_as_drf(self, api_client, subnet, path):
+        response = api_client.get("/api/v1/" + path.format(project=subnet.project_id))
+        assert response.accepted_renderer.__class__ is ORJSONRenderer
+        assert response.content == JSONRenderer().render(response.data)
+
+    def test_values_drf_has_no_native_encoding_for(self):
+        data = {
+            "network": ipaddress.ip_network("2001:db8::/64"),
+            "ip": ipaddress.ip_interface("10.0.0.5/24"),
+            "size": 2 ** 64,
+            4: "int key",
+        }
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert ORJSONRenderer().render(data, "application/json; indent=2") == JSONRenderer().render(
+            data, "application/json; indent=2",
+        )
+
+    @pytest.mark.parametrize("value", [1e16, 1.5e300, 1e-7, -2.5e-8, 0.00001, 0.0001, 51.5, 1e15])
+    def test_floats(self, value):
+        data = {"latitude": value, "values": [value, "1e16", "2026-10-19T06:32:00.000012Z"]}
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_site_coordinates_must_be_finite(self, api_client, subnet):
+        response = api_client.post(
+            f"/api/v1/projects/{subnet.project_id}/sites/", {"name": "Nowhere", "latitude": "nan"}, format="json",
+        )
+        assert response.status_code == 400
+        assert "latitude" in response.json()
+
+    def test_msgpack(self, api_client, subnet):
+        msgpack = pytest.importorskip("msgpack")
+        response = api_client.get("/api/v1/hosts/", HTTP_ACCEPT="application/msgpack")
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content)["count"] == 10
+        assert msgpack.unpackb(MessagePackRenderer().render({"size": 2 ** 64})) == {"size": str(2 ** 64)}
@@ -0,0 +1,117 @@
+import pytest
+
+from apps.ipam.models import DHCPPool, Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def site(admin_user):
+    project = Project.objects.create(name="Merger", created_by=admin_user)
+    return Site.objects.create(project=project, name="HQ")
+
+
+@pytest.fixture
+def subnet(site):
+    subnet = Subnet.objects.create(project=site.project, site=site, network="10.0.0.0/24", gateway="10.0.0.1")
+    pool = DHCPPool.objects.create(subnet=subnet, start_ip="10.0.0.100", end_ip="10.0.0.199")
+    Host.objects.bulk_create([Host(subnet=subnet, ip_address=f"10.0.0.{i}") for i in range(10, 60)])
+    Host.objects.create(subnet=subnet, ip_address="10.0.0.150", ip_type="dhcp_lease", dhcp_pool=pool)
+    other = Site.objects.create(project=site.project, name="Branch")
+    Tunnel.objects.create(
+        project=site.project, name="t1", tunnel_type="gre", tunnel_subnet="10.0.0.248/30",
+        site_a=site, ip_a="10.0.0.249", site_b=other, ip_b="10.0.0.250",
+    )
+    return subnet
+
+
+def ip(value):
+    return str(value).split("/")[0]
+
+
+@pytest.mark.django_db
+class TestRenumber:
+    def test_shifts_everything_inside(self, api_client, subnet):
+        response = api_client.post(
+            f"/api/v1/subnets/{subnet.id}/renumber/", {"network": "192.168.5.0/24"}, format="json",
+        )
+        assert response.status_code == 200
+        assert response.json()["updated"] == {"hosts": 51, "dhcp_pools": 1, "tunnels": 1}
+        subnet.refresh_from_db()
+        assert (str(subnet.network), ip(subnet.gateway)) == ("192.168.5.0/24", "192.168.5.1")
+        assert sorted(ip(h) for h in Host.objects.values_list("ip_address", flat=True))[:2] == [
+            "192.168.5.10", "192.168.5.11",
+        ]
+        pool = DHCPPool.objects.get()
+        assert (ip(pool.start_ip), ip(pool.end_ip)) == ("192.168.5.100", "192.168.5.199")
+        tunnel = Tunnel.objects.get()
+        assert (str(tunnel.tunnel_subnet), ip(tunnel.ip_a), ip(tunnel.ip_b)) == (
+            "192.168.5.248/30", "192.168.5.249", "192.168.5.250",
+        )
+
+    def test_overlap_rejected(self, api_client, site, subnet):
+        Subnet.objects.create(project=site.project, site=site, network="10.1.0.128/25")
+        response = api_client.post(f"/api/v1/subnets/{subnet.id}/renumber/", {"network": "10.1.0.0/24"}, format="json")
+        assert response.status_code == 400
+        assert not Host.objects.filter(ip_address__net_contained="10.1.0.0/24").exists()
+
+    def test_smaller_target_rejected(self, api_client, subnet):
+        response = api_client.post(f"/api/v1/subnets/{subnet.id}/renumber/", {"network": "10.9.0.0/25"}, format="json")
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestSplitMerge:
+    @pytest.fixture
+    def block(self, site):
+        subnet = Subnet.objects.create(project=site.project, site=site, network="10.4.0.0/22", gateway="10.4.0.1")
+        DHCPPool.objects.create(subnet=subnet, start_ip="10.4.2.10", end_ip="10.4.2.200")
+        Host.objects.bulk_create([
+            Host(subnet=subnet, ip_address=f"10.4.{octet}.{i}") for octet in range(4) for i in range(5, 25)
+        ])
+        return subnet
+
+    def test_split_moves_hosts_and_pools(self, api_client, block):
+        response = api_client.post(f"/api/v1/subnets/{block.id}/split/", {"prefix": 24}, format="json")
+        assert response.status_code == 201
+        assert response.json()["updated"] == {"hosts": 80, "dhcp_pools": 1}
+        children = Subnet.objects.filter(site=block.site).order_by("network")
+        assert [str(c.network) for c in children] == ["10.4.0.0/24", "10.4.1.0/24", "10.4.2.0/24", "10.4.3.0/24"]
+        assert [ip(c.gateway) for c in children] == ["10.4.0.1", "10.4.1.1", "10.4.2.1", "10.4.3.1"]
+        assert children[0].pk == block.pk
+        for child in children:
+            assert child.hosts.count() == 20
+        assert DHCPPool.objects.get().subnet == children[2]
+
+    def test_split_refuses_host_on_new_boundary(self, api_client, block):
+        Host.objects.create(subnet=block, ip_address="10.4.1.0")
+        response = api_client.post(f"/api/v1/subnets/{block.id}/split/", {"prefix": 24}, format="json")
+        assert response.status_code == 400
+        assert Subnet.objects.count() == 1
+
+    def test_split_moves_hosts_stored_with_a_mask(self, api_client, block):
+        masked = Host.objects.create(subnet=block, ip_address="10.4.3.130/22")
+        response = api_client.post(f"/api/v1/subnets/{block.id}/split/", {"prefix": 24}, format="json")
+        assert response.status_code == 201
+        masked.refresh_from_db()
+        assert str(masked.subnet.network) == "10.4.3.0/24"
+
+    def test_split_refuses_masked_host_on_new_boundary(self, api_client, block):
+        Host.objects.create(subnet=block, ip_address="10.4.1.255/22")
+        response = api_client.post(f"/api/v1/subnets/{block.id}/split/", {"prefix": 24}, format="json")
+        assert response.status_code == 400
+        assert Subnet.objects.count() == 1
+
+    def test_merge_round_trip(self, api_client, block):
+        api_client.post(f"/api/v1/subnets/{block.id}/split/", {"prefix": 24}, format="json")
+        ids = list(Subnet.objects.order_by("network").values_list("id", flat=True))
+        response = api_client.post("/api/v1/subnets/merge/", {"subnets": ids}, format="json")
+        assert response.status_code == 200
+        assert response.json()["subnet"]["network"] == "10.4.0.0/22"
+        assert Subnet.objects.get().hosts.count() == 80
+        assert DHCPPool.objects.get().subnet_id == ids[0]
+
+    def test_merge_rejects_non_adjacent(self, api_client, site):
+        a = Subnet.objects.create(project=site.project, site=site, network="10.5.0.0/24")
+        b = Subnet.objects.create(project=site.project, site=site, network="10.5.2.0/24")
+        response = api_client.post("/api/v1/subnets/merge/", {"subnets": [a.id, b.id]}, format="json")
+        assert response.status_code == 400
@@ -0,0 +1,54 @@
+import pytest
+
+from apps.ipam.models import Subnet, Tunnel
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Overlay", created_by=admin_user)
+
+
+@pytest.fixture
+def sites(project):
+    return Site.objects.bulk_create(Site(project=project, name=f"S{i:02}") for i in range(6))
+
+
+def generate(client, project, sites, **kwargs):
+    body = {
+        "project": project.id, "sites": [s.id for s in sites],
+        "topology": "full_mesh", "tunnel_type": "gre", "transit": "172.16.0.0/24", **kwargs,
+    }
+    return client.post("/api/v1/tunnels/generate/", body, format="json")
+
+
+@pytest.mark.django_db
+class TestTunnelGenerator:
+    def test_full_mesh(self, api_client, project, sites):
+        response = generate(api_client, project, sites)
+        assert response.status_code == 201
+        assert response.json()["created"] == 15
+        first = Tunnel.objects.get(site_a=sites[0], site_b=sites[1])
+        assert str(first.tunnel_subnet) == "172.16.0.0/30"
+        assert (str(first.ip_a.ip), str(first.ip_b.ip)) == ("172.16.0.1", "172.16.0.2")
+        assert first.name == "gre-S00-S01"
+
+    def test_hub_and_spoke_with_31s_skips_used_space(self, api_client, project, sites):
+        Subnet.objects.create(project=project, site=sites[0], network="172.16.0.0/31")
+        response = generate(api_client, project, sites, topology="hub_and_spoke", hub=sites[2].id, prefix=31)
+        assert response.status_code == 201
+        tunnels = Tunnel.objects.order_by("tunnel_subnet")
+        assert {t.site_a_id for t in tunnels} == {sites[2].id}
+        assert [str(t.tunnel_subnet) for t in tunnels][:2] == ["172.16.0.2/31", "172.16.0.4/31"]
+
+    def test_existing_pairs_skipped(self, api_client, project, sites):
+        generate(api_client, project, sites[:3], topology="ring")
+        response = generate(api_client, project, sites, topology="ring")
+        # S00-S01 and S01-S02 are already in place; S02-S00 isn't part of the bigger ring
+        assert response.json()["skipped"] == 2
+        assert Tunnel.objects.count() == 3 + 4
+
+    def test_transit_too_small_creates_nothing(self, api_client, project, sites):
+        response = generate(api_client, project, sites, transit="172.16.0.0/28")
+        assert response.status_code == 400
+        assert not Tunnel.objects.exists()
@@ -1,21 +1,11 @@
-import pytest
-from rest_framework.test import APIClient
-
-from apps.accounts.models import User
-
-
-@pytest.fixture
-def admin_user(db):
-    return User.objects.create_user(
-        username="admin", password="testpass123", role=User.Role.ADMIN,
-    )
+import csv
+import io
+import json
 
+import pytest
 
-@pytest.fixture
-def api_client(admin_user):
-    client = APIClient()
-    client.force_authenticate(user=admin_user)
-    return client
+from apps.ipam.models import Host, Subnet
+from apps.projects.models import Project, Site
 
 
 @pytest.mark.django_db
@@ -31,6 +21,14 @@ class TestSubnetInfoTool:
         assert data["prefix_length"] == 24
         assert data["is_private"] is True
 
+    def test_subnet_info_ipv6(self, api_client):
+        response = api_client.post("/api/v1/tools/subnet-info/", {"cidr": "2001:db8::/64"})
+        assert response.status_code == 200
+        data = response.json()
+        # hosts() skips only the subnet-router anycast address in IPv6
+        assert (data["first_host"], data["last_host"]) == ("2001:db8::1", "2001:db8::ffff:ffff:ffff:ffff")
+        assert data["num_hosts"] == 2**64 - 1
+
     def test_subnet_info_invalid(self, api_client):
         response = api_client.post("/api/v1/tools/subnet-info/", {"cidr": "invalid"})
         assert response.status_code == 400
@@ -58,3 +56,45 @@ class TestVLSMTool:
         # Largest first
         assert data["allocations"][0]["name"] == "LAN"
         assert data["allocations"][0]["subnet"] is not None
+        assert data["allocations"][0]["hosts_available"] == 126
+
+
+@pytest.fixture
+def network(admin_user):
+    project = Project.objects.create(name="Stream Project", created_by=admin_user)
+    site = Site.objects.create(project=project, name="HQ")
+    subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+    Host.objects.bulk_create([
+        Host(subnet=subnet, ip_address=f"10.0.0.{i}", hostname=f"host-{i}") for i in range(1, 121)
+    ])
+    other = Project.objects.create(name="Other", created_by=admin_user)
+    other_site = Site.objects.create(project=other, name="HQ")
+    other_subnet = Subnet.objects.create(project=other, site=other_site, network="10.9.0.0/24")
+    Host.objects.create(subnet=other_subnet, ip_address="10.9.0.1", hostname="elsewhere")
+    return project
+
+
+@pytest.mark.django_db
+class TestStreamingListFormats:
+    def test_ndjson_dump_is_unpaginated_and_filtered(self, api_client, network):
+        response = api_client.get(f"/api/v1/hosts/?format=ndjson&project={network.id}")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 120
+        row = json.loads(lines[0])
+        assert row["hostname"] == "host-1"
+        assert set(row) >= {"id", "subnet", "ip_address", "device_type"}
+
+    def test_csv_dump(self, api_client, network):
+        response = api_client.get(f"/api/v1/subnets/?format=csv&project={network.id}")
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[0][:3] == ["id", "project", "site"]
+        assert len(rows) == 2
+        assert rows[1][rows[0].index("host_count")] == "120"
+
+    def test_json_list_still_paginated(self, api_client, network):
+        response = api_client.get(f"/api/v1/hosts/?project={network.id}")
+        assert response.json()["count"] == 120
+        assert len(response.json()["results"]) == 50
@@ -0,0 +1,111 @@
+"""Generate overlay tunnels between many sites at once."""
+import ipaddress
+
+from django.db import transaction
+
+from apps.projects.models import Project, Site
+from apps.projects.signals import bump_project_revision
+
+from .allocation import AllocationError, BlockAllocator
+from .models import Subnet, Tunnel
+
+TOPOLOGIES = ("full_mesh", "hub_and_spoke", "ring")
+MAX_TUNNELS = 20000
+
+
+class TunnelPlanError(Exception):
+    pass
+
+
+def topology_pairs(sites, topology, hub=None):
+    """Ordered ``(site_a, site_b)`` pairs for the given shape."""
+    if topology == "full_mesh":
+        return [(a, b) for i, a in enumerate(sites) for b in sites[i + 1:]]
+    if topology == "hub_and_spoke":
+        if hub is None:
+            raise TunnelPlanError("hub is required for hub_and_spoke.")
+        return [(hub, site) for site in sites if site != hub]
+    if topology == "ring":
+        if len(sites) == 2:
+            return [(sites[0], sites[1])]
+        return [(site, sites[(i + 1) % len(sites)]) for i, site in enumerate(sites)]
+    raise TunnelPlanError(f"topology must be one of: {', '.join(TOPOLOGIES)}.")
+
+
+def endpoints(net):
+    """Tunnel endpoint addresses of a point-to-point prefix (RFC 3021 for /31)."""
+    if net.prefixlen == 31:
+        return net.network_address, net.network_address + 1
+    return net.network_address + 1, net.network_address + 2
+
+
+def generate_tunnels(project, site_ids, topology, tunnel_type, transit, prefix=30, hub_id=None):
+    """Create every tunnel of ``topology`` between ``site_ids`` in one transaction.
+
+    Point-to-point prefixes come from ``transit``, skipping anything the
+    project's subnets or tunnels already use. Pairs that already have a
+    tunnel of the same type are left alone. Returns the created tunnels and
+    the number of pairs skipped.
+    """
+    if tunnel_type not in Tunnel.TunnelType.values:
+        raise TunnelPlanError(f"tunnel_type must be one of: {', '.join(Tunnel.TunnelType.values)}.")
+    if prefix not in (30, 31):
+        raise TunnelPlanError("prefix must be 30 or 31.")
+    try:
+        transit = ipaddress.ip_network(str(transit), strict=False)
+    except ValueError:
+        raise TunnelPlanError(f"Invalid transit supernet: {transit}")
+    if transit.version != 4:
+        raise TunnelPlanError("transit must be an IPv4 network.")
+    if (
+        not isinstance(site_ids, list)
+        or not all(isinstance(pk, int) for pk in site_ids)
+        or len(set(site_ids)) < 2
+    ):
+        raise TunnelPlanError("sites must list at least two site ids.")
+
+    with transaction.atomic():
+        Project.objects.select_for_update().filter(pk=project.pk).first()
+
+        by_id = Site.objects.filter(project=project).select_related("project").in_bulk(site_ids)
+        missing = [pk for pk in site_ids if pk not in by_id]
+        if missing:
+            raise TunnelPlanError(f"Sites not in this project: {', '.join(map(str, missing))}")
+        sites = list(dict.fromkeys(by_id[pk] for pk in site_ids))
+        if hub_id is not None and hub_id not in by_id:
+            raise TunnelPlanError("hub must be one of the listed sites.")
+        pairs = topology_pairs(sites, topology, by_id.get(hub_id))
+        if len(pairs) > MAX_TUNNELS:
+            raise TunnelPlanError(f"{len(pairs)} tunnels requested; at most {MAX_TUNNELS} per call.")
+
+        existing = {
+            frozenset(pair)
+            for pair in Tunnel.objects.filter(
+                project=project, tunnel_type=tunnel_type, site_b__isnull=False,
+            ).values_list("site_a_id", "site_b_id")
+        }
+        todo = [(a, b) for a, b in pairs if frozenset((a.pk, b.pk)) not in existing]
+
+        used = [
+            *Subnet.objects.filter(project=project).values_list("network", flat=True),
+            *Tunnel.objects.filter(project=project).values_list("tunnel_subnet", flat=True),
+        ]
+        allocator = BlockAllocator(transit, used)
+        tunnels = []
+        for site_a, site_b in todo:
+            try:
+                net = allocator.allocate(prefix)
+            except AllocationError:
+                raise TunnelPlanError(f"{transit} has room for only {len(tunnels)} of {len(todo)} /{prefix} tunnels.")
+            ip_a, ip_b = endpoints(net)
+            tunnels.append(Tunnel(
+                project=project, name=f"{tunnel_type}-{site_a.name}-{site_b.name}"[:200],
+                tunnel_type=tunnel_type, tunnel_subnet=str(net),
+                site_a=site_a, ip_a=str(ip_a), site_b=site_b, ip_b=str(ip_b),
+            ))
+
+        Tunnel.objects.bulk_create(tunnels, batch_size=1000)
+        if tunnels:
+            bump_project_revision(project.pk)
+
+    return tunnels, len(pairs) - len(todo)
@@ -1,9 +1,20 @@
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import DefaultRouter, Route
 
 from . import views
 
-router = DefaultRouter()
+
+class BulkRouter(DefaultRouter):
+    """Also routes PATCH and DELETE on list URLs to ``bulk_update``/``bulk_destroy`` where a viewset has them."""
+
+    routes = [
+        route._replace(mapping={**route.mapping, "patch": "bulk_update", "delete": "bulk_destroy"})
+        if isinstance(route, Route) and route.mapping == {"get": "list", "post": "create"} else route
+        for route in DefaultRouter.routes
+    ]
+
+
+router = BulkRouter()
 router.register(r"vlans", views.VLANViewSet, basename="vlan")
 router.register(r"subnets", views.SubnetViewSet, basename="subnet")
 router.register(r"hosts", views.HostViewSet, basename="host")
@@ -12,5 +23,8 @@ router.register(r"dhcp-pools", views.DHCPPoolViewSet, basename="dhcppool")
 router.register(r"device-types", views.DeviceTypeViewSet, basename="devicetype")
 
 urlpatterns = [
+    path("batch/", views.BatchView.as_view(), name="batch"),
+    path("conflicts/", views.ConflictReportView.as_view(), name="conflicts"),
+    path("ipam-check/", views.IntegrityCheckView.as_view(), name="ipam-check"),
     path("", include(router.urls)),
 ]
@@ -1,44 +1,40 @@
-import ipaddress
-
 from django.core.exceptions import ValidationError
 
+from .addresses import HostAddress, ip, ip_int
+from .addresses import network as parse_network
 from .models import Host, Subnet, Tunnel
 
 
 def check_subnet_overlap(network, project, exclude_pk=None):
     """Check if a subnet overlaps with any existing subnet in the same project."""
-    existing = Subnet.objects.filter(
-        project=project
-    ).exclude(pk=exclude_pk)
-
-    net = ipaddress.ip_network(str(network), strict=False)
-
-    for subnet in existing:
-        existing_net = ipaddress.ip_network(str(subnet.network), strict=False)
-        if net.overlaps(existing_net):
-            if subnet.vlan:
-                location = f"{subnet.site.name} / {subnet.vlan.name}"
-            else:
-                location = f"{subnet.site.name} (standalone)"
-            raise ValidationError(
-                f"Subnet {network} overlaps with existing subnet {subnet.network} "
-                f"in {location}"
-            )
+    net = parse_network(network)
+    subnet = Subnet.objects.filter(
+        project=project, network__net_overlaps=str(net),
+    ).exclude(pk=exclude_pk).select_related("site", "vlan").first()
+
+    if subnet:
+        if subnet.vlan:
+            location = f"{subnet.site.name} / {subnet.vlan.name}"
+        else:
+            location = f"{subnet.site.name} (standalone)"
+        raise ValidationError(
+            f"Subnet {network} overlaps with existing subnet {subnet.network} "
+            f"in {location}"
+        )
 
 
 def check_ip_duplicate_in_project(ip_address, project, exclude_pk=None):
     """Check if an IP address is already used in the same project (hosts + tunnel endpoints)."""
     ip_str = str(ip_address)
 
-    # Check hosts
-    hosts_qs = Host.objects.filter(
-        subnet__project=project,
-        ip_address=ip_str,
-    ).exclude(pk=exclude_pk)
+    # Check hosts; matches ipam_host_project_ip_unique, so it is one index probe
+    host = Host.objects.alias(address=HostAddress("ip_address")).filter(
+        project=project,
+        address=str(ip(ip_address)),
+    ).exclude(pk=exclude_pk).select_related("site").first()
 
-    if hosts_qs.exists():
-        host = hosts_qs.first()
-        location = host.subnet.site.name
+    if host:
+        location = host.site.name
         raise ValidationError(
             f"IP {ip_address} is already assigned to host {host.hostname or host.ip_address} "
             f"in {location}"
@@ -63,10 +59,7 @@ def models_Q_ip_a_or_b(ip_str):
 
 def check_ip_in_subnet(ip_address, subnet_network):
     """Validate that an IP address belongs to the given subnet."""
-    ip_str = str(ip_address).split("/")[0]  # Strip /32 prefix if present
-    ip = ipaddress.ip_address(ip_str)
-    net = ipaddress.ip_network(str(subnet_network), strict=False)
-    if ip not in net:
+    if ip(ip_address) not in parse_network(subnet_network):
         raise ValidationError(
             f"IP {ip_address} is not within subnet {subnet_network}"
         )
@@ -74,9 +67,9 @@ def check_ip_in_subnet(ip_address, subnet_network):
 
 def check_pool_range_in_subnet(start_ip, end_ip, subnet_network, gateway=None):
     """Validate that the pool range is within usable host range and doesn't include gateway."""
-    start = ipaddress.ip_address(str(start_ip).split("/")[0])
-    end = ipaddress.ip_address(str(end_ip).split("/")[0])
-    net = ipaddress.ip_network(str(subnet_network), strict=False)
+    start = ip(start_ip)
+    end = ip(end_ip)
+    net = parse_network(subnet_network)
 
     if start not in net:
         raise ValidationError(f"Start IP {start_ip} is not within subnet {subnet_network}")
@@ -98,7 +91,7 @@ def check_pool_range_in_subnet(start_ip, end_ip, subnet_network, gateway=None):
 
     # Exclude gateway
     if gateway:
-        gw = ipaddress.ip_address(str(gateway).split("/")[0])
+        gw = ip(gateway)
         if int(start) <= int(gw) <= int(end):
             raise ValidationError(
                 f"Pool range includes gateway address {gw}. "
@@ -110,13 +103,11 @@ def check_pool_overlap(start_ip, end_ip, subnet, exclude_pk=None):
     """Ensure no other DHCP pool in this subnet overlaps with [start_ip, end_ip]."""
     from .models import DHCPPool
 
-    start = int(ipaddress.ip_address(str(start_ip).split("/")[0]))
-    end = int(ipaddress.ip_address(str(end_ip).split("/")[0]))
+    start = ip_int(start_ip)
+    end = ip_int(end_ip)
 
     for pool in subnet.dhcp_pools.exclude(pk=exclude_pk):
-        p_start = int(ipaddress.ip_address(str(pool.start_ip).split("/")[0]))
-        p_end = int(ipaddress.ip_address(str(pool.end_ip).split("/")[0]))
-        if start <= p_end and end >= p_start:
+        if start <= ip_int(pool.end_ip) and end >= ip_int(pool.start_ip):
             raise ValidationError(
                 f"Range {start_ip}-{end_ip} overlaps with existing pool {pool.start_ip}-{pool.end_ip}"
             )
@@ -124,12 +115,10 @@ def check_pool_overlap(start_ip, end_ip, subnet, exclude_pk=None):
 
 def check_static_ip_not_in_pool(ip_address, subnet):
     """For static hosts: IP must not fall within any DHCP pool in the subnet."""
-    ip_int = int(ipaddress.ip_address(str(ip_address).split("/")[0]))
+    value = ip_int(ip_address)
 
     for pool in subnet.dhcp_pools.all():
-        p_start = int(ipaddress.ip_address(str(pool.start_ip).split("/")[0]))
-        p_end = int(ipaddress.ip_address(str(pool.end_ip).split("/")[0]))
-        if p_start <= ip_int <= p_end:
+        if ip_int(pool.start_ip) <= value <= ip_int(pool.end_ip):
             raise ValidationError(
                 f"Static IP {ip_address} falls within DHCP pool {pool.start_ip}-{pool.end_ip}"
             )
@@ -137,11 +126,7 @@ def check_static_ip_not_in_pool(ip_address, subnet):
 
 def check_lease_ip_in_pool(ip_address, dhcp_pool):
     """For DHCP lease hosts: IP must be within the assigned pool's range."""
-    ip_int = int(ipaddress.ip_address(str(ip_address).split("/")[0]))
-    p_start = int(ipaddress.ip_address(str(dhcp_pool.start_ip).split("/")[0]))
-    p_end = int(ipaddress.ip_address(str(dhcp_pool.end_ip).split("/")[0]))
-
-    if not (p_start <= ip_int <= p_end):
+    if not (ip_int(dhcp_pool.start_ip) <= ip_int(ip_address) <= ip_int(dhcp_pool.end_ip)):
         raise ValidationError(
             f"Lease IP {ip_address} is not within pool range {dhcp_pool.start_ip}-{dhcp_pool.end_ip}"
         )
@@ -1,24 +1,45 @@
+import csv
+import io
 import ipaddress
 
 from django.db.models import Count, Q
 from django.db.models.expressions import RawSQL
+from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from rest_framework.permissions import IsAuthenticated
 
+from apps.projects.models import Project
+
+from .addresses import address_ints, address_ranges, host_bounds, int_to_ip, ip_int
+from .addresses import network as parse_network
+from .allocation import AddressOccupancy, AllocationError, allocate_address, prefix_for_hosts
+from .batch import BatchError, apply_batch
+from .bulk import HOST_BULK_UPDATE_FIELDS, delete_hosts, import_hosts, update_hosts
+from .conflicts import DEFAULT_REPORT_LIMIT, ConflictReportError, conflict_report
 from .filters import HostFilter, SubnetFilter, TunnelFilter, VLANFilter, DHCPPoolFilter
+from .integrity import IntegrityCheckError, run_integrity_checks
+from .mixins import StreamingListMixin, ValuesReadMixin
 from .models import VLAN, Host, Subnet, Tunnel, DHCPPool, DeviceType
 from .permissions import IsAdmin, ProjectPermission
 from .serializers import (
     HostSerializer, SubnetSerializer, TunnelSerializer, VLANSerializer,
-    DHCPPoolSerializer, DeviceTypeSerializer,
+    DHCPPoolSerializer, DeviceTypeSerializer, HostReadSerializer, SubnetReadSerializer, TunnelReadSerializer,
 )
+from .subnet_ops import SubnetOperationError, merge_subnets, renumber_subnet, split_subnet
+from .tunnels import TunnelPlanError, generate_tunnels
+
 
+def _flag(request, name):
+    value = request.data.get(name, request.query_params.get(name))
+    return str(value).lower() in ("1", "true", "yes")
 
-class VLANViewSet(viewsets.ModelViewSet):
+
+class VLANViewSet(StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = VLANSerializer
     permission_classes = [ProjectPermission]
     filterset_class = VLANFilter
@@ -52,8 +73,9 @@ class DeviceTypeViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class SubnetViewSet(viewsets.ModelViewSet):
+class SubnetViewSet(ValuesReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = SubnetSerializer
+    read_serializer_class = SubnetReadSerializer
     permission_classes = [ProjectPermission]
     filterset_class = SubnetFilter
     search_fields = ["description"]
@@ -66,8 +88,12 @@ class SubnetViewSet(viewsets.ModelViewSet):
                 filter=Q(hosts__ip_type="static"),
                 distinct=True,
             ),
+            # inet - inet is a bigint, so an IPv6 pool of 2^63 or more addresses
+            # counts as the largest bigint instead of failing the query
             dhcp_pool_total_size=RawSQL(
-                "COALESCE((SELECT SUM(dp.end_ip - dp.start_ip + 1) "
+                "COALESCE((SELECT SUM(CASE WHEN dp.end_ip < '::7fff:ffff:ffff:ffff'::inet "
+                "OR dp.end_ip - 9223372036854775806 <= dp.start_ip THEN dp.end_ip - dp.start_ip + 1 "
+                "ELSE 9223372036854775807 END) "
                 "FROM ipam_dhcp_pool dp WHERE dp.subnet_id = ipam_subnet.id), 0)",
                 [],
             ),
@@ -79,28 +105,25 @@ class SubnetViewSet(viewsets.ModelViewSet):
 
         Query params:
           ?pool=<id>  — restrict suggestions to the given DHCP pool range
+          ?strategy=  — sequential (default, lowest free), eui64 (from ?mac=, IPv6 /64 only) or random
         """
         subnet_obj = self.get_object()
-        network = ipaddress.ip_network(str(subnet_obj.network), strict=False)
+        network = parse_network(subnet_obj.network)
+        version = network.version
 
-        used_ips = set(
-            str(h.ip_address).split("/")[0] for h in subnet_obj.hosts.all()
-        )
+        used = set(address_ints(subnet_obj.hosts.all(), "ip_address", version))
         # Also check tunnel IPs in the same project
-        project = subnet_obj.project
-        tunnels = Tunnel.objects.filter(project=project)
-        for t in tunnels:
-            used_ips.add(str(t.ip_a).split("/")[0])
-            used_ips.add(str(t.ip_b).split("/")[0])
+        tunnels = Tunnel.objects.filter(project_id=subnet_obj.project_id)
+        used.update(address_ints(tunnels, "ip_a", version))
+        used.update(address_ints(tunnels, "ip_b", version))
 
         # Exclude gateway
         if subnet_obj.gateway:
-            used_ips.add(str(subnet_obj.gateway).split("/")[0])
+            used.add(ip_int(subnet_obj.gateway))
 
         # If pool param is given, search only within that pool's range
         pool_id = request.query_params.get("pool")
         if pool_id:
-            from .models import DHCPPool
             try:
                 pool = DHCPPool.objects.get(pk=pool_id, subnet=subnet_obj)
             except DHCPPool.DoesNotExist:
@@ -108,103 +131,55 @@ class SubnetViewSet(viewsets.ModelViewSet):
                     {"detail": "Pool not found"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            pool_start = int(ipaddress.ip_address(str(pool.start_ip).split("/")[0]))
-            pool_end = int(ipaddress.ip_address(str(pool.end_ip).split("/")[0]))
-            for ip_int in range(pool_start, pool_end + 1):
-                ip = ipaddress.ip_address(ip_int)
-                if str(ip) not in used_ips:
-                    return Response({"next_free_ip": str(ip)})
-            return Response(
-                {"detail": "No free IP addresses in this pool"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            occupancy = AddressOccupancy(network, used)
+            first, last = ip_int(pool.start_ip), ip_int(pool.end_ip)
+            full = "No free IP addresses in this pool"
+        else:
+            # Default: search entire subnet, skip DHCP pool ranges
+            pool_ranges = address_ranges(subnet_obj.dhcp_pools.all(), "start_ip", "end_ip", version)
+            occupancy = AddressOccupancy(network, used, pool_ranges)
+            first, last = host_bounds(network)
+            full = "No free IP addresses in this subnet"
 
-        # Default: search entire subnet, skip DHCP pool ranges
-        pool_ranges = []
-        for pool in subnet_obj.dhcp_pools.all():
-            ps = int(ipaddress.ip_address(str(pool.start_ip).split("/")[0]))
-            pe = int(ipaddress.ip_address(str(pool.end_ip).split("/")[0]))
-            pool_ranges.append((ps, pe))
-
-        for ip in network.hosts():
-            ip_str = str(ip)
-            if ip_str in used_ips:
-                continue
-            ip_int = int(ip)
-            if any(ps <= ip_int <= pe for ps, pe in pool_ranges):
-                continue
-            return Response({"next_free_ip": ip_str})
-
-        return Response(
-            {"detail": "No free IP addresses in this subnet"},
-            status=status.HTTP_404_NOT_FOUND,
-        )
+        try:
+            value = allocate_address(
+                occupancy, request.query_params.get("strategy", "sequential"), first, last,
+                mac=request.query_params.get("mac"),
+            )
+        except AllocationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if value is None:
+            return Response({"detail": full}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"next_free_ip": str(int_to_ip(value, version))})
 
     @action(detail=True, methods=["get"], url_path="suggested-pool-range")
     def suggested_pool_range(self, request, pk=None):
         """Suggest the largest contiguous free IP block for a DHCP pool."""
         subnet_obj = self.get_object()
-        network = ipaddress.ip_network(str(subnet_obj.network), strict=False)
-
-        # Usable host range (exclude network + broadcast)
-        range_start = int(network.network_address) + 1
-        range_end = int(network.broadcast_address) - 1
+        network = parse_network(subnet_obj.network)
+        version = network.version
 
-        if range_start > range_end:
+        # Usable host range: no network or broadcast address for IPv4, no
+        # subnet-router anycast address for IPv6
+        if network.num_addresses <= 2:
             return Response(
                 {"detail": "Subnet too small for a pool"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        range_start, range_end = host_bounds(network)
 
-        # Collect occupied intervals as (start_int, end_int)
-        occupied = []
-
-        if subnet_obj.gateway:
-            gw = int(ipaddress.ip_address(str(subnet_obj.gateway).split("/")[0]))
-            occupied.append((gw, gw))
-
-        for h in subnet_obj.hosts.all():
-            ip = int(ipaddress.ip_address(str(h.ip_address).split("/")[0]))
-            occupied.append((ip, ip))
-
-        for pool in subnet_obj.dhcp_pools.all():
-            s = int(ipaddress.ip_address(str(pool.start_ip).split("/")[0]))
-            e = int(ipaddress.ip_address(str(pool.end_ip).split("/")[0]))
-            occupied.append((s, e))
-
-        # Sort and merge intervals
-        occupied.sort()
-        merged = []
-        for start, end in occupied:
-            if merged and start <= merged[-1][1] + 1:
-                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-            else:
-                merged.append((start, end))
-
-        # Find largest gap
-        best = None
-        prev_end = range_start - 1
-
-        for occ_start, occ_end in merged:
-            gap_start = prev_end + 1
-            gap_end = occ_start - 1
-            if gap_start <= gap_end and gap_start >= range_start and gap_end <= range_end:
-                size = gap_end - gap_start + 1
-                if best is None or size > best[2]:
-                    best = (gap_start, gap_end, size)
-            prev_end = max(prev_end, occ_end)
-
-        # Gap after last occupied
-        gap_start = prev_end + 1
-        if gap_start <= range_end:
-            size = range_end - gap_start + 1
-            if best is None or size > best[2]:
-                best = (gap_start, range_end, size)
+        gateway = [ip_int(subnet_obj.gateway)] if subnet_obj.gateway else []
+        occupancy = AddressOccupancy(
+            network,
+            gateway + address_ints(subnet_obj.hosts.all(), "ip_address", version),
+            address_ranges(subnet_obj.dhcp_pools.all(), "start_ip", "end_ip", version),
+        )
+        best = occupancy.largest_free(range_start, range_end)
 
         if best:
             return Response({
-                "start_ip": str(ipaddress.ip_address(best[0])),
-                "end_ip": str(ipaddress.ip_address(best[1])),
+                "start_ip": str(int_to_ip(best[0], version)),
+                "end_ip": str(int_to_ip(best[1], version)),
                 "size": best[2],
             })
 
@@ -213,9 +188,68 @@ class SubnetViewSet(viewsets.ModelViewSet):
             status=status.HTTP_404_NOT_FOUND,
         )
 
+    @action(detail=True, methods=["post"])
+    def renumber(self, request, pk=None):
+        """Move this subnet to ``network``, shifting its gateway, hosts, pools and tunnel endpoints along."""
+        subnet_obj = self.get_object()
+        network = request.data.get("network")
+        if not network:
+            return Response({"detail": "network is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            counts = renumber_subnet(subnet_obj, network)
+        except SubnetOperationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(self.get_queryset().get(pk=subnet_obj.pk)).data
+        return Response({"subnet": data, "updated": counts})
+
+    @action(detail=True, methods=["post"])
+    def split(self, request, pk=None):
+        """Split this subnet into ``/prefix`` subnets, keeping its hosts and pools.
+
+        Optional ``vlans``: one VLAN id (or null) per resulting subnet.
+        """
+        subnet_obj = self.get_object()
+        try:
+            prefix = int(request.data.get("prefix"))
+        except (TypeError, ValueError):
+            return Response({"detail": "prefix is required"}, status=status.HTTP_400_BAD_REQUEST)
+        vlans = request.data.get("vlans")
+        if vlans is not None:
+            if not isinstance(vlans, list) or not all(v is None or isinstance(v, int) for v in vlans):
+                return Response({"vlans": "Must be a list of VLAN ids or nulls."}, status=status.HTTP_400_BAD_REQUEST)
+            if VLAN.objects.filter(pk__in=[v for v in vlans if v]).exclude(site_id=subnet_obj.site_id).exists():
+                return Response(
+                    {"vlans": "VLANs must belong to the subnet's site."}, status=status.HTTP_400_BAD_REQUEST,
+                )
+            if len({v for v in vlans if v}) != VLAN.objects.filter(pk__in=[v for v in vlans if v]).count():
+                return Response({"vlans": "Unknown VLAN."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            children, counts = split_subnet(subnet_obj, prefix, vlans=vlans)
+        except SubnetOperationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(self.get_queryset().filter(pk__in=[c.pk for c in children]), many=True).data
+        return Response({"subnets": data, "updated": counts}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"])
+    def merge(self, request):
+        """Merge adjacent subnets of one site (``subnets``: ids, the first is kept) into one."""
+        ids = request.data.get("subnets")
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({"subnets": "Must be a list of subnet ids."}, status=status.HTTP_400_BAD_REQUEST)
+        by_id = Subnet.objects.in_bulk(ids)
+        if len(by_id) != len(set(ids)) or len(ids) != len(set(ids)):
+            return Response({"subnets": "Unknown or repeated subnet."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            subnet_obj, counts = merge_subnets([by_id[pk] for pk in ids])
+        except SubnetOperationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(self.get_queryset().get(pk=subnet_obj.pk)).data
+        return Response({"subnet": data, "updated": counts})
+
 
-class HostViewSet(viewsets.ModelViewSet):
+class HostViewSet(ValuesReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = HostSerializer
+    read_serializer_class = HostReadSerializer
     permission_classes = [ProjectPermission]
     filterset_class = HostFilter
     search_fields = ["hostname", "description"]
@@ -225,8 +259,98 @@ class HostViewSet(viewsets.ModelViewSet):
             "subnet", "subnet__project", "subnet__site", "subnet__vlan"
         )
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """Create many hosts in one project from a CSV upload or a JSON list.
+
+        Send ``project`` plus either a CSV ``file`` (columns as in
+        HOST_IMPORT_FIELDS) or ``rows``, a list of objects with the same keys.
+        ``subnet`` may be an id or a CIDR, and is inferred from the IP when
+        blank. Valid rows are inserted and invalid ones reported, unless
+        ``atomic=true`` (all or nothing) or ``dry_run=true`` (validate only).
+        """
+        project_id = request.data.get("project") or request.query_params.get("project")
+        if not str(project_id or "").isdigit():
+            return Response({"detail": "project is required"}, status=status.HTTP_400_BAD_REQUEST)
+        project = get_object_or_404(Project, pk=project_id)
+
+        uploaded = request.FILES.get("file")
+        if uploaded:
+            try:
+                rows = list(csv.DictReader(io.StringIO(uploaded.read().decode("utf-8-sig"))))
+            except (UnicodeDecodeError, csv.Error) as e:
+                return Response({"detail": f"Invalid CSV file: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data.get("rows")
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                return Response(
+                    {"detail": "Provide a CSV file or rows as a list of objects."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        atomic = _flag(request, "atomic")
+        result = import_hosts(project, rows, atomic=atomic, dry_run=_flag(request, "dry_run"))
+        if atomic and result["errors"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else status.HTTP_200_OK)
+
+    def _bulk_selection(self, request):
+        """Hosts picked by an ``ids`` list in the body and/or the usual list filters in the query string.
+
+        Returns ``(queryset, error_response)``; selecting nothing at all is an error so
+        a bare ``DELETE /hosts/`` can't wipe every host. A filter only counts when it
+        narrows the list: django-filter ignores empty values such as ``?subnet=``.
+        """
+        ids = request.data.get("ids")
+        filterset = HostFilter(request.query_params, queryset=Host.objects.all())
+        filtered = filterset.is_valid() and any(
+            value not in (None, "") for value in filterset.form.cleaned_data.values()
+        )
+        if ids is None and not filtered and not request.query_params.get("search", "").strip():
+            return None, Response(
+                {"detail": "Select hosts with ids or a filter query."}, status=status.HTTP_400_BAD_REQUEST,
+            )
+        hosts = self.filter_queryset(Host.objects.all())
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return None, Response({"ids": "Must be a list of host ids."}, status=status.HTTP_400_BAD_REQUEST)
+            hosts = hosts.filter(pk__in=ids)
+        return hosts, None
+
+    def bulk_update(self, request, *args, **kwargs):
+        """``PATCH /hosts/``: set the fields in ``data`` on every selected host.
+
+        Only HOST_BULK_UPDATE_FIELDS can be changed this way; they are validated
+        once and written with a single UPDATE.
+        """
+        hosts, error = self._bulk_selection(request)
+        if error:
+            return error
+        data = request.data.get("data")
+        if not isinstance(data, dict) or not data:
+            return Response({"data": "Provide the fields to change."}, status=status.HTTP_400_BAD_REQUEST)
+        unsupported = sorted(set(data) - set(HOST_BULK_UPDATE_FIELDS))
+        if unsupported:
+            return Response(
+                {"data": f"Cannot bulk-update: {', '.join(unsupported)}. "
+                         f"Allowed: {', '.join(HOST_BULK_UPDATE_FIELDS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return Response({"updated": update_hosts(hosts, serializer.validated_data)})
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        """``DELETE /hosts/``: delete every selected host with a single DELETE (admins only)."""
+        if not request.user.is_admin:
+            raise PermissionDenied("Only admins can delete.")
+        hosts, error = self._bulk_selection(request)
+        if error:
+            return error
+        return Response({"deleted": delete_hosts(hosts)})
+
 
-class DHCPPoolViewSet(viewsets.ModelViewSet):
+class DHCPPoolViewSet(StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = DHCPPoolSerializer
     permission_classes = [ProjectPermission]
     filterset_class = DHCPPoolFilter
@@ -246,8 +370,9 @@ class DHCPPoolViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class TunnelViewSet(viewsets.ModelViewSet):
+class TunnelViewSet(ValuesReadMixin, StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = TunnelSerializer
+    read_serializer_class = TunnelReadSerializer
     permission_classes = [ProjectPermission]
     filterset_class = TunnelFilter
     search_fields = ["name", "description"]
@@ -259,6 +384,91 @@ class TunnelViewSet(viewsets.ModelViewSet):
             qs = qs.filter(project_id=project_pk)
         return qs
 
+    @action(detail=False, methods=["post"])
+    def generate(self, request):
+        """Create tunnels between many sites of one project.
+
+        Body: ``project``, ``sites`` (site ids), ``topology`` (full_mesh,
+        hub_and_spoke with ``hub``, or ring), ``tunnel_type``, ``transit``
+        (supernet the /30 or /31 links are taken from) and optional
+        ``prefix`` (30 or 31, default 30). Pairs that already have a tunnel
+        of this type are skipped.
+        """
+        project_id = request.data.get("project")
+        if not str(project_id or "").isdigit():
+            return Response({"detail": "project is required"}, status=status.HTTP_400_BAD_REQUEST)
+        project = get_object_or_404(Project, pk=project_id)
+        try:
+            tunnels, skipped = generate_tunnels(
+                project,
+                request.data.get("sites"),
+                request.data.get("topology"),
+                request.data.get("tunnel_type"),
+                request.data.get("transit"),
+                prefix=request.data.get("prefix", 30),
+                hub_id=request.data.get("hub"),
+            )
+        except TunnelPlanError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"created": len(tunnels), "skipped": skipped, "tunnels": TunnelSerializer(tunnels, many=True).data},
+            status=status.HTTP_201_CREATED if tunnels else status.HTTP_200_OK,
+        )
+
+
+class BatchView(APIView):
+    """Apply an ordered list of create/update/delete operations in one transaction.
+
+    Body: ``{"operations": [{"op": "create", "resource": "site", "ref": "hq",
+    "data": {...}}, {"op": "create", "resource": "vlan", "data": {"site": "$hq", ...}}]}``.
+    Any failure rolls back the whole batch and reports the failing operation's index.
+    """
+    permission_classes = [ProjectPermission]
+
+    def post(self, request):
+        try:
+            results = apply_batch(request.data.get("operations"), request)
+        except BatchError as e:
+            return Response({"index": e.index, "errors": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+
+class ConflictReportView(APIView):
+    """Overlapping prefixes and duplicate addresses between projects.
+
+    ``?project=`` (repeatable) keeps only conflicts involving those projects;
+    ``?limit=`` caps each list, with ``counts`` giving the full totals.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            project_ids = [int(pk) for pk in request.query_params.getlist("project")] or None
+            limit = int(request.query_params.get("limit", DEFAULT_REPORT_LIMIT))
+        except ValueError:
+            return Response({"detail": "project and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = conflict_report(project_ids, limit)
+        except ConflictReportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+
+class IntegrityCheckView(APIView):
+    """Run the ``ipam_check`` invariants; ``?project=`` and ``?check=`` may repeat to narrow it down."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        try:
+            project_ids = [int(pk) for pk in request.query_params.getlist("project")] or None
+        except ValueError:
+            return Response({"detail": "project must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = run_integrity_checks(project_ids, request.query_params.getlist("check") or None)
+        except IntegrityCheckError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
 
 class SubnetInfoView(APIView):
     """Subnet calculator tool."""
@@ -273,6 +483,9 @@ class SubnetInfoView(APIView):
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Bounds are computed, never enumerated: an IPv6 /64 has 2**64 hosts
+        first, last = host_bounds(network)
+        has_hosts = network.num_addresses > 2
         return Response({
             "network": str(network.network_address),
             "broadcast": str(network.broadcast_address),
@@ -280,18 +493,72 @@ class SubnetInfoView(APIView):
             "wildcard": str(network.hostmask),
             "prefix_length": network.prefixlen,
             "num_addresses": network.num_addresses,
-            "num_hosts": max(0, network.num_addresses - 2),
-            "first_host": str(list(network.hosts())[0]) if network.num_addresses > 2 else None,
-            "last_host": str(list(network.hosts())[-1]) if network.num_addresses > 2 else None,
+            "num_hosts": last - first + 1 if has_hosts else 0,
+            "first_host": str(int_to_ip(first, network.version)) if has_hosts else None,
+            "last_host": str(int_to_ip(last, network.version)) if has_hosts else None,
             "is_private": network.is_private,
         })
 
 
+def _vlsm(network, requirements, max_prefix=None):
+    """Carve ``requirements`` out of ``network`` in order; returns ``(allocations, remaining)``.
+
+    Free space is kept as the few aligned blocks ``address_exclude`` leaves,
+    never as every sibling at the requested size, so an IPv6 /32 costs no
+    more than an IPv4 /24.
+    """
+    results = []
+    remaining = [network]
+
+    for req in requirements:
+        hosts_needed = req.get("hosts", 0)
+        name = req.get("name", "")
+
+        # Calculate required prefix length
+        prefix_len = prefix_for_hosts(hosts_needed, network.version)
+        if max_prefix is not None:
+            prefix_len = min(prefix_len, max_prefix)
+
+        allocated = False
+        for i, avail in enumerate(remaining):
+            if avail.prefixlen <= prefix_len:
+                allocated_subnet = next(avail.subnets(new_prefix=prefix_len))
+                first, last = host_bounds(allocated_subnet)
+                results.append({
+                    "name": name,
+                    "hosts_requested": hosts_needed,
+                    "subnet": str(allocated_subnet),
+                    "hosts_available": last - first + 1,
+                })
+                # Remove used block, add remaining
+                remaining.pop(i)
+                remaining.extend(avail.address_exclude(allocated_subnet))
+                remaining.sort(key=lambda n: n.network_address)
+                allocated = True
+                break
+
+        if not allocated:
+            results.append({
+                "name": name,
+                "hosts_requested": hosts_needed,
+                "subnet": None,
+                "error": "Not enough space",
+            })
+
+    return results, remaining
+
+
 class VLSMView(APIView):
-    """VLSM subnet partitioning tool."""
+    """VLSM subnet partitioning tool.
+
+    ``cidr`` may be IPv4 or IPv6. With ``cidr_v6`` as well, each requirement
+    also gets an IPv6 subnet (at most a /64, the SLAAC size) so a dual-stack
+    site is planned in one request.
+    """
 
     def post(self, request):
         cidr = request.data.get("cidr")
+        cidr_v6 = request.data.get("cidr_v6")
         requirements = request.data.get("requirements", [])
 
         if not cidr or not requirements:
@@ -302,52 +569,31 @@ class VLSMView(APIView):
 
         try:
             network = ipaddress.ip_network(cidr, strict=False)
+            network_v6 = ipaddress.ip_network(cidr_v6, strict=False) if cidr_v6 else None
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if network_v6 is not None and (network.version, network_v6.version) != (4, 6):
+            return Response(
+                {"detail": "cidr_v6 needs an IPv4 cidr and an IPv6 cidr_v6"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Sort requirements by size (largest first)
         sorted_reqs = sorted(requirements, key=lambda r: r.get("hosts", 0), reverse=True)
-
-        results = []
-        remaining = [network]
-
-        for req in sorted_reqs:
-            hosts_needed = req.get("hosts", 0)
-            name = req.get("name", "")
-
-            # Calculate required prefix length
-            prefix_len = 32
-            while (2 ** (32 - prefix_len) - 2) < hosts_needed:
-                prefix_len -= 1
-
-            allocated = False
-            for i, avail in enumerate(remaining):
-                if avail.prefixlen <= prefix_len:
-                    subnets = list(avail.subnets(new_prefix=prefix_len))
-                    allocated_subnet = subnets[0]
-                    results.append({
-                        "name": name,
-                        "hosts_requested": hosts_needed,
-                        "subnet": str(allocated_subnet),
-                        "hosts_available": 2 ** (32 - prefix_len) - 2,
-                    })
-                    # Remove used block, add remaining
-                    remaining.pop(i)
-                    remaining.extend(subnets[1:])
-                    remaining.sort(key=lambda n: n.network_address)
-                    allocated = True
-                    break
-
-            if not allocated:
-                results.append({
-                    "name": name,
-                    "hosts_requested": hosts_needed,
-                    "subnet": None,
-                    "error": "Not enough space",
-                })
-
-        return Response({
+        results, remaining = _vlsm(network, sorted_reqs)
+        data = {
             "parent": str(network),
             "allocations": results,
             "remaining": [str(r) for r in remaining],
-        })
+        }
+
+        if network_v6 is not None:
+            results_v6, remaining_v6 = _vlsm(network_v6, sorted_reqs, max_prefix=64)
+            for result, result_v6 in zip(results, results_v6):
+                result["subnet_v6"] = result_v6["subnet"]
+                if "error" in result_v6:
+                    result.setdefault("error", "Not enough IPv6 space")
+            data["parent_v6"] = str(network_v6)
+            data["remaining_v6"] = [str(r) for r in remaining_v6]
+
+        return Response(data)
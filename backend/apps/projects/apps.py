@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ProjectsConfig(AppConfig):
+    name = "apps.projects"
+    label = "projects"
+
+    def ready(self):
+        from . import signals  # noqa: F401
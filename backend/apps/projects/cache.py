@@ -0,0 +1,220 @@
+"""Two-tier cache for values computed from project contents.
+
+Each process keeps a bounded LRU of decoded values in front of the shared
+Redis cache, so a hot read is a dict lookup instead of a round trip and an
+unpickle. Values of one project are keyed on its revision: a write never
+deletes anything, it only moves the revision on, and a stale entry can't be
+served no matter what the invalidation channel does.
+
+Values that span every project (search results) are keyed on a global
+generation instead. When a transaction that bumped revisions commits, the
+generation moves and the project ids are published on a Redis channel. A
+listener thread in every process then drops its local entries for those
+projects and all its cross-project ones. While the listener is reconnecting
+a cross-project entry lives at most ``TIERED_CACHE_LOCAL_TIMEOUT`` seconds.
+
+Misses in Redis go through ``single_flight``: one process computes a key
+while the others wait on a Redis lock and read its result. Readers that find
+the lock taken are served the previous revision's value if there is one, so
+a rebuild only ever blocks the process doing it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.exceptions import LockError
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "projects:changed"
+GENERATION_KEY = "projects:generation"
+
+_caches = []
+_pending = threading.local()
+
+
+class TieredCache:
+    """Named cache of values per project, or across projects when no project is given."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (project_id, key) -> (tag, value, stored_at)
+        _caches.append(self)
+
+    def get_or_set(self, key, compute, project=None):
+        """``compute()``'s value for ``key``, from memory, Redis or by calling it.
+
+        ``project`` is the instance the value belongs to, as loaded by the
+        caller; its ``revision`` decides what is current. Values are shared
+        between requests, so callers must not mutate them.
+        """
+        _listener.ensure_running()
+        local_key = (project.pk if project is not None else None, key)
+        # Read before computing: an invalidation that lands meanwhile makes this entry stale at once
+        tag = project.revision if project is not None else _listener.sequence
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(local_key)
+            if entry is not None and entry[0] == tag and (
+                project is not None or now - entry[2] < settings.TIERED_CACHE_LOCAL_TIMEOUT
+            ):
+                self._entries.move_to_end(local_key)
+                return entry[1]
+
+        if project is not None:
+            shared_key = f"tiered:{self.name}:{project.pk}:{project.revision}:{key}"
+            stale_key = f"tiered:{self.name}:{project.pk}:stale:{key}"
+        else:
+            shared_key = f"tiered:{self.name}:g{cache.get(GENERATION_KEY, 0)}:{key}"
+            stale_key = f"tiered:{self.name}:stale:{key}"
+        value, fresh = _single_flight(shared_key, compute, settings.TIERED_CACHE_TIMEOUT, stale_key)
+        if not fresh:
+            return value
+
+        with self._lock:
+            self._entries[local_key] = (tag, value, now)
+            self._entries.move_to_end(local_key)
+            while len(self._entries) > settings.TIERED_CACHE_LOCAL_SIZE:
+                self._entries.popitem(last=False)
+        return value
+
+    def evict(self, project_ids):
+        """Drop local entries of ``project_ids`` and every cross-project entry."""
+        project_ids = {*project_ids, None}
+        with self._lock:
+            for local_key in [k for k in self._entries if k[0] in project_ids]:
+                del self._entries[local_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def single_flight(key, compute, timeout):
+    """``key`` from the shared cache, or ``compute()`` stored there by one process at a time."""
+    return _single_flight(key, compute, timeout)[0]
+
+
+def _single_flight(key, compute, timeout, stale_key=None):
+    """``(value, fresh)``; ``fresh`` is False for the ``stale_key`` value served during a rebuild."""
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+
+    lock = cache.lock(f"{key}:lock", timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT)
+    acquired = lock.acquire(blocking=False)
+    if not acquired:
+        if stale_key is not None:
+            value = cache.get(stale_key)
+            if value is not None:
+                return value, False
+        # Give up waiting after the lock would have expired anyway and compute it here
+        acquired = lock.acquire(blocking_timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT)
+        value = cache.get(key)
+        if value is not None:
+            _release(lock, acquired)
+            return value, True
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        if stale_key is not None:
+            cache.set(stale_key, value, timeout=settings.TIERED_CACHE_STALE_TIMEOUT)
+    finally:
+        _release(lock, acquired)
+    return value, True
+
+
+def _release(lock, acquired):
+    if not acquired:
+        return
+    try:
+        lock.release()
+    except LockError:
+        # Held past its timeout and taken over; nothing left to release
+        pass
+
+
+class _Listener:
+    """Per-process subscriber to ``CHANNEL``; started on first use and again after a fork."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.sequence = 0  # moves on every invalidation this process sees
+
+    def ensure_running(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="tiered-cache-listener", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Anything published while we weren't subscribed is lost
+                self.invalidate([])
+                for message in pubsub.listen():
+                    self.invalidate(json.loads(message["data"]))
+            except Exception:
+                logger.warning("Cache invalidation channel lost, reconnecting", exc_info=True)
+                time.sleep(1)
+
+    def invalidate(self, project_ids):
+        self.sequence += 1
+        for tiered in _caches:
+            tiered.evict(project_ids)
+
+
+_listener = _Listener()
+
+
+def projects_changed(project_ids):
+    """Tell every process about changes to ``project_ids`` once the current transaction commits.
+
+    Pass what is known without querying; projects bumped by a filter are
+    covered by their revision, and every call invalidates cross-project
+    entries anyway.
+    """
+    pending = getattr(_pending, "ids", None)
+    if pending is None:
+        pending = _pending.ids = set()
+    pending.update(project_ids)
+    # One callback per call, but the first to run publishes everything
+    transaction.on_commit(_publish)
+
+
+def _publish():
+    project_ids = getattr(_pending, "ids", None)
+    if project_ids is None:
+        return
+    _pending.ids = None
+    try:
+        cache.add(GENERATION_KEY, 0, timeout=None)
+        cache.incr(GENERATION_KEY)
+        get_redis_connection("default").publish(CHANNEL, json.dumps(sorted(project_ids)))
+    except Exception:
+        # The write is committed; project entries follow the revision regardless
+        logger.warning("Could not publish cache invalidation for projects %s", project_ids, exc_info=True)
+
+
+def reset():
+    """Forget every local entry and move the generation on, as if everything changed."""
+    cache.add(GENERATION_KEY, 0, timeout=None)
+    cache.incr(GENERATION_KEY)
+    _listener.invalidate([])
+    for tiered in _caches:
+        tiered.clear()
@@ -0,0 +1,170 @@
+"""Tear down projects and sites without Django's deletion collector.
+
+``Model.delete()`` loads every dependent row into memory to emulate
+ON DELETE CASCADE in Python, which for a large project means hundreds of
+thousands of objects. Here the dependents are removed leaf-first with
+chunked set-based DELETEs, each in its own short transaction, so memory
+stays flat and progress can be reported as the job goes.
+
+Every chunk commits on its own, so a failed job has done part of its work.
+It records the step it failed in, and deleting the same target again
+resumes it from what is left.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.audit.models import AuditLog
+from apps.exports.models import ExportJob
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet, Tunnel
+
+from .models import DeletionJob, Project, Site, SiteWanAddress
+from .signals import bump_project_revision
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10000
+ACTIVE_STATUSES = (DeletionJob.Status.PENDING, DeletionJob.Status.RUNNING)
+
+
+def deletion_plan(kind, target_id):
+    """Querysets to empty, in dependency order, as ``[(label, queryset), ...]``."""
+    if kind == DeletionJob.Kind.PROJECT:
+        sites = Q(site__project_id=target_id)
+        return [
+            ("hosts", Host.objects.filter(project_id=target_id)),
+            ("dhcp_pools", DHCPPool.objects.filter(project_id=target_id)),
+            ("tunnels", Tunnel.objects.filter(
+                Q(project_id=target_id) | Q(site_b__project_id=target_id),
+            )),
+            ("subnets", Subnet.objects.filter(project_id=target_id)),
+            ("vlans", VLAN.objects.filter(sites)),
+            ("wan_addresses", SiteWanAddress.objects.filter(sites)),
+            ("export_jobs", ExportJob.objects.filter(project_id=target_id)),
+            ("sites", Site.objects.filter(project_id=target_id)),
+            ("projects", Project.objects.filter(pk=target_id)),
+        ]
+    return [
+        ("hosts", Host.objects.filter(site_id=target_id)),
+        ("dhcp_pools", DHCPPool.objects.filter(site_id=target_id)),
+        ("tunnels", Tunnel.objects.filter(Q(site_a_id=target_id) | Q(site_b_id=target_id))),
+        ("subnets", Subnet.objects.filter(site_id=target_id)),
+        ("vlans", VLAN.objects.filter(site_id=target_id)),
+        ("wan_addresses", SiteWanAddress.objects.filter(site_id=target_id)),
+        ("sites", Site.objects.filter(pk=target_id)),
+    ]
+
+
+def _delete_in_chunks(queryset, on_chunk):
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list("pk", flat=True)[:CHUNK_SIZE])
+        if not ids:
+            return deleted
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {model._meta.db_table} WHERE {model._meta.pk.column} = ANY(%s)", [ids])
+            count = cursor.rowcount
+        deleted += count
+        on_chunk(count)
+        if len(ids) < CHUNK_SIZE:
+            return deleted
+
+
+def create_deletion_job(instance, user=None):
+    """Return ``(job, created)`` for deleting ``instance`` (a Project or Site), reusing one in flight.
+
+    A failed job for the same target is picked up again rather than
+    replaced, so its counts carry on; it comes back as ``created``, ready
+    to dispatch.
+    """
+    kind = DeletionJob.Kind.PROJECT if isinstance(instance, Project) else DeletionJob.Kind.SITE
+    with transaction.atomic():
+        project_id = instance.pk if kind == DeletionJob.Kind.PROJECT else instance.project_id
+        Project.objects.select_for_update().filter(pk=project_id).first()
+        job = DeletionJob.objects.filter(kind=kind, target_id=instance.pk, status__in=ACTIVE_STATUSES).first()
+        if job is not None:
+            return job, False
+        job = DeletionJob.objects.filter(
+            kind=kind, target_id=instance.pk, status=DeletionJob.Status.FAILED,
+        ).first()
+        if job is not None:
+            DeletionJob.objects.filter(pk=job.pk).update(status=DeletionJob.Status.PENDING, error="", failed_step="")
+            job.refresh_from_db()
+            return job, True
+        job = DeletionJob.objects.create(
+            kind=kind, target_id=instance.pk, target_name=instance.name[:255],
+            project_id=project_id, created_by=user,
+        )
+    return job, True
+
+
+def dispatch_deletion_job(job, host_count):
+    """Run small teardowns right away and queue big ones on the worker."""
+    if settings.DELETION_JOB_BACKEND == "inline" or host_count <= settings.DELETION_ASYNC_HOST_THRESHOLD:
+        run_deletion_job(job.pk)
+    else:
+        from .tasks import run_deletion_job as task
+
+        transaction.on_commit(lambda: task.delay(job.pk))
+
+
+def run_deletion_job(job_id):
+    """Delete the job's target and everything under it, then write one audit entry.
+
+    A resumed job starts over on whatever rows are left and adds to the
+    counts of its earlier runs.
+    """
+    job = DeletionJob.objects.get(pk=job_id)
+    jobs = DeletionJob.objects.filter(pk=job.pk)
+    jobs.update(status=DeletionJob.Status.RUNNING, started_at=timezone.now(), progress=0)
+
+    plan = deletion_plan(job.kind, job.target_id)
+    tunnels = dict(plan)["tunnels"].order_by()
+    affected_projects = set(tunnels.values_list("project_id", flat=True).distinct())
+    affected_projects |= set(tunnels.values_list("site_b__project_id", flat=True).distinct())
+    affected_projects.discard(None)
+    sizes = {label: queryset.count() for label, queryset in plan}
+    total = sum(sizes.values()) or 1
+    done = 0
+
+    counts = dict(job.counts)
+    step = None
+
+    def on_chunk(count):
+        nonlocal done
+        done += count
+        counts[step] = counts.get(step, 0) + count
+        jobs.update(progress=min(99, done * 100 // total), counts=counts)
+
+    try:
+        for step, queryset in plan:
+            counts.setdefault(step, 0)
+            if sizes[step]:
+                _delete_in_chunks(queryset, on_chunk)
+    except Exception as e:
+        logger.exception("Deletion job %s failed while deleting %s", job.pk, step)
+        # Whatever was deleted before the failure is committed, so readers must see it
+        bump_project_revision(*(affected_projects | {job.project_id}))
+        jobs.update(
+            status=DeletionJob.Status.FAILED, error=str(e), failed_step=step, counts=counts,
+            finished_at=timezone.now(),
+        )
+        return
+
+    model = Project if job.kind == DeletionJob.Kind.PROJECT else Site
+    AuditLog.objects.create(
+        user=job.created_by,
+        action=AuditLog.Action.DELETE,
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=job.target_id,
+        object_repr=job.target_name,
+        changes={"deleted": counts},
+        project_id=job.project_id,
+    )
+    bump_project_revision(*(affected_projects | {job.project_id}))
+    jobs.update(status=DeletionJob.Status.DONE, progress=100, counts=counts, finished_at=timezone.now())
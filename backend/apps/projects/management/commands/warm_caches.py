@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.projects.warmup import CacheWarmupError, warm_caches
+
+
+class Command(BaseCommand):
+    help = "Precompute cached project topology (and optionally PDF reports), in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int, help="Projects to warm (default: all)")
+        parser.add_argument("-r", "--recent", type=int, help="Only the N most recently changed projects")
+        parser.add_argument("-w", "--workers", type=int, help="Worker processes (default: CACHE_WARM_WORKERS)")
+        parser.add_argument("-d", "--deadline", type=float, help="Stop after this many seconds")
+        parser.add_argument("--pdf", action="store_true", help="Also render and cache PDF reports")
+
+    def handle(self, *args, **options):
+        try:
+            report = warm_caches(
+                options["project_ids"] or None, options["recent"], options["workers"], options["deadline"],
+                pdf=options["pdf"],
+            )
+        except CacheWarmupError as e:
+            raise CommandError(str(e))
+        self.stdout.write(json.dumps(report))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_remove_project_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Bumped on every change to the project or anything it contains'),
+        ),
+    ]
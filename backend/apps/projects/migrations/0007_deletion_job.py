@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('site', 'Site')], max_length=10)),
+                ('target_id', models.PositiveBigIntegerField()),
+                ('target_name', models.CharField(max_length=255)),
+                ('project_id', models.PositiveBigIntegerField(db_index=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent complete')),
+                ('counts', models.JSONField(default=dict, help_text='Rows deleted per table')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deletion_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'projects_deletion_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'target_id'], name='projects_de_kind_67831b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_deletion_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionjob',
+            name='failed_step',
+            field=models.CharField(blank=True, help_text='Table being emptied when the job failed', max_length=20),
+        ),
+    ]
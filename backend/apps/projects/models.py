@@ -13,6 +13,10 @@ class Project(models.Model):
         null=True,
         related_name="projects",
     )
+    revision = models.PositiveBigIntegerField(
+        default=0, editable=False,
+        help_text="Bumped on every change to the project or anything it contains",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -23,6 +27,17 @@ class Project(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The revision only ever moves by F("revision") + 1; writing back the loaded value
+        # would undo a bump made by another request since this instance was read
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != "revision"
+            ]
+        elif kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = [name for name in kwargs["update_fields"] if name != "revision"]
+        super().save(*args, **kwargs)
+
 
 class Site(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="sites")
@@ -51,3 +66,45 @@ class SiteWanAddress(models.Model):
 
     class Meta:
         ordering = ["label"]
+
+
+class DeletionJob(models.Model):
+    """Background teardown of a project or site, see ``apps.projects.deletion``."""
+
+    class Kind(models.TextChoices):
+        PROJECT = "project", "Project"
+        SITE = "site", "Site"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    # Plain ids: the rows they point at are what this job removes
+    target_id = models.PositiveBigIntegerField()
+    target_name = models.CharField(max_length=255)
+    project_id = models.PositiveBigIntegerField(db_index=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent complete")
+    counts = models.JSONField(default=dict, help_text="Rows deleted per table")
+    error = models.TextField(blank=True)
+    failed_step = models.CharField(max_length=20, blank=True, help_text="Table being emptied when the job failed")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="deletion_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "projects_deletion_job"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["kind", "target_id"])]
+
+    def __str__(self):
+        return f"Delete {self.kind} {self.target_name} ({self.status})"
@@ -1,6 +1,8 @@
+import math
+
 from rest_framework import serializers
 
-from .models import Project, Site, SiteWanAddress
+from .models import DeletionJob, Project, Site, SiteWanAddress
 
 
 class SiteWanAddressSerializer(serializers.ModelSerializer):
@@ -9,12 +11,18 @@ class SiteWanAddressSerializer(serializers.ModelSerializer):
         fields = ["id", "ip_address", "label"]
 
 
+def _finite(value):
+    # The coordinate columns accept NaN, which has no JSON representation
+    if value is not None and not math.isfinite(value):
+        raise serializers.ValidationError("Must be a finite number.")
+
+
 class SiteSerializer(serializers.ModelSerializer):
     vlan_count = serializers.IntegerField(read_only=True, default=0)
     host_count = serializers.IntegerField(read_only=True, default=0)
     wan_addresses = SiteWanAddressSerializer(many=True, required=False, default=[])
-    latitude = serializers.FloatField(allow_null=True, required=False)
-    longitude = serializers.FloatField(allow_null=True, required=False)
+    latitude = serializers.FloatField(allow_null=True, required=False, validators=[_finite])
+    longitude = serializers.FloatField(allow_null=True, required=False, validators=[_finite])
 
     class Meta:
         model = Site
@@ -73,3 +81,13 @@ class ProjectListSerializer(serializers.ModelSerializer):
             "id", "name", "description", "supernet",
             "created_by_username", "site_count", "created_at",
         ]
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = [
+            "id", "kind", "target_id", "target_name", "project_id", "status", "progress",
+            "counts", "error", "failed_step", "created_at", "started_at", "finished_at",
+        ]
+        read_only_fields = fields
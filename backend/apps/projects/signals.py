@@ -0,0 +1,54 @@
+"""Keep Project.revision in step with changes to the project's contents.
+
+Cached artifacts (PDF reports, exports, topology) are keyed on the revision,
+so any write that can change what a project looks like must bump it.
+"""
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet, Tunnel
+
+from .cache import projects_changed
+from .models import Project, Site, SiteWanAddress
+
+
+def bump_project_revision(*project_ids, q=None):
+    """Increment the revision of the given projects and of any matching ``q``."""
+    project_ids = [pk for pk in project_ids if pk]
+    condition = Q(pk__in=project_ids)
+    if q is not None:
+        condition |= q
+    Project.objects.filter(condition).update(revision=F("revision") + 1)
+    projects_changed(project_ids)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    bump_project_revision(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Site)
+@receiver([post_save, post_delete], sender=Subnet)
+def project_member_changed(sender, instance, **kwargs):
+    bump_project_revision(instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=VLAN)
+@receiver([post_save, post_delete], sender=SiteWanAddress)
+def site_member_changed(sender, instance, **kwargs):
+    bump_project_revision(q=Q(sites=instance.site_id))
+
+
+@receiver([post_save, post_delete], sender=Host)
+@receiver([post_save, post_delete], sender=DHCPPool)
+def subnet_member_changed(sender, instance, **kwargs):
+    # Hosts and pools carry their subnet's project, so this is a primary key update
+    bump_project_revision(instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=Tunnel)
+def tunnel_changed(sender, instance, **kwargs):
+    # Cross-project tunnels show up in the topology of site B's project too.
+    q = Q(sites=instance.site_b_id) if instance.site_b_id else None
+    bump_project_revision(instance.project_id, q=q)
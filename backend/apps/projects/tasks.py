@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from . import deletion
+
+
+@shared_task
+def run_deletion_job(job_id):
+    deletion.run_deletion_job(job_id)
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.ipam.models import Host, Subnet
+from apps.projects import cache as tiered_cache
+from apps.projects.cache import TieredCache, single_flight
+from apps.projects.models import Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Campus", created_by=admin_user)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.django_db
+class TestTieredCache:
+    def test_local_then_shared_tier(self, project, settings):
+        tiered = TieredCache("test-tiers")
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"sites": ["HQ"]}
+
+        first = tiered.get_or_set("k", compute, project=project)
+        assert tiered.get_or_set("k", compute, project=project) is first
+        tiered.clear()
+        # Another worker: decoded from Redis, not recomputed
+        assert tiered.get_or_set("k", compute, project=project) == first
+        assert len(calls) == 1
+
+        project.revision += 1
+        tiered.get_or_set("k", compute, project=project)
+        assert len(calls) == 2
+
+        settings.TIERED_CACHE_LOCAL_SIZE = 2
+        for key in "abc":
+            tiered.get_or_set(key, compute, project=project)
+        assert [k for _, k in tiered._entries] == ["b", "c"]
+
+    def test_topology_follows_revision(self, api_client, project):
+        url = f"/api/v1/projects/{project.id}/topology/"
+        assert api_client.get(url).data["sites"] == []
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(url)
+        assert not any("ipam_subnet" in q["sql"] for q in queries.captured_queries)
+
+        # No invalidation message here (the test transaction never commits); the revision is enough
+        Site.objects.create(project=project, name="HQ")
+        assert [s["name"] for s in api_client.get(url).data["sites"]] == ["HQ"]
+
+    def test_search_invalidated_over_pubsub(self, api_client, project, django_capture_on_commit_callbacks):
+        site = Site.objects.create(project=project, name="HQ")
+        subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+        assert api_client.get("/api/v1/search/", {"q": "core-sw"}).data["results"] == []
+
+        sequence = tiered_cache._listener.sequence
+        with django_capture_on_commit_callbacks(execute=True):
+            Host.objects.create(subnet=subnet, ip_address="10.0.0.5", hostname="core-sw1")
+        wait_for(lambda: tiered_cache._listener.sequence > sequence)
+
+        results = api_client.get("/api/v1/search/", {"q": "core-sw"}).data["results"]
+        assert [r["secondary"] for r in results] == ["core-sw1"]
+
+
+class TestSingleFlight:
+    def test_one_computation_for_concurrent_misses(self):
+        key = f"test:single-flight:{time.time_ns()}"
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "payload"
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight(key, compute, 60))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == ["payload"] * 5
+        assert len(calls) == 1
+
+    @pytest.mark.django_db
+    def test_stale_while_revalidate(self, project):
+        tiered = TieredCache("test-stale")
+        assert tiered.get_or_set("k", lambda: "r0", project=project) == "r0"
+
+        project.revision += 1
+        lock = cache.lock(f"tiered:test-stale:{project.pk}:{project.revision}:k:lock", timeout=10)
+        assert lock.acquire(blocking=False)
+        try:
+            # Another process is rebuilding: the previous value, without waiting or computing
+            assert tiered.get_or_set("k", lambda: pytest.fail("computed"), project=project) == "r0"
+        finally:
+            lock.release()
+        # Served stale values aren't kept locally
+        assert tiered.get_or_set("k", lambda: "r1", project=project) == "r1"
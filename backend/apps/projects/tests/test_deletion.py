@@ -0,0 +1,102 @@
+import pytest
+
+from apps.audit.models import AuditLog
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet, Tunnel
+from apps.projects import deletion
+from apps.projects.models import DeletionJob, Project, Site
+
+
+@pytest.fixture
+def project(admin_user):
+    project = Project.objects.create(name="Teardown", created_by=admin_user)
+    for s in range(2):
+        site = Site.objects.create(project=project, name=f"Site {s}")
+        vlan = VLAN.objects.create(site=site, vlan_id=10, name="Users")
+        subnet = Subnet.objects.create(project=project, site=site, vlan=vlan, network=f"10.{s}.0.0/24")
+        pool = DHCPPool.objects.create(subnet=subnet, start_ip=f"10.{s}.0.200", end_ip=f"10.{s}.0.250")
+        Host.objects.bulk_create([Host(subnet=subnet, ip_address=f"10.{s}.0.{i}") for i in range(2, 102)])
+        Host.objects.create(subnet=subnet, ip_address=f"10.{s}.0.210", ip_type="dhcp_lease", dhcp_pool=pool)
+    return project
+
+
+@pytest.fixture
+def neighbour(admin_user, project):
+    """Another project with a tunnel into ``project``'s first site."""
+    other = Project.objects.create(name="Neighbour", created_by=admin_user)
+    site = Site.objects.create(project=other, name="Remote")
+    Tunnel.objects.create(
+        project=other, name="to-teardown", tunnel_type="gre", tunnel_subnet="172.16.0.0/30",
+        site_a=site, ip_a="172.16.0.1", site_b=project.sites.get(name="Site 0"), ip_b="172.16.0.2",
+    )
+    return other
+
+
+@pytest.mark.django_db
+class TestDeletion:
+    @pytest.fixture(autouse=True)
+    def inline(self, settings):
+        settings.DELETION_JOB_BACKEND = "inline"
+
+    def test_project_deleted_with_one_audit_entry(self, api_client, project, neighbour):
+        revision = neighbour.revision
+        response = api_client.delete(f"/api/v1/projects/{project.id}/")
+        assert response.status_code == 204
+        assert not Project.objects.filter(pk=project.pk).exists()
+        assert not Host.objects.exists() and not Subnet.objects.exists()
+        assert not Tunnel.objects.exists()
+        assert Site.objects.get().name == "Remote"
+
+        entry = AuditLog.objects.get()
+        assert entry.action == "delete" and entry.object_id == project.pk
+        assert entry.changes["deleted"]["hosts"] == 202
+        assert entry.changes["deleted"]["sites"] == 2
+        neighbour.refresh_from_db()
+        assert neighbour.revision > revision
+
+    def test_site_deletion_leaves_rest_of_project(self, api_client, project):
+        site = project.sites.get(name="Site 1")
+        response = api_client.delete(f"/api/v1/projects/{project.id}/sites/{site.id}/")
+        assert response.status_code == 204
+        assert Host.objects.count() == 101
+        assert list(project.sites.values_list("name", flat=True)) == ["Site 0"]
+
+    def test_no_collector_per_row_work(self, api_client, project, django_assert_max_num_queries):
+        # A few statements per table, however many rows there are
+        with django_assert_max_num_queries(60):
+            api_client.delete(f"/api/v1/projects/{project.id}/")
+
+    def test_large_project_is_queued(self, api_client, project, settings):
+        settings.DELETION_JOB_BACKEND = "celery"
+        settings.DELETION_ASYNC_HOST_THRESHOLD = 10
+        response = api_client.delete(f"/api/v1/projects/{project.id}/")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "pending"
+        # A repeated request reports the same job
+        assert api_client.delete(f"/api/v1/projects/{project.id}/").json()["id"] == job["id"]
+        assert api_client.get(f"/api/v1/deletion-jobs/{job['id']}/").json()["target_name"] == "Teardown"
+        assert DeletionJob.objects.count() == 1
+
+    def test_failed_job_records_step_and_resumes(self, api_client, project, monkeypatch):
+        real_delete = deletion._delete_in_chunks
+
+        def failing(queryset, on_chunk):
+            if queryset.model is Subnet:
+                raise RuntimeError("connection lost")
+            return real_delete(queryset, on_chunk)
+
+        monkeypatch.setattr(deletion, "_delete_in_chunks", failing)
+        response = api_client.delete(f"/api/v1/projects/{project.id}/")
+        assert response.status_code == 202
+        job = response.json()
+        assert (job["status"], job["failed_step"], job["error"]) == ("failed", "subnets", "connection lost")
+        assert job["counts"]["hosts"] == 202
+        assert not Host.objects.exists() and Subnet.objects.count() == 2
+
+        monkeypatch.setattr(deletion, "_delete_in_chunks", real_delete)
+        assert api_client.delete(f"/api/v1/projects/{project.id}/").status_code == 204
+        job = DeletionJob.objects.get()
+        assert (job.status, job.failed_step) == ("done", "")
+        assert job.counts["hosts"] == 202 and job.counts["subnets"] == 2
+        assert not Project.objects.filter(pk=project.pk).exists()
+        assert AuditLog.objects.get().changes["deleted"] == job.counts
@@ -1,22 +1,11 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
 from apps.accounts.models import User
-from apps.projects.models import Project
-
-
-@pytest.fixture
-def admin_user(db):
-    return User.objects.create_user(
-        username="admin", password="testpass123", role=User.Role.ADMIN,
-    )
-
-
-@pytest.fixture
-def api_client(admin_user):
-    client = APIClient()
-    client.force_authenticate(user=admin_user)
-    return client
+from apps.ipam.models import Host, Subnet
+from apps.projects.models import Project, Site
 
 
 @pytest.mark.django_db
@@ -49,3 +38,35 @@ class TestProjectAPI:
         client = APIClient()
         response = client.get("/api/v1/projects/")
         assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestProjectRevision:
+    def test_host_write_bumps_its_project_by_pk(self, admin_user):
+        project = Project.objects.create(name="Campus", created_by=admin_user)
+        other = Project.objects.create(name="Branch", created_by=admin_user)
+        site = Site.objects.create(project=project, name="HQ")
+        subnet = Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+        before = dict(Project.objects.values_list("pk", "revision"))
+
+        with CaptureQueriesContext(connection) as queries:
+            host = Host.objects.create(subnet=subnet, ip_address="10.0.0.5")
+        bumps = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "projects_project"')]
+        assert len(bumps) == 1 and "ipam_subnet" not in bumps[0]
+
+        host.delete()
+        after = dict(Project.objects.values_list("pk", "revision"))
+        assert after[project.pk] == before[project.pk] + 2
+        assert after[other.pk] == before[other.pk]
+
+    def test_saving_a_stale_instance_keeps_newer_revision(self, admin_user):
+        project = Project.objects.create(name="Campus", created_by=admin_user)
+        stale = Project.objects.get(pk=project.pk)
+        Site.objects.create(project=project, name="HQ")
+        bumped = Project.objects.values_list("revision", flat=True).get(pk=project.pk)
+
+        stale.name = "Renamed"
+        stale.save()
+        project.refresh_from_db()
+        assert project.name == "Renamed"
+        assert project.revision == bumped + 1
@@ -0,0 +1,55 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.audit.signals import create_audit_log
+from apps.ipam.models import Subnet
+from apps.projects import cache as tiered_cache
+from apps.projects.models import Project, Site
+from apps.projects.warmup import recently_active
+
+
+@pytest.fixture
+def projects(admin_user):
+    created = []
+    for name in ("Campus", "Branch"):
+        project = Project.objects.create(name=name, created_by=admin_user)
+        site = Site.objects.create(project=project, name="HQ")
+        Subnet.objects.create(project=project, site=site, network="10.0.0.0/24")
+        created.append(project)
+    return created
+
+
+def warm(*args):
+    out = io.StringIO()
+    call_command("warm_caches", "--workers", "1", *args, stdout=out)
+    report = json.loads(out.getvalue())
+    del report["seconds"]
+    return report
+
+
+@pytest.mark.django_db
+class TestWarmCaches:
+    def test_first_request_is_warm(self, api_client, projects):
+        assert warm() == {"projects": 2, "warmed": 2, "skipped": 0}
+        # A worker that has never served the project: only Redis, no topology queries
+        tiered_cache.reset()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"/api/v1/projects/{projects[0].id}/topology/")
+        assert [s["name"] for s in response.data["sites"]] == ["HQ"]
+        assert not any("ipam_subnet" in q["sql"] for q in queries.captured_queries)
+
+    def test_recent_and_deadline(self, projects):
+        campus, branch = projects
+        Project.objects.filter(pk=branch.pk).update(updated_at=campus.updated_at)
+        create_audit_log(Site.objects.get(project=branch), "update")
+        assert recently_active(1) == [branch.id]
+        assert warm("--recent", "1")["warmed"] == 1
+
+        assert warm("--deadline", "0") == {"projects": 2, "warmed": 0, "skipped": 2}
+        with pytest.raises(CommandError, match="Unknown project"):
+            warm("999999")
@@ -0,0 +1,70 @@
+"""Project topology served to the visualization, cached per project revision."""
+from django.db.models import Prefetch, Q
+
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet, Tunnel
+from apps.ipam.serializers import ProjectTopologySerializer
+
+from .cache import TieredCache
+from .models import Site
+
+topology_cache = TieredCache("topology")
+
+
+def project_topology(project):
+    return topology_cache.get_or_set("", lambda: build_topology(project), project=project)
+
+
+def build_topology(project):
+    """Sites with their VLANs, subnets, hosts and pools, plus the tunnels touching the project."""
+    sites = (
+        Site.objects.filter(project=project)
+        .prefetch_related(
+            "wan_addresses",
+            Prefetch(
+                "vlans",
+                queryset=VLAN.objects.prefetch_related(
+                    Prefetch(
+                        "subnets",
+                        queryset=Subnet.objects.prefetch_related(
+                            Prefetch(
+                                "hosts",
+                                queryset=Host.objects.filter(ip_type="static"),
+                            ),
+                            Prefetch(
+                                "dhcp_pools",
+                                queryset=DHCPPool.objects.prefetch_related(
+                                    Prefetch(
+                                        "leases",
+                                        queryset=Host.objects.filter(ip_type="dhcp_lease"),
+                                    )
+                                ),
+                            ),
+                        ),
+                    )
+                ),
+            ),
+            Prefetch(
+                "subnets",
+                queryset=Subnet.objects.filter(vlan__isnull=True).prefetch_related(
+                    Prefetch("hosts", queryset=Host.objects.filter(ip_type="static")),
+                    Prefetch(
+                        "dhcp_pools",
+                        queryset=DHCPPool.objects.prefetch_related(
+                            Prefetch("leases", queryset=Host.objects.filter(ip_type="dhcp_lease"))
+                        ),
+                    ),
+                ),
+            ),
+        )
+    )
+
+    tunnels = Tunnel.objects.filter(
+        Q(project=project) | Q(site_b__project=project)
+    ).select_related("site_a", "site_b", "site_b__project").distinct()
+
+    data = {
+        "sites": sites,
+        "tunnels": tunnels,
+        "standalone_subnets": Subnet.objects.none(),
+    }
+    return ProjectTopologySerializer(data).data
@@ -6,6 +6,7 @@ from . import views
 
 router = DefaultRouter()
 router.register(r"projects", views.ProjectViewSet, basename="project")
+router.register(r"deletion-jobs", views.DeletionJobViewSet, basename="deletion-job")
 
 projects_router = NestedDefaultRouter(router, r"projects", lookup="project")
 projects_router.register(r"sites", views.SiteViewSet, basename="project-sites")
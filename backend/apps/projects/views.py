@@ -1,16 +1,26 @@
-from django.db.models import Count, Prefetch, Q
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from rest_framework import viewsets
+from django.db.models import Count
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from apps.ipam.models import VLAN, Host, Subnet, Tunnel, DHCPPool
+from apps.ipam.models import Host
 from apps.ipam.permissions import ProjectPermission
-from apps.ipam.serializers import ProjectTopologySerializer
 
-from .models import Project, Site
-from .serializers import ProjectListSerializer, ProjectSerializer, SiteSerializer
+from .deletion import create_deletion_job, dispatch_deletion_job
+from .models import DeletionJob, Project, Site
+from .serializers import DeletionJobSerializer, ProjectListSerializer, ProjectSerializer, SiteSerializer
+from .topology import project_topology
+
+
+def _start_deletion(request, instance, host_count):
+    """Delete ``instance`` through a deletion job: 204 once it's gone, 202 while it's queued."""
+    job, created = create_deletion_job(instance, user=request.user)
+    if created:
+        dispatch_deletion_job(job, host_count)
+        job.refresh_from_db()
+    if job.status == DeletionJob.Status.DONE:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -28,65 +38,15 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return ProjectListSerializer
         return ProjectSerializer
 
-    @method_decorator(cache_page(30))
+    def destroy(self, request, *args, **kwargs):
+        project = self.get_object()
+        return _start_deletion(request, project, Host.objects.filter(project=project).count())
+
     @action(detail=True, methods=["get"], url_path="topology")
     def topology(self, request, pk=None):
-        """Full project topology for visualization."""
+        """Full project topology for visualization, cached per project revision."""
         project = self.get_object()
-
-        sites = (
-            Site.objects.filter(project=project)
-            .prefetch_related(
-                "wan_addresses",
-                Prefetch(
-                    "vlans",
-                    queryset=VLAN.objects.prefetch_related(
-                        Prefetch(
-                            "subnets",
-                            queryset=Subnet.objects.prefetch_related(
-                                Prefetch(
-                                    "hosts",
-                                    queryset=Host.objects.filter(ip_type="static"),
-                                ),
-                                Prefetch(
-                                    "dhcp_pools",
-                                    queryset=DHCPPool.objects.prefetch_related(
-                                        Prefetch(
-                                            "leases",
-                                            queryset=Host.objects.filter(ip_type="dhcp_lease"),
-                                        )
-                                    ),
-                                ),
-                            ),
-                        )
-                    ),
-                ),
-                Prefetch(
-                    "subnets",
-                    queryset=Subnet.objects.filter(vlan__isnull=True).prefetch_related(
-                        Prefetch("hosts", queryset=Host.objects.filter(ip_type="static")),
-                        Prefetch(
-                            "dhcp_pools",
-                            queryset=DHCPPool.objects.prefetch_related(
-                                Prefetch("leases", queryset=Host.objects.filter(ip_type="dhcp_lease"))
-                            ),
-                        ),
-                    ),
-                ),
-            )
-        )
-
-        tunnels = Tunnel.objects.filter(
-            Q(project=project) | Q(site_b__project=project)
-        ).select_related("site_a", "site_b", "site_b__project").distinct()
-
-        data = {
-            "sites": sites,
-            "tunnels": tunnels,
-            "standalone_subnets": Subnet.objects.none(),
-        }
-        serializer = ProjectTopologySerializer(data)
-        return Response(serializer.data)
+        return Response(project_topology(project))
 
 
 class SiteViewSet(viewsets.ModelViewSet):
@@ -110,3 +70,17 @@ class SiteViewSet(viewsets.ModelViewSet):
             serializer.save(project_id=project_pk)
         else:
             serializer.save()
+
+    def destroy(self, request, *args, **kwargs):
+        site = self.get_object()
+        return _start_deletion(request, site, Host.objects.filter(site=site).count())
+
+
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of project and site deletions."""
+    serializer_class = DeletionJobSerializer
+    permission_classes = [ProjectPermission]
+    filterset_fields = ["kind", "status", "project_id"]
+
+    def get_queryset(self):
+        return DeletionJob.objects.all()
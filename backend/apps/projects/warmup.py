@@ -0,0 +1,94 @@
+"""Fill the shared cache ahead of users, e.g. after a deploy or a Redis restart."""
+import time
+from concurrent.futures import TimeoutError, as_completed
+
+from django.conf import settings
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+from apps.audit.models import AuditLog
+from apps.exports.pool import make_pool
+from apps.exports.reports import build_cached_project_pdf
+
+from .models import Project
+from .topology import project_topology
+
+
+class CacheWarmupError(Exception):
+    pass
+
+
+def warm_project(project_id, pdf=False):
+    """Build and store one project's cached artifacts; runs in pool workers.
+
+    Returns the project id, or None if the project is gone by now.
+    """
+    project = Project.objects.filter(pk=project_id).first()
+    if project is None:
+        return None
+    project_topology(project)
+    if pdf:
+        build_cached_project_pdf(project)
+    return project_id
+
+
+def recently_active(limit):
+    """Ids of the ``limit`` projects with the latest audited change (or edit of the project itself)."""
+    last_change = AuditLog.objects.filter(project_id=OuterRef("pk")).order_by("-timestamp").values("timestamp")[:1]
+    return list(
+        Project.objects.annotate(active_at=Greatest(Subquery(last_change), F("updated_at")))
+        .order_by("-active_at", "pk")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+
+def warm_caches(project_ids=None, recent=None, workers=None, deadline=None, pdf=False):
+    """Warm the given projects (default: all, or the ``recent`` most active) and return a report.
+
+    Stops handing out work after ``deadline`` seconds; projects not reached
+    by then are counted as skipped. ``{"projects", "warmed", "skipped", "seconds"}``.
+    """
+    started = time.monotonic()
+    if project_ids:
+        existing = set(Project.objects.filter(pk__in=project_ids).values_list("pk", flat=True))
+        missing = set(project_ids) - existing
+        if missing:
+            raise CacheWarmupError(f"Unknown project id(s): {', '.join(map(str, sorted(missing)))}")
+    elif recent:
+        project_ids = recently_active(recent)
+    else:
+        project_ids = list(Project.objects.order_by("pk").values_list("pk", flat=True))
+
+    workers = settings.CACHE_WARM_WORKERS if workers is None else workers
+    ends_at = None if deadline is None else started + deadline
+    warmed = sum(
+        1 for pk in _warmed(project_ids, pdf, min(workers, len(project_ids)), ends_at) if pk is not None
+    )
+    return {
+        "projects": len(project_ids),
+        "warmed": warmed,
+        "skipped": len(project_ids) - warmed,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def _warmed(project_ids, pdf, workers, ends_at):
+    if workers <= 1:
+        for project_id in project_ids:
+            if ends_at is not None and time.monotonic() >= ends_at:
+                return
+            yield warm_project(project_id, pdf)
+        return
+
+    pool = make_pool(workers)
+    try:
+        futures = [pool.submit(warm_project, project_id, pdf) for project_id in project_ids]
+        timeout = None if ends_at is None else max(ends_at - time.monotonic(), 0)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                yield future.result()
+        except TimeoutError:
+            return
+    finally:
+        # Past the deadline queued projects never start; running ones finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
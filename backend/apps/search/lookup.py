@@ -0,0 +1,167 @@
+"""Longest-prefix-match lookup of many IP addresses against every project.
+
+Each worker keeps a binary radix trie of all subnets and a hash of host
+addresses in memory. Before answering, the index compares its per-project
+revisions with the database (one small query) and reloads only the projects
+that changed, so a steady stream of lookups costs no per-address queries.
+"""
+import ipaddress
+import threading
+
+from apps.ipam.addresses import ip, network
+from apps.ipam.models import Host, Subnet
+from apps.projects.models import Project
+
+MAX_LOOKUP_IPS = 10000
+
+
+class AddressLookupError(Exception):
+    pass
+
+
+class PrefixTrie:
+    """Binary trie keyed on address bits; each node holds the subnets of exactly that prefix."""
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = [None, None, None]  # child for bit 0, child for bit 1, {subnet_id: record}
+
+    def insert(self, value, prefixlen, key, record):
+        node = self.root
+        for i in range(prefixlen):
+            bit = (value >> (self.bits - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        if node[2] is None:
+            node[2] = {}
+        node[2][key] = record
+
+    def remove(self, value, prefixlen, key):
+        node = self.root
+        for i in range(prefixlen):
+            node = node[(value >> (self.bits - 1 - i)) & 1]
+            if node is None:
+                return
+        if node[2]:
+            node[2].pop(key, None)
+
+    def matches(self, value):
+        """Records of every prefix containing ``value``, shortest first."""
+        found = []
+        node = self.root
+        shift = self.bits
+        while node is not None:
+            if node[2]:
+                found.extend(node[2].values())
+            if not shift:
+                break
+            shift -= 1
+            node = node[(value >> shift) & 1]
+        return found
+
+
+class AddressIndex:
+    """Subnets and hosts of all projects, reloaded per project when its revision moves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self._hosts = {}  # (version, int) -> {host_id: (project_id, record)}
+        self._revisions = {}  # project_id -> revision loaded
+        self._subnet_keys = {}  # project_id -> [(version, int, prefixlen, subnet_id)]
+        self._host_keys = {}  # project_id -> [((version, int), host_id)]
+
+    def refresh(self):
+        """Bring changed projects up to date; returns the number reloaded or dropped."""
+        current = dict(Project.objects.order_by().values_list("id", "revision"))
+        with self._lock:
+            stale = [pk for pk, revision in current.items() if self._revisions.get(pk) != revision]
+            gone = [pk for pk in self._revisions if pk not in current]
+            for pk in (*stale, *gone):
+                self._drop(pk)
+            if stale:
+                self._load(stale, current)
+        return len(stale) + len(gone)
+
+    def _drop(self, project_id):
+        for version, value, prefixlen, subnet_id in self._subnet_keys.pop(project_id, ()):
+            self._tries[version].remove(value, prefixlen, subnet_id)
+        for address, host_id in self._host_keys.pop(project_id, ()):
+            hosts = self._hosts.get(address)
+            if hosts is not None:
+                hosts.pop(host_id, None)
+                if not hosts:
+                    del self._hosts[address]
+        self._revisions.pop(project_id, None)
+
+    def _load(self, project_ids, revisions):
+        subnets = Subnet.objects.filter(project_id__in=project_ids).order_by().values_list(
+            "id", "network", "project_id", "project__name", "site_id", "site__name",
+            "vlan_id", "vlan__vlan_id", "vlan__name",
+        ).iterator(chunk_size=5000)
+        for subnet_id, cidr, project_id, project_name, site_id, site_name, vlan_id, vlan_number, vlan_name in subnets:
+            net = network(cidr)
+            value = int(net.network_address)
+            record = {
+                "project_id": project_id, "project": project_name,
+                "site_id": site_id, "site": site_name,
+                "vlan_id": vlan_id, "vlan": vlan_number, "vlan_name": vlan_name,
+                "subnet_id": subnet_id, "network": str(net),
+            }
+            self._tries[net.version].insert(value, net.prefixlen, subnet_id, record)
+            self._subnet_keys.setdefault(project_id, []).append((net.version, value, net.prefixlen, subnet_id))
+
+        hosts = Host.objects.filter(project_id__in=project_ids).order_by().values_list(
+            "id", "ip_address", "hostname", "device_type", "subnet_id", "project_id",
+        ).iterator(chunk_size=5000)
+        for host_id, ip_address, hostname, device_type, subnet_id, project_id in hosts:
+            address = ip(ip_address)
+            key = (address.version, int(address))
+            record = {"id": host_id, "hostname": hostname, "device_type": device_type, "subnet_id": subnet_id}
+            self._hosts.setdefault(key, {})[host_id] = (project_id, record)
+            self._host_keys.setdefault(project_id, []).append((key, host_id))
+
+        for pk in project_ids:
+            self._revisions[pk] = revisions[pk]
+
+    def lookup(self, ips, project_ids=None):
+        """One result per entry of ``ips``, in order, with every project's deepest matching subnet."""
+        results = []
+        with self._lock:
+            for raw in ips:
+                try:
+                    address = ipaddress.ip_address(str(raw).strip())
+                except ValueError:
+                    results.append({"ip": raw, "error": "Invalid IP address."})
+                    continue
+                value = int(address)
+                deepest = {}
+                for record in self._tries[address.version].matches(value):
+                    if project_ids is None or record["project_id"] in project_ids:
+                        deepest[record["project_id"]] = record
+                hosts = {}
+                for project_id, host in self._hosts.get((address.version, value), {}).values():
+                    hosts.setdefault(project_id, host)
+                results.append({
+                    "ip": str(address),
+                    "matches": [{**record, "host": hosts.get(pk)} for pk, record in deepest.items()],
+                })
+        return results
+
+
+_index = AddressIndex()
+
+
+def lookup_addresses(ips, project_ids=None):
+    """Look up ``ips`` against the worker's index after syncing it with the database."""
+    if not isinstance(ips, list) or not ips:
+        raise AddressLookupError("ips must be a non-empty list of addresses.")
+    if len(ips) > MAX_LOOKUP_IPS:
+        raise AddressLookupError(f"At most {MAX_LOOKUP_IPS} addresses per request.")
+    if project_ids is not None:
+        if not isinstance(project_ids, list) or not all(isinstance(pk, int) for pk in project_ids):
+            raise AddressLookupError("projects must be a list of project ids.")
+        project_ids = set(project_ids)
+    _index.refresh()
+    return _index.lookup(ips, project_ids)
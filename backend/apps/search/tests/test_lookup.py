@@ -0,0 +1,91 @@
+import pytest
+
+from apps.ipam.models import VLAN, Host, Subnet
+from apps.projects.models import Project, Site
+from apps.search.lookup import MAX_LOOKUP_IPS, lookup_addresses
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Campus", created_by=admin_user)
+
+
+@pytest.fixture
+def site(project):
+    return Site.objects.create(project=project, name="HQ")
+
+
+@pytest.fixture
+def subnets(project, site):
+    vlan = VLAN.objects.create(site=site, vlan_id=10, name="Users")
+    aggregate = Subnet.objects.create(project=project, site=site, network="10.0.0.0/16")
+    users = Subnet.objects.create(project=project, site=site, vlan=vlan, network="10.0.1.0/24")
+    return aggregate, users
+
+
+def lookup(client, ips, **kwargs):
+    return client.post("/api/v1/lookup/", {"ips": ips, **kwargs}, format="json")
+
+
+@pytest.mark.django_db
+class TestAddressLookup:
+    def test_longest_prefix_and_host(self, api_client, project, subnets):
+        aggregate, users = subnets
+        host = Host.objects.create(subnet=users, ip_address="10.0.1.5", hostname="pc-1", device_type="laptop")
+
+        resp = lookup(api_client, ["10.0.1.5", "10.0.2.1", "192.168.0.1", "bogus"])
+        assert resp.status_code == 200
+        exact, aggregate_only, outside, invalid = resp.data["results"]
+
+        [match] = exact["matches"]
+        assert match["subnet_id"] == users.id
+        assert match["network"] == "10.0.1.0/24"
+        assert (match["project"], match["site"], match["vlan"], match["vlan_name"]) == ("Campus", "HQ", 10, "Users")
+        assert match["host"] == {"id": host.id, "hostname": "pc-1", "device_type": "laptop", "subnet_id": users.id}
+
+        [match] = aggregate_only["matches"]
+        assert match["subnet_id"] == aggregate.id
+        assert match["host"] is None
+        assert outside == {"ip": "192.168.0.1", "matches": []}
+        assert invalid == {"ip": "bogus", "error": "Invalid IP address."}
+
+    def test_one_match_per_project(self, api_client, admin_user, project, subnets):
+        other = Project.objects.create(name="Lab", created_by=admin_user)
+        lab = Site.objects.create(project=other, name="Lab")
+        Subnet.objects.create(project=other, site=lab, network="10.0.0.0/8")
+
+        [result] = lookup(api_client, ["10.0.1.9"]).data["results"]
+        assert {m["project_id"]: m["network"] for m in result["matches"]} == {
+            project.id: "10.0.1.0/24", other.id: "10.0.0.0/8",
+        }
+
+        [result] = lookup(api_client, ["10.0.1.9"], projects=[other.id]).data["results"]
+        assert [m["project_id"] for m in result["matches"]] == [other.id]
+
+    def test_index_follows_revisions(self, api_client, project, subnets, django_assert_num_queries):
+        _, users = subnets
+        lookup_addresses(["10.0.1.7"])
+        with django_assert_num_queries(1):
+            lookup_addresses(["10.0.1.7"])
+
+        Host.objects.create(subnet=users, ip_address="10.0.1.7", hostname="printer")
+        [result] = lookup_addresses(["10.0.1.7"])
+        assert result["matches"][0]["host"]["hostname"] == "printer"
+
+        users.delete()
+        [result] = lookup_addresses(["10.0.1.7"])
+        assert [m["network"] for m in result["matches"]] == ["10.0.0.0/16"]
+
+        project.delete()
+        assert lookup_addresses(["10.0.1.7"]) == [{"ip": "10.0.1.7", "matches": []}]
+
+    def test_ipv6(self, api_client, project, site):
+        Subnet.objects.create(project=project, site=site, network="2001:db8::/48")
+        Subnet.objects.create(project=project, site=site, network="2001:db8:0:10::/64")
+        [result] = lookup(api_client, ["2001:db8:0:10::1"]).data["results"]
+        assert [m["network"] for m in result["matches"]] == ["2001:db8:0:10::/64"]
+
+    def test_validation(self, api_client):
+        assert lookup(api_client, []).status_code == 400
+        assert lookup(api_client, ["10.0.0.1"] * (MAX_LOOKUP_IPS + 1)).status_code == 400
+        assert lookup(api_client, ["10.0.0.1"], projects="1").status_code == 400
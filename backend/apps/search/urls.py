@@ -4,4 +4,5 @@ from . import views
 
 urlpatterns = [
     path("search/", views.GlobalSearchView.as_view(), name="global-search"),
+    path("lookup/", views.AddressLookupView.as_view(), name="address-lookup"),
 ]
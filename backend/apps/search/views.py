@@ -1,11 +1,17 @@
 from django.db.models import Q, Value, CharField
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.ipam.models import VLAN, Host, Subnet
+from apps.projects.cache import TieredCache
 from apps.projects.models import Project, Site
 
+from .lookup import AddressLookupError, lookup_addresses
+
+search_cache = TieredCache("search")
+
 
 class GlobalSearchView(APIView):
     permission_classes = [IsAuthenticated]
@@ -14,7 +20,10 @@ class GlobalSearchView(APIView):
         q = request.query_params.get("q", "").strip()
         if len(q) < 2:
             return Response({"results": []})
+        # Results span every project, so any committed change anywhere invalidates them
+        return Response({"results": search_cache.get_or_set(q, lambda: self._search(q))})
 
+    def _search(self, q):
         results = []
 
         # Search hosts by IP or hostname
@@ -110,4 +119,22 @@ class GlobalSearchView(APIView):
                 "project_id": project.id,
             })
 
+        return results
+
+
+class AddressLookupView(APIView):
+    """Owning project, site, VLAN, subnet and host of up to ``MAX_LOOKUP_IPS`` addresses.
+
+    Body: ``{"ips": [...], "projects": [id, ...]}``; ``projects`` is optional.
+    Every address gets one result, in request order, listing the deepest
+    matching subnet of each project that covers it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            results = lookup_addresses(data.get("ips"), data.get("projects"))
+        except AddressLookupError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({"results": results})
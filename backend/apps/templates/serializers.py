@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .models import ProjectTemplate
+from .stamping import StampError, parse_structure
+
+
+class ProjectTemplateSerializer(serializers.ModelSerializer):
+    created_by_username = serializers.CharField(source="created_by.username", read_only=True, default=None)
+
+    class Meta:
+        model = ProjectTemplate
+        fields = [
+            "id", "name", "description", "structure",
+            "created_by", "created_by_username", "created_at", "updated_at",
+        ]
+        read_only_fields = ["id", "created_by", "created_at", "updated_at"]
+
+    def validate_structure(self, value):
+        try:
+            parse_structure(value)
+        except StampError as e:
+            raise serializers.ValidationError(str(e))
+        return value
@@ -0,0 +1,354 @@
+"""Instantiate a ProjectTemplate's ``structure`` onto many sites at once.
+
+A structure looks like::
+
+    {
+        "site_prefix": 22,          # optional: carve a block this size per site lacking a supernet
+        "vlan_site_offset": 0,      # optional: add site_index * offset to every vlan_id
+        "vlans": [
+            {
+                "vlan_id": 10, "name": "Users", "purpose": "",
+                "prefix": 24,               # or "hosts_needed": 200
+                "gateway": "first",         # "first", "last", an offset, or null
+                "dhcp_pool": {"start": 100, "end": -10},
+                "hosts": [{"offset": 2, "hostname": "{site}-sw1", "device_type": "switch"}],
+            },
+        ],
+    }
+
+Offsets count from the network address, negative ones back from the
+broadcast address (-1 is the last usable address). ``{site}`` and
+``{vlan}`` in hostnames and descriptions are replaced per site.
+
+The whole plan is computed in memory against one snapshot of the project's
+address space and written with one ``bulk_create`` per model.
+"""
+import ipaddress
+
+from django.db import transaction
+
+from apps.ipam.allocation import AllocationError, BlockAllocator, prefix_for_hosts
+from apps.ipam.device_types import registry as device_types
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet, Tunnel
+from apps.projects.models import Project, Site
+from apps.projects.signals import bump_project_revision
+
+MAX_SITES = 1000
+
+
+class StampError(Exception):
+    pass
+
+
+def _int(value, name, minimum=None, maximum=None):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise StampError(f"{name} must be an integer.")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise StampError(f"{name} must be between {minimum} and {maximum}.")
+    return value
+
+
+def parse_structure(structure):
+    """Check a template structure and return it with defaults filled in."""
+    if not isinstance(structure, dict):
+        raise StampError("structure must be an object.")
+    vlans = structure.get("vlans")
+    if not isinstance(vlans, list) or not vlans:
+        raise StampError("structure.vlans must be a non-empty list.")
+
+    site_prefix = structure.get("site_prefix")
+    if site_prefix is not None:
+        _int(site_prefix, "site_prefix", 0, 128)
+    parsed = {
+        "site_prefix": site_prefix,
+        "vlan_site_offset": _int(structure.get("vlan_site_offset", 0), "vlan_site_offset", 0, 4093),
+        "vlans": [],
+    }
+
+    seen_ids = set()
+    for n, vlan in enumerate(vlans):
+        label = f"vlans[{n}]"
+        if not isinstance(vlan, dict):
+            raise StampError(f"{label} must be an object.")
+        vlan_id = _int(vlan.get("vlan_id"), f"{label}.vlan_id", 1, 4094)
+        if vlan_id in seen_ids:
+            raise StampError(f"{label}: VLAN {vlan_id} is defined twice.")
+        seen_ids.add(vlan_id)
+        if "prefix" in vlan:
+            size = ("prefix", _int(vlan["prefix"], f"{label}.prefix", 0, 128))
+        elif "hosts_needed" in vlan:
+            size = ("hosts_needed", _int(vlan["hosts_needed"], f"{label}.hosts_needed", 1))
+        else:
+            raise StampError(f"{label} needs a prefix or hosts_needed.")
+
+        gateway = vlan.get("gateway", "first")
+        if gateway not in ("first", "last", None):
+            _int(gateway, f"{label}.gateway")
+
+        pool = vlan.get("dhcp_pool")
+        if pool is not None:
+            if not isinstance(pool, dict):
+                raise StampError(f"{label}.dhcp_pool must be an object.")
+            pool = {
+                "start": _int(pool.get("start"), f"{label}.dhcp_pool.start"),
+                "end": _int(pool.get("end"), f"{label}.dhcp_pool.end"),
+                "description": str(pool.get("description", "")),
+            }
+
+        hosts = vlan.get("hosts", [])
+        if not isinstance(hosts, list) or not all(isinstance(h, dict) for h in hosts):
+            raise StampError(f"{label}.hosts must be a list of objects.")
+        parsed["vlans"].append({
+            "vlan_id": vlan_id,
+            "name": str(vlan.get("name") or f"VLAN {vlan_id}")[:100],
+            "purpose": str(vlan.get("purpose", ""))[:200],
+            "description": str(vlan.get("description", "")),
+            "size": size,
+            "gateway": gateway,
+            "dhcp_pool": pool,
+            "hosts": [
+                {
+                    "offset": _int(h.get("offset"), f"{label}.hosts[{i}].offset"),
+                    "hostname": str(h.get("hostname", "")),
+                    "device_type": str(h.get("device_type") or "other"),
+                    "description": str(h.get("description", "")),
+                }
+                for i, h in enumerate(hosts)
+            ],
+        })
+    return parsed
+
+
+def _address(net, offset):
+    base = net.network_address if offset >= 0 else net.broadcast_address
+    try:
+        address = base + offset
+    except ValueError:
+        address = None
+    if net.num_addresses > 2:
+        usable = address is not None and net.network_address < address < net.broadcast_address
+    else:
+        usable = address is not None and net.network_address <= address <= net.broadcast_address
+    if not usable:
+        raise StampError(f"Offset {offset} falls outside the usable range of {net}.")
+    return address
+
+
+def _fill(text, site, vlan_id):
+    return text.replace("{site}", site.name).replace("{vlan}", str(vlan_id))
+
+
+class SitePlan:
+    """Everything one site gets from the template, built before anything is saved."""
+
+    def __init__(self, site, index, is_new):
+        self.site = site
+        self.index = index
+        self.is_new = is_new
+        self.supernet_assigned = False
+        self.vlans = []
+        self.subnets = []
+        self.pools = []
+        self.hosts = []
+
+
+class Stamper:
+    def __init__(self, template, project):
+        self.template = template
+        self.project = project
+        self.spec = parse_structure(template.structure)
+        for vlan in self.spec["vlans"]:
+            for host in vlan["hosts"]:
+                if not device_types.is_known(host["device_type"]):
+                    raise StampError(f"Unknown device type: {host['device_type']}")
+
+        subnets = [str(n) for n in Subnet.objects.filter(project=project).values_list("network", flat=True)]
+        tunnels = [str(n) for n in Tunnel.objects.filter(project=project).values_list("tunnel_subnet", flat=True)]
+        site_blocks = [
+            str(n)
+            for n in Site.objects.filter(project=project, supernet__isnull=False).values_list("supernet", flat=True)
+        ]
+        # Address space actually in use, per IP version; site supernets are only reservations
+        self.occupied = {
+            4: BlockAllocator("0.0.0.0/0", subnets + tunnels),
+            6: BlockAllocator("::/0", subnets + tunnels),
+        }
+        self.project_space = (
+            BlockAllocator(project.supernet, subnets + tunnels + site_blocks) if project.supernet else None
+        )
+
+    def resolve_sites(self, entries):
+        """Turn the request's site list (ids of existing sites or new site objects) into plans."""
+        if not isinstance(entries, list) or not entries:
+            raise StampError("sites must be a non-empty list.")
+        if len(entries) > MAX_SITES:
+            raise StampError(f"At most {MAX_SITES} sites per call.")
+
+        ids = [e for e in entries if isinstance(e, int) and not isinstance(e, bool)]
+        existing = Site.objects.filter(project=self.project).in_bulk(ids)
+        taken_names = set(Site.objects.filter(project=self.project).values_list("name", flat=True))
+        plans = []
+        for index, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                name = str(entry.get("name") or "").strip()
+                if not name or len(name) > 200:
+                    raise StampError(f"sites[{index}]: a name of up to 200 characters is required.")
+                if name in taken_names:
+                    raise StampError(f"sites[{index}]: site {name} already exists in this project.")
+                taken_names.add(name)
+                supernet = entry.get("supernet") or None
+                if supernet:
+                    try:
+                        supernet = str(ipaddress.ip_network(str(supernet), strict=False))
+                    except ValueError:
+                        raise StampError(f"sites[{index}]: invalid supernet {supernet}.")
+                    if self.project_space is not None:
+                        self.project_space.reserve(supernet)
+                site = Site(project=self.project, name=name, address=str(entry.get("address", "")), supernet=supernet)
+                plans.append(SitePlan(site, index, is_new=True))
+            elif entry in existing:
+                plans.append(SitePlan(existing[entry], index, is_new=False))
+            else:
+                raise StampError(f"sites[{index}]: expected a site id in this project or a new site object.")
+        if len({id(p.site) for p in plans}) != len(plans):
+            raise StampError("A site is listed more than once.")
+        return plans
+
+    def _site_block(self, plan):
+        site = plan.site
+        if site.supernet:
+            return ipaddress.ip_network(str(site.supernet), strict=False)
+        if self.spec["site_prefix"] is not None and self.project_space is not None:
+            try:
+                block = self.project_space.allocate(self.spec["site_prefix"])
+            except AllocationError as e:
+                raise StampError(f"Site {site.name}: {e}")
+            site.supernet = str(block)
+            plan.supernet_assigned = True
+            return block
+        return None
+
+    def _allocate(self, site, block, prefix):
+        try:
+            if block is not None:
+                net = self.occupied[block.version].allocate(prefix, within=block)
+            elif self.project_space is not None:
+                net = self.project_space.allocate(prefix)
+                self.occupied[net.version].reserve(net)
+            else:
+                raise StampError(f"Site {site.name} has no supernet and neither does the project.")
+        except AllocationError as e:
+            raise StampError(f"Site {site.name}: {e}")
+        if self.project_space is not None:
+            self.project_space.reserve(net)
+        return net
+
+    def plan_site(self, plan, existing_vlan_ids):
+        site = plan.site
+        block = self._site_block(plan)
+        version = block.version if block is not None else (
+            self.project_space.parent.version if self.project_space is not None else 4
+        )
+        offset = self.spec["vlan_site_offset"] * plan.index
+
+        wanted = []
+        for spec in self.spec["vlans"]:
+            vlan_id = spec["vlan_id"] + offset
+            if vlan_id > 4094:
+                raise StampError(f"Site {site.name}: VLAN {vlan_id} is out of range.")
+            if vlan_id in existing_vlan_ids:
+                continue
+            kind, value = spec["size"]
+            prefix = value if kind == "prefix" else prefix_for_hosts(value, version)
+            wanted.append((prefix, vlan_id, spec))
+
+        # Largest blocks first keeps the site's space from fragmenting
+        for prefix, vlan_id, spec in sorted(wanted, key=lambda w: w[0]):
+            net = self._allocate(site, block, prefix)
+            vlan = VLAN(
+                site=site, vlan_id=vlan_id, name=_fill(spec["name"], site, vlan_id),
+                purpose=spec["purpose"], description=spec["description"],
+            )
+            gateway = None
+            if spec["gateway"] == "first":
+                gateway = _address(net, 1)
+            elif spec["gateway"] == "last":
+                gateway = _address(net, -1)
+            elif spec["gateway"] is not None:
+                gateway = _address(net, spec["gateway"])
+            subnet = Subnet(
+                project=self.project, site=site, vlan=vlan, network=str(net),
+                gateway=str(gateway) if gateway is not None else None,
+            )
+            plan.vlans.append(vlan)
+            plan.subnets.append(subnet)
+
+            taken = {gateway} if gateway is not None else set()
+            pool_range = None
+            if spec["dhcp_pool"]:
+                start = _address(net, spec["dhcp_pool"]["start"])
+                end = _address(net, spec["dhcp_pool"]["end"])
+                if start > end or (gateway is not None and start <= gateway <= end):
+                    raise StampError(f"VLAN {vlan_id}: DHCP pool {start}-{end} is invalid for {net}.")
+                pool_range = (start, end)
+                plan.pools.append(DHCPPool(
+                    subnet=subnet, start_ip=str(start), end_ip=str(end),
+                    description=_fill(spec["dhcp_pool"]["description"], site, vlan_id),
+                ))
+            for host in spec["hosts"]:
+                address = _address(net, host["offset"])
+                if address in taken or (pool_range and pool_range[0] <= address <= pool_range[1]):
+                    raise StampError(f"VLAN {vlan_id}: host address {address} is already taken in {net}.")
+                taken.add(address)
+                plan.hosts.append(Host(
+                    subnet=subnet, ip_address=str(address), hostname=_fill(host["hostname"], site, vlan_id)[:255],
+                    device_type=host["device_type"], description=_fill(host["description"], site, vlan_id),
+                ))
+
+
+def stamp_template(template, project, sites):
+    """Apply ``template`` to ``sites`` of ``project`` in one transaction.
+
+    ``sites`` holds ids of existing sites and/or objects describing new ones
+    (``name``, optional ``address`` and ``supernet``). VLANs an existing site
+    already has are skipped. Raises StampError, leaving nothing behind, if
+    any part of the plan doesn't fit.
+    """
+    with transaction.atomic():
+        project = Project.objects.select_for_update().get(pk=project.pk)
+        stamper = Stamper(template, project)
+        plans = stamper.resolve_sites(sites)
+
+        existing_vlans = {}
+        for site_id, vlan_id in VLAN.objects.filter(
+            site__in=[p.site for p in plans if not p.is_new],
+        ).values_list("site_id", "vlan_id"):
+            existing_vlans.setdefault(site_id, set()).add(vlan_id)
+        for plan in plans:
+            stamper.plan_site(plan, existing_vlans.get(plan.site.pk, set()) if not plan.is_new else set())
+
+        Site.objects.bulk_create([p.site for p in plans if p.is_new])
+        Site.objects.bulk_update(
+            [p.site for p in plans if not p.is_new and p.supernet_assigned], ["supernet"], batch_size=1000,
+        )
+        created = {
+            "sites": sum(p.is_new for p in plans),
+            "vlans": len(VLAN.objects.bulk_create([v for p in plans for v in p.vlans], batch_size=1000)),
+            "subnets": len(Subnet.objects.bulk_create([s for p in plans for s in p.subnets], batch_size=1000)),
+            "dhcp_pools": len(DHCPPool.objects.bulk_create([d for p in plans for d in p.pools], batch_size=1000)),
+            "hosts": len(Host.objects.bulk_create([h for p in plans for h in p.hosts], batch_size=1000)),
+        }
+        bump_project_revision(project.pk)
+
+    return {
+        "created": created,
+        "sites": [
+            {
+                "id": p.site.pk,
+                "name": p.site.name,
+                "supernet": str(p.site.supernet) if p.site.supernet else None,
+                "subnets": [str(s.network) for s in p.subnets],
+            }
+            for p in plans
+        ],
+    }
@@ -0,0 +1,83 @@
+import pytest
+
+from apps.ipam.models import VLAN, DHCPPool, Host, Subnet
+from apps.projects.models import Project, Site
+from apps.templates.models import ProjectTemplate
+
+BRANCH = {
+    "site_prefix": 22,
+    "vlans": [
+        {"vlan_id": 10, "name": "Users", "hosts_needed": 200, "dhcp_pool": {"start": 100, "end": -10}},
+        {"vlan_id": 20, "name": "Voice", "prefix": 25},
+        {
+            "vlan_id": 99, "name": "Mgmt", "prefix": 27, "gateway": "last",
+            "hosts": [{"offset": 2, "hostname": "{site}-sw1", "device_type": "switch"}],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def project(admin_user):
+    return Project.objects.create(name="Stores", supernet="10.0.0.0/16", created_by=admin_user)
+
+
+@pytest.fixture
+def template(admin_user):
+    return ProjectTemplate.objects.create(name="Branch", structure=BRANCH, created_by=admin_user)
+
+
+@pytest.mark.django_db
+class TestTemplateStamping:
+    def test_new_sites_get_carved_blocks(self, api_client, project, template):
+        response = api_client.post(f"/api/v1/templates/{template.id}/apply/", {
+            "project": project.id,
+            "sites": [{"name": "Store 1"}, {"name": "Store 2"}],
+        }, format="json")
+        assert response.status_code == 201
+        data = response.json()
+        assert data["created"] == {"sites": 2, "vlans": 6, "subnets": 6, "dhcp_pools": 2, "hosts": 2}
+        assert [s["supernet"] for s in data["sites"]] == ["10.0.0.0/22", "10.0.4.0/22"]
+
+        users = Subnet.objects.get(site__name="Store 2", vlan__vlan_id=10)
+        assert str(users.network) == "10.0.4.0/24"
+        assert str(users.gateway.ip) == "10.0.4.1"
+        pool = DHCPPool.objects.get(subnet=users)
+        assert (str(pool.start_ip.ip), str(pool.end_ip.ip)) == ("10.0.4.100", "10.0.4.245")
+        mgmt = Subnet.objects.get(site__name="Store 1", vlan__vlan_id=99)
+        assert str(mgmt.gateway.ip) == "10.0.1.158"
+        assert Host.objects.get(hostname="Store 1-sw1").subnet == mgmt
+
+    def test_existing_site_skips_present_vlans(self, api_client, project, template):
+        site = Site.objects.create(project=project, name="HQ", supernet="10.0.128.0/20")
+        vlan = VLAN.objects.create(site=site, vlan_id=10, name="Users")
+        Subnet.objects.create(project=project, site=site, vlan=vlan, network="10.0.128.0/24")
+        response = api_client.post(f"/api/v1/templates/{template.id}/apply/", {
+            "project": project.id, "sites": [site.id],
+        }, format="json")
+        assert response.status_code == 201
+        assert response.json()["sites"][0]["subnets"] == ["10.0.129.0/25", "10.0.129.128/27"]
+        assert VLAN.objects.filter(site=site).count() == 3
+
+    def test_out_of_space_rolls_back(self, api_client, admin_user, template):
+        project = Project.objects.create(name="Tiny", supernet="10.9.0.0/23", created_by=admin_user)
+        response = api_client.post(f"/api/v1/templates/{template.id}/apply/", {
+            "project": project.id, "sites": [{"name": "A"}, {"name": "B"}],
+        }, format="json")
+        assert response.status_code == 400
+        assert not Site.objects.filter(project=project).exists()
+
+    def test_query_count_independent_of_site_count(self, api_client, project, template, django_assert_max_num_queries):
+        sites = [{"name": f"Store {i}"} for i in range(60)]
+        with django_assert_max_num_queries(20):
+            response = api_client.post(f"/api/v1/templates/{template.id}/apply/", {
+                "project": project.id, "sites": sites,
+            }, format="json")
+        assert response.status_code == 201
+        assert Subnet.objects.filter(project=project).count() == 180
+
+    def test_invalid_structure_rejected(self, api_client):
+        response = api_client.post("/api/v1/templates/", {
+            "name": "Broken", "structure": {"vlans": [{"vlan_id": 10}]},
+        }, format="json")
+        assert response.status_code == 400
@@ -0,0 +1,41 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from apps.ipam.permissions import ProjectPermission
+from apps.projects.models import Project
+
+from .models import ProjectTemplate
+from .serializers import ProjectTemplateSerializer
+from .stamping import StampError, stamp_template
+
+
+class ProjectTemplateViewSet(viewsets.ModelViewSet):
+    serializer_class = ProjectTemplateSerializer
+    permission_classes = [ProjectPermission]
+    search_fields = ["name", "description"]
+
+    def get_queryset(self):
+        return ProjectTemplate.objects.select_related("created_by")
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    @action(detail=True, methods=["post"])
+    def apply(self, request, pk=None):
+        """Stamp this template onto new and/or existing sites of a project.
+
+        Body: ``{"project": 1, "sites": [12, {"name": "Store 042", "supernet": "10.42.0.0/22"}]}``
+        where integers are existing site ids and objects describe new sites.
+        """
+        template = self.get_object()
+        project_id = request.data.get("project")
+        if not str(project_id or "").isdigit():
+            return Response({"detail": "project is required"}, status=status.HTTP_400_BAD_REQUEST)
+        project = get_object_or_404(Project, pk=project_id)
+        try:
+            result = stamp_template(template, project, request.data.get("sites"))
+        except StampError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
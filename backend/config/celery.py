@@ -0,0 +1,10 @@
+"""Celery application for background jobs (exports, long-running reports)."""
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+app = Celery("ripenet")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
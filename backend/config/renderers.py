@@ -0,0 +1,70 @@
+"""Faster drop-in renderers for the API.
+
+``ORJSONRenderer`` produces the same bytes as DRF's ``JSONRenderer`` for
+everything the API returns, several times faster. Anything orjson has no
+native encoding for (inet/cidr values, lazy strings, decimals, datetimes so
+they keep DRF's format) goes through DRF's own encoder. Pretty-printed output,
+integers wider than 64 bits, such as IPv6 pool sizes, and floats orjson writes
+differently from ``repr()`` (``1e16`` for ``1e+16``, ``0.00001`` for
+``1e-05``) fall back to the stdlib encoder.
+
+One difference remains: orjson writes NaN and infinities as ``null`` where
+DRF's strict JSON raises ``ValueError``. Nothing the API stores can hold
+them except site coordinates, whose serializers reject non-finite values.
+
+``MessagePackRenderer`` answers ``Accept: application/msgpack`` when the
+optional ``msgpack`` package is installed.
+"""
+import re
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_default = JSONEncoder().default
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+# Float tokens orjson and repr() spell differently: exponents, and small numbers repr() writes as 1e-05.
+# A match inside a string only costs a fallback.
+_FLOAT_MISMATCH = re.compile(rb"(?:^|[:,\[])-?(?:0\.0000[0-9]*|[0-9]+(?:\.[0-9]+)?e-?[0-9]+)(?=[,\]}]|$)")
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _FLOAT_MISMATCH.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of U+2028/U+2029 as JSONRenderer, so the output stays valid JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, int):
+        # msgpack integers stop at 64 bits; wider ones (IPv6 sizes) go out as decimal strings
+        return str(obj)
+    return _default(obj)
@@ -1,4 +1,5 @@
 """Base settings for ripe-net project."""
+import importlib.util
 import os
 from pathlib import Path
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "django_filters",
     "corsheaders",
+    "netfields",
     # Local apps
     "apps.accounts",
     "apps.projects",
@@ -82,16 +84,23 @@ DATABASES = {
 }
 
 # Cache
+REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": env("REDIS_URL", default="redis://redis:6379/0"),
+        "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
     }
 }
 
+# Celery
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=REDIS_URL)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+
 # Auth
 AUTH_USER_MODEL = "accounts.User"
 
@@ -128,6 +137,45 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer",
+        # Only offered when the optional msgpack package is installed
+        *(["config.renderers.MessagePackRenderer"] if importlib.util.find_spec("msgpack") else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 50,
 }
+
+# Exports
+EXPORT_ROOT = Path(env("EXPORT_ROOT", default=str(BASE_DIR / "var" / "exports")))
+# Where export jobs run: "celery" (worker), "process" (local process pool) or "inline"
+EXPORT_JOB_BACKEND = env("EXPORT_JOB_BACKEND", default="celery")
+EXPORT_JOB_WORKERS = env.int("EXPORT_JOB_WORKERS", default=os.cpu_count() or 1)
+EXPORT_CACHE_TIMEOUT = 60 * 60 * 24
+# Seconds after which a queued or running export job counts as lost (its worker died) and is failed
+EXPORT_JOB_STALE_AFTER = env.int("EXPORT_JOB_STALE_AFTER", default=60 * 60)
+# Projects with more hosts than this get their PDF rendered on the Celery worker
+EXPORT_PDF_ASYNC_HOST_THRESHOLD = env.int("EXPORT_PDF_ASYNC_HOST_THRESHOLD", default=2000)
+
+# Project/site deletion: "celery" queues teardowns above the threshold on the worker, "inline" never does
+DELETION_JOB_BACKEND = env("DELETION_JOB_BACKEND", default="celery")
+DELETION_ASYNC_HOST_THRESHOLD = env.int("DELETION_ASYNC_HOST_THRESHOLD", default=5000)
+
+# Worker processes for ipam_check (one project per task)
+IPAM_CHECK_WORKERS = env.int("IPAM_CHECK_WORKERS", default=os.cpu_count() or 1)
+
+# Worker processes for warm_caches; each one holds a database connection
+CACHE_WARM_WORKERS = env.int("CACHE_WARM_WORKERS", default=4)
+
+# How often each process checks whether another one changed the device types
+DEVICE_TYPE_CHECK_INTERVAL = env.float("DEVICE_TYPE_CHECK_INTERVAL", default=2.0)
+
+# In-process LRU in front of Redis for topology and search results (entries per cache, seconds)
+TIERED_CACHE_LOCAL_SIZE = env.int("TIERED_CACHE_LOCAL_SIZE", default=256)
+TIERED_CACHE_LOCAL_TIMEOUT = env.float("TIERED_CACHE_LOCAL_TIMEOUT", default=60.0)
+TIERED_CACHE_TIMEOUT = env.int("TIERED_CACHE_TIMEOUT", default=60 * 60)
+# Last value per key, served while another process rebuilds it
+TIERED_CACHE_STALE_TIMEOUT = env.int("TIERED_CACHE_STALE_TIMEOUT", default=60 * 60 * 24)
+# How long one process may hold a rebuild lock before others compute the value themselves
+SINGLE_FLIGHT_LOCK_TIMEOUT = env.int("SINGLE_FLIGHT_LOCK_TIMEOUT", default=60)
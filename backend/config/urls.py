@@ -10,6 +10,7 @@ urlpatterns = [
     path("api/v1/", include("apps.search.urls")),
     path("api/v1/", include("apps.audit.urls")),
     path("api/v1/", include("apps.exports.urls")),
+    path("api/v1/", include("apps.templates.urls")),
     path("api/v1/", include("apps.accounts.urls")),
     path("api/v1/tools/", include("apps.ipam.tools_urls")),
 ]
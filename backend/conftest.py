@@ -1,6 +1,54 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.ipam.device_types import registry as device_types
+from apps.projects import cache as tiered_cache
 
 
 @pytest.fixture(autouse=True)
 def enable_db_access_for_all_tests(db):
     pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_device_types():
+    # Test transactions roll back without telling the registry
+    device_types.invalidate()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def empty_shared_cache():
+    # Project ids and revisions start over with every test database
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_tiered_caches():
+    tiered_cache.reset()
+
+
+@pytest.fixture
+def pool_database(monkeypatch):
+    """Point spawned pool workers, which read settings from the environment, at the test database.
+
+    Their queries run outside the test's transaction, so tests using this
+    need ``django_db(transaction=True)``.
+    """
+    monkeypatch.setenv("POSTGRES_DB", connection.settings_dict["NAME"])
+
+
+@pytest.fixture
+def admin_user(db):
+    return User.objects.create_user(
+        username="admin", password="testpass123", role=User.Role.ADMIN,
+    )
+
+
+@pytest.fixture
+def api_client(admin_user):
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    return client
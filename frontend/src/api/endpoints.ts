@@ -1,6 +1,8 @@
 import type {
   Project, Site, VLAN, Subnet, Host, Tunnel, DHCPPool, DeviceTypeOption,
   ProjectTopology, SearchResult, PaginatedResponse, AuditLog, User, UserAdmin,
+  BatchOperation, BatchResult, ProjectTemplate, TunnelGenerateRequest, NewTemplateSite, TemplateApplyResult,
+  DeletionJob, AddressLookupResult, ConflictReport, AllocationStrategy,
 } from '@/types'
 import apiClient from './client'
 
@@ -22,8 +24,8 @@ export const projectsApi = {
     apiClient.post<Project>('/projects/', data),
   update: (id: number, data: Partial<Project>) =>
     apiClient.patch<Project>(`/projects/${id}/`, data),
-  delete: (id: number) =>
-    apiClient.delete(`/projects/${id}/`),
+  delete: (id: number, onQueued?: (job: DeletionJob) => void) =>
+    apiClient.delete<DeletionJob | ''>(`/projects/${id}/`).then((res) => waitForDeletion(res.data, onQueued)),
   topology: (id: number) =>
     apiClient.get<ProjectTopology>(`/projects/${id}/topology/`),
 }
@@ -38,8 +40,9 @@ export const sitesApi = {
     apiClient.post<Site>(`/projects/${projectId}/sites/`, data),
   update: (projectId: number, id: number, data: Partial<Site>) =>
     apiClient.patch<Site>(`/projects/${projectId}/sites/${id}/`, data),
-  delete: (projectId: number, id: number) =>
-    apiClient.delete(`/projects/${projectId}/sites/${id}/`),
+  delete: (projectId: number, id: number, onQueued?: (job: DeletionJob) => void) =>
+    apiClient.delete<DeletionJob | ''>(`/projects/${projectId}/sites/${id}/`)
+      .then((res) => waitForDeletion(res.data, onQueued)),
 }
 
 // VLANs
@@ -68,10 +71,24 @@ export const subnetsApi = {
     apiClient.patch<Subnet>(`/subnets/${id}/`, data),
   delete: (id: number) =>
     apiClient.delete(`/subnets/${id}/`),
-  nextFreeIp: (id: number, poolId?: number) =>
-    apiClient.get<{ next_free_ip: string }>(`/subnets/${id}/next-free-ip/`, poolId ? { params: { pool: poolId } } : undefined),
+  nextFreeIp: (id: number, poolId?: number, strategy?: AllocationStrategy, mac?: string) =>
+    apiClient.get<{ next_free_ip: string }>(`/subnets/${id}/next-free-ip/`, {
+      params: { pool: poolId, strategy, mac },
+    }),
   suggestedPoolRange: (id: number) =>
     apiClient.get<{ start_ip: string; end_ip: string; size: number }>(`/subnets/${id}/suggested-pool-range/`),
+  renumber: (id: number, network: string) =>
+    apiClient.post<{ subnet: Subnet; updated: Record<'hosts' | 'dhcp_pools' | 'tunnels', number> }>(
+      `/subnets/${id}/renumber/`, { network },
+    ),
+  split: (id: number, prefix: number, vlans?: (number | null)[]) =>
+    apiClient.post<{ subnets: Subnet[]; updated: Record<'hosts' | 'dhcp_pools', number> }>(
+      `/subnets/${id}/split/`, { prefix, vlans },
+    ),
+  merge: (ids: number[]) =>
+    apiClient.post<{ subnet: Subnet; updated: Record<'hosts' | 'dhcp_pools', number> }>(
+      '/subnets/merge/', { subnets: ids },
+    ),
 }
 
 // Device Types
@@ -98,6 +115,10 @@ export const hostsApi = {
     apiClient.patch<Host>(`/hosts/${id}/`, data),
   delete: (id: number) =>
     apiClient.delete(`/hosts/${id}/`),
+  bulkUpdate: (ids: number[], data: Pick<Partial<Host>, 'device_type' | 'description'>) =>
+    apiClient.patch<{ updated: number }>('/hosts/', { ids, data }),
+  bulkDelete: (ids: number[]) =>
+    apiClient.delete<{ deleted: number }>('/hosts/', { data: { ids } }),
 }
 
 // DHCP Pools
@@ -126,6 +147,8 @@ export const tunnelsApi = {
     apiClient.patch<Tunnel>(`/tunnels/${id}/`, data),
   delete: (id: number) =>
     apiClient.delete(`/tunnels/${id}/`),
+  generate: (data: TunnelGenerateRequest) =>
+    apiClient.post<{ created: number; skipped: number; tunnels: Tunnel[] }>('/tunnels/generate/', data),
 }
 
 // Users (admin)
@@ -146,6 +169,58 @@ export const usersApi = {
 export const searchApi = {
   search: (q: string) =>
     apiClient.get<{ results: SearchResult[] }>('/search/', { params: { q } }),
+  lookup: (ips: string[], projects?: number[]) =>
+    apiClient.post<{ results: AddressLookupResult[] }>('/lookup/', { ips, projects }),
+  conflicts: (params?: { project?: number[]; limit?: number }) =>
+    apiClient.get<ConflictReport>('/conflicts/', { params, paramsSerializer: { indexes: null } }),
+}
+
+// Batch
+export const batchApi = {
+  apply: (operations: BatchOperation[]) =>
+    apiClient.post<{ results: BatchResult[] }>('/batch/', { operations }),
+}
+
+// Templates
+export const templatesApi = {
+  list: () =>
+    apiClient.get<PaginatedResponse<ProjectTemplate>>('/templates/'),
+  get: (id: number) =>
+    apiClient.get<ProjectTemplate>(`/templates/${id}/`),
+  create: (data: Partial<ProjectTemplate>) =>
+    apiClient.post<ProjectTemplate>('/templates/', data),
+  update: (id: number, data: Partial<ProjectTemplate>) =>
+    apiClient.patch<ProjectTemplate>(`/templates/${id}/`, data),
+  delete: (id: number) =>
+    apiClient.delete(`/templates/${id}/`),
+  apply: (id: number, project: number, sites: (number | NewTemplateSite)[]) =>
+    apiClient.post<TemplateApplyResult>(`/templates/${id}/apply/`, { project, sites }),
+}
+
+// Deletion jobs
+export const deletionJobsApi = {
+  get: (id: number) =>
+    apiClient.get<DeletionJob>(`/deletion-jobs/${id}/`),
+}
+
+const DELETION_POLL_MS = 1500
+
+/**
+ * Settle a project/site DELETE: a 204 is already done, a 202 hands back a
+ * deletion job that is polled until it finishes. Rejects if the job fails;
+ * deleting the same target again resumes it.
+ */
+async function waitForDeletion(data: DeletionJob | '', onQueued?: (job: DeletionJob) => void): Promise<void> {
+  if (!data) return
+  let job = data
+  onQueued?.(job)
+  while (job.status === 'pending' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, DELETION_POLL_MS))
+    job = (await deletionJobsApi.get(job.id)).data
+  }
+  if (job.status === 'failed') {
+    throw new Error(`Deletion of ${job.target_name} failed at ${job.failed_step}: ${job.error}`)
+  }
 }
 
 // Audit
@@ -162,8 +237,8 @@ export const toolsApi = {
       prefix_length: number; num_addresses: number; num_hosts: number;
       first_host: string | null; last_host: string | null; is_private: boolean;
     }>('/tools/subnet-info/', { cidr }),
-  vlsm: (cidr: string, requirements: { name: string; hosts: number }[]) =>
-    apiClient.post('/tools/vlsm/', { cidr, requirements }),
+  vlsm: (cidr: string, requirements: { name: string; hosts: number }[], cidrV6?: string) =>
+    apiClient.post('/tools/vlsm/', { cidr, requirements, cidr_v6: cidrV6 }),
 }
 
 // Export
@@ -11,7 +11,8 @@ import { SubnetForm } from '@/components/data/forms/SubnetForm'
 import { HostForm } from '@/components/data/forms/HostForm'
 import { DHCPPoolForm } from '@/components/data/forms/DHCPPoolForm'
 import { TunnelForm } from '@/components/data/forms/TunnelForm'
-import { cn } from '@/lib/utils'
+import { cn, notifyDeletionQueued } from '@/lib/utils'
+import { toast } from 'sonner'
 import {
   Plus, Pencil, Trash2, Globe, Cable, Layers,
   Building2, Network, Server, ChevronDown, ChevronRight, MapPin, Wand2,
@@ -187,8 +188,9 @@ function NetworkHierarchy({ projectId }: { projectId: number }) {
 
   // Delete mutations
   const deleteSite = useMutation({
-    mutationFn: (id: number) => sitesApi.delete(projectId, id),
+    mutationFn: (id: number) => sitesApi.delete(projectId, id, notifyDeletionQueued),
     onSuccess: () => { queryClient.invalidateQueries({ queryKey: ['sites', projectId] }); queryClient.invalidateQueries({ queryKey: ['topology'] }) },
+    onError: () => toast.error('Failed to delete site'),
   })
   const deleteVlan = useMutation({
     mutationFn: (id: number) => vlansApi.delete(id),
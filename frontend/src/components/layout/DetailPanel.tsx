@@ -5,7 +5,7 @@ import { useTopologyStore } from '@/stores/topology.store'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { sitesApi, vlansApi, subnetsApi, hostsApi, tunnelsApi, dhcpPoolsApi } from '@/api/endpoints'
 import { CopyableIP } from '@/components/shared/CopyableIP'
-import { cn } from '@/lib/utils'
+import { cn, notifyDeletionQueued } from '@/lib/utils'
 import { SubnetUtilBar } from '@/components/shared/SubnetUtilBar'
 import { Dialog } from '@/components/ui/Dialog'
 import { SiteForm } from '@/components/data/forms/SiteForm'
@@ -103,13 +103,14 @@ function SiteDetail({ siteId, projectId }: { siteId: number; projectId: number }
   })
 
   const deleteMutation = useMutation({
-    mutationFn: () => sitesApi.delete(projectId, siteId),
+    mutationFn: () => sitesApi.delete(projectId, siteId, notifyDeletionQueued),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['sites'] })
       queryClient.invalidateQueries({ queryKey: ['topology'] })
       useSelectionStore.getState().setSelectedSite(null)
       toast.success('Site deleted')
     },
+    onError: () => toast.error('Failed to delete site'),
   })
 
   if (!site) return <DetailLoading />
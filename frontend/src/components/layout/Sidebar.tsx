@@ -4,7 +4,7 @@ import { useNavigate, useParams, useLocation } from 'react-router-dom'
 import { projectsApi, sitesApi, vlansApi, subnetsApi, hostsApi, tunnelsApi, dhcpPoolsApi } from '@/api/endpoints'
 import { useSelectionStore } from '@/stores/selection.store'
 import { useUIStore } from '@/stores/ui.store'
-import { cn, copyToClipboard } from '@/lib/utils'
+import { cn, copyToClipboard, notifyDeletionQueued } from '@/lib/utils'
 import { Dialog } from '@/components/ui/Dialog'
 import { DropdownMenu } from '@/components/ui/DropdownMenu'
 import { SiteForm } from '@/components/data/forms/SiteForm'
@@ -159,12 +159,13 @@ function ProjectTreeItem({
   const toggleExpanded = useSelectionStore((s) => s.toggleExpandedProject)
 
   const deleteMutation = useMutation({
-    mutationFn: () => projectsApi.delete(project.id),
+    mutationFn: () => projectsApi.delete(project.id, notifyDeletionQueued),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] })
       toast.success('Project deleted')
       if (isActive) navigate('/projects')
     },
+    onError: () => toast.error('Failed to delete project'),
   })
 
   const { data: sitesData } = useQuery({
@@ -284,12 +285,13 @@ function SiteTreeItem({ site, projectId }: { site: Site; projectId: number }) {
   const [editOpen, setEditOpen] = useState(false)
 
   const deleteMutation = useMutation({
-    mutationFn: () => sitesApi.delete(projectId, site.id),
+    mutationFn: () => sitesApi.delete(projectId, site.id, notifyDeletionQueued),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['sites', projectId] })
       queryClient.invalidateQueries({ queryKey: ['topology'] })
       toast.success('Site deleted')
     },
+    onError: () => toast.error('Failed to delete site'),
   })
 
   const { data: vlansData } = useQuery({
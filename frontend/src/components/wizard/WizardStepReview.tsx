@@ -3,7 +3,8 @@ import { useNavigate } from 'react-router-dom'
 import { useQueryClient } from '@tanstack/react-query'
 import { toast } from 'sonner'
 import { CheckCircle2, Loader2, XCircle } from 'lucide-react'
-import { projectsApi, sitesApi, vlansApi, subnetsApi, tunnelsApi } from '@/api/endpoints'
+import { batchApi } from '@/api/endpoints'
+import type { BatchOperation } from '@/types'
 import type { WizardState } from '@/lib/wizard.types'
 import { getVlanIdForSite } from '@/lib/wizard.utils'
 
@@ -14,11 +15,7 @@ interface Props {
 
 type CreationPhase =
   | 'idle'
-  | 'project'
-  | 'sites'
-  | 'vlans'
-  | 'subnets'
-  | 'tunnels'
+  | 'creating'
   | 'done'
   | 'error'
 
@@ -59,68 +56,63 @@ export function WizardStepReview({ state, onBack }: Props) {
 
   const createAll = async () => {
     try {
+      // Everything goes to the server as one ordered batch, applied in a single
+      // transaction; later operations point at earlier creates through "$ref".
+      const operations: BatchOperation[] = []
+
       // 1. Project
-      let projectId = state.projectId!
+      let projectRef: number | string = state.projectId!
       if (state.projectMode === 'new') {
-        setProgress({ phase: 'project', current: 0, total: 1 })
-        const res = await projectsApi.create({
-          name: state.projectName,
-          description: state.projectDescription,
-          supernet: state.supernet,
+        operations.push({
+          op: 'create', resource: 'project', ref: 'project',
+          data: { name: state.projectName, description: state.projectDescription, supernet: state.supernet },
         })
-        projectId = res.data.id
+        projectRef = '$project'
       }
 
       // 2. Sites — skip existing ones (realId set)
-      const siteIdMap = new Map<string, number>()
+      const siteIdMap = new Map<string, number | string>()
       for (const site of state.sites) {
         if (site.realId) siteIdMap.set(site.tempId, site.realId)
       }
-      setProgress({ phase: 'sites', current: 0, total: newSites.length })
-      for (let i = 0; i < newSites.length; i++) {
-        const site = newSites[i]
-        const res = await sitesApi.create(projectId, {
-          name: site.name,
-          address: site.address,
-          supernet: state.siteSupernetsEnabled && site.supernet?.trim() ? site.supernet.trim() : null,
-          latitude: site.latitude,
-          longitude: site.longitude,
-          wan_addresses: site.wanAddresses.filter((w) => w.ip_address.trim()),
+      newSites.forEach((site, i) => {
+        operations.push({
+          op: 'create', resource: 'site', ref: `site${i}`,
+          data: {
+            project: projectRef,
+            name: site.name,
+            address: site.address,
+            supernet: state.siteSupernetsEnabled && site.supernet?.trim() ? site.supernet.trim() : null,
+            latitude: site.latitude,
+            longitude: site.longitude,
+            wan_addresses: site.wanAddresses.filter((w) => w.ip_address.trim()),
+          },
         })
-        siteIdMap.set(site.tempId, res.data.id)
-        setProgress({ phase: 'sites', current: i + 1, total: newSites.length })
-      }
+        siteIdMap.set(site.tempId, `$site${i}`)
+      })
 
       // 2b. Update existing sites with WAN addresses if changed
       const existingSites = state.sites.filter((s) => s.realId)
       for (const site of existingSites) {
         const wanFiltered = site.wanAddresses.filter((w) => w.ip_address.trim())
         if (wanFiltered.length > 0) {
-          await sitesApi.update(projectId, site.realId!, {
-            wan_addresses: wanFiltered,
-          })
+          operations.push({ op: 'update', resource: 'site', id: site.realId!, data: { wan_addresses: wanFiltered } })
         }
       }
 
       // 3. VLANs — skip existing ones (realVlanId set), create new
-      const vlanIdMap = new Map<string, number>() // key: "siteTempId:vlanTempId"
+      const vlanIdMap = new Map<string, number | string>() // key: "siteTempId:vlanTempId"
       // Pre-populate map with existing VLANs
       for (const entry of state.addressPlan) {
         if (entry.realVlanId) {
           vlanIdMap.set(`${entry.siteTempId}:${entry.vlanTempId}`, entry.realVlanId)
         }
       }
-      setProgress({ phase: 'vlans', current: 0, total: newAddressEntries.length })
-      for (let i = 0; i < newAddressEntries.length; i++) {
-        const entry = newAddressEntries[i]
-        // Skip if we already have a real VLAN ID for this combination
+      newAddressEntries.forEach((entry, i) => {
+        // Skip if we already have a VLAN for this combination
         const mapKey = `${entry.siteTempId}:${entry.vlanTempId}`
-        if (vlanIdMap.has(mapKey)) {
-          setProgress({ phase: 'vlans', current: i + 1, total: newAddressEntries.length })
-          continue
-        }
+        if (vlanIdMap.has(mapKey)) return
 
-        const realSiteId = siteIdMap.get(entry.siteTempId)!
         const siteIdx = state.sites.findIndex((s) => s.tempId === entry.siteTempId)
 
         let effectiveVlanId: number
@@ -141,36 +133,36 @@ export function WizardStepReview({ state, onBack }: Props) {
           effectivePurpose = tpl.purpose
         }
 
-        const res = await vlansApi.create({
-          site: realSiteId,
-          vlan_id: effectiveVlanId,
-          name: effectiveName,
-          purpose: effectivePurpose,
+        operations.push({
+          op: 'create', resource: 'vlan', ref: `vlan${i}`,
+          data: {
+            site: siteIdMap.get(entry.siteTempId),
+            vlan_id: effectiveVlanId,
+            name: effectiveName,
+            purpose: effectivePurpose,
+          },
         })
-        vlanIdMap.set(mapKey, res.data.id)
-        setProgress({ phase: 'vlans', current: i + 1, total: newAddressEntries.length })
-      }
+        vlanIdMap.set(mapKey, `$vlan${i}`)
+      })
 
       // 4. Subnets — skip existing ones (realSubnetId set)
-      setProgress({ phase: 'subnets', current: 0, total: newAddressEntries.length })
-      for (let i = 0; i < newAddressEntries.length; i++) {
-        const entry = newAddressEntries[i]
-        const realVlanId = vlanIdMap.get(`${entry.siteTempId}:${entry.vlanTempId}`)!
-        await subnetsApi.create({
-          vlan: realVlanId,
-          network: entry.subnet,
-          gateway: entry.gateway,
+      for (const entry of newAddressEntries) {
+        operations.push({
+          op: 'create', resource: 'subnet',
+          data: {
+            vlan: vlanIdMap.get(`${entry.siteTempId}:${entry.vlanTempId}`),
+            network: entry.subnet,
+            gateway: entry.gateway,
+          },
         })
-        setProgress({ phase: 'subnets', current: i + 1, total: newAddressEntries.length })
       }
 
       // 5. Tunnels
-      if (state.tunnelPlan.length > 0) {
-        setProgress({ phase: 'tunnels', current: 0, total: state.tunnelPlan.length })
-        for (let i = 0; i < state.tunnelPlan.length; i++) {
-          const t = state.tunnelPlan[i]
-          await tunnelsApi.create({
-            project: projectId,
+      for (const t of state.tunnelPlan) {
+        operations.push({
+          op: 'create', resource: 'tunnel',
+          data: {
+            project: projectRef,
             name: t.name,
             tunnel_type: state.tunnelType,
             tunnel_subnet: t.tunnelSubnet,
@@ -178,11 +170,16 @@ export function WizardStepReview({ state, onBack }: Props) {
             site_b: siteIdMap.get(t.siteBTempId),
             ip_a: t.ipA,
             ip_b: t.ipB,
-          })
-          setProgress({ phase: 'tunnels', current: i + 1, total: state.tunnelPlan.length })
-        }
+          },
+        })
       }
 
+      setProgress({ phase: 'creating', current: 0, total: totalEntities })
+      const res = await batchApi.apply(operations)
+      const projectId = state.projectMode === 'new'
+        ? res.data.results.find((r) => r.ref === 'project')!.id
+        : state.projectId!
+
       setProgress({ phase: 'done', current: totalEntities, total: totalEntities })
       queryClient.invalidateQueries({ queryKey: ['projects'] })
       toast.success('Network design created successfully!')
@@ -343,7 +340,7 @@ export function WizardStepReview({ state, onBack }: Props) {
                 ? (totalEntities > 0 ? 'All entities created!' : 'Done — nothing new to create.')
                 : progress.phase === 'error'
                   ? `Error: ${progress.error}`
-                  : `Creating ${progress.phase}... ${progress.current}/${progress.total}`}
+                  : `Creating ${progress.total} entit${progress.total === 1 ? 'y' : 'ies'}...`}
             </span>
           </div>
           {isCreating && (
@@ -1,5 +1,7 @@
 import { type ClassValue, clsx } from 'clsx'
 import { twMerge } from 'tailwind-merge'
+import { toast } from 'sonner'
+import type { DeletionJob } from '@/types'
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
@@ -21,6 +23,11 @@ export function extractApiError(err: unknown, fallback = 'Operation failed'): st
   return messages.length > 0 ? messages.join('. ') : fallback
 }
 
+/** Tell the user a project/site deletion was queued as a background job and is still running. */
+export function notifyDeletionQueued(job: DeletionJob) {
+  toast.info(`Deleting ${job.target_name} in the background…`)
+}
+
 export async function copyToClipboard(text: string): Promise<void> {
   try {
     await navigator.clipboard.writeText(text)
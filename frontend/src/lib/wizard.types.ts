@@ -72,6 +72,7 @@ export interface VLSMAllocation {
   hosts_requested: number
   hosts_available: number
   subnet: string        // CIDR e.g. "10.0.0.0/25"
+  subnet_v6?: string | null  // set when planned dual-stack (cidr_v6)
   error?: string        // set if allocation failed
 }
 
@@ -79,6 +80,8 @@ export interface VLSMResult {
   parent: string
   allocations: VLSMAllocation[]
   remaining: string[]
+  parent_v6?: string
+  remaining_v6?: string[]
 }
 
 export interface WizardState {
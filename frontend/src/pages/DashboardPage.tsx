@@ -2,6 +2,7 @@ import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
 import { projectsApi } from '@/api/endpoints'
+import { notifyDeletionQueued } from '@/lib/utils'
 import { Dialog } from '@/components/ui/Dialog'
 import { ProjectForm } from '@/components/data/forms/ProjectForm'
 import { toast } from 'sonner'
@@ -20,7 +21,7 @@ export function DashboardPage() {
   const [editProject, setEditProject] = useState<Project | null>(null)
 
   const deleteMutation = useMutation({
-    mutationFn: (id: number) => projectsApi.delete(id),
+    mutationFn: (id: number) => projectsApi.delete(id, notifyDeletionQueued),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] })
       toast.success('Project deleted')
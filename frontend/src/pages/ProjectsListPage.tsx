@@ -2,6 +2,7 @@ import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useNavigate } from 'react-router-dom'
 import { projectsApi } from '@/api/endpoints'
+import { notifyDeletionQueued } from '@/lib/utils'
 
 import { toast } from 'sonner'
 import { Dialog } from '@/components/ui/Dialog'
@@ -35,7 +36,7 @@ export function ProjectsListPage() {
   })
 
   const deleteMutation = useMutation({
-    mutationFn: (id: number) => projectsApi.delete(id),
+    mutationFn: (id: number) => projectsApi.delete(id, notifyDeletionQueued),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] })
       toast.success('Project deleted')
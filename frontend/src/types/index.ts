@@ -114,6 +114,16 @@ export interface DHCPPool {
 
 export type TunnelType = 'gre' | 'ipsec' | 'vxlan' | 'wireguard'
 
+export interface TunnelGenerateRequest {
+  project: number
+  sites: number[]
+  topology: 'full_mesh' | 'hub_and_spoke' | 'ring'
+  hub?: number
+  tunnel_type: TunnelType
+  transit: string
+  prefix?: 30 | 31
+}
+
 export interface Tunnel {
   id: number
   project: number
@@ -219,6 +229,44 @@ export interface SearchResult {
   subnet_id?: number
 }
 
+export interface AddressMatch {
+  project_id: number
+  project: string
+  site_id: number
+  site: string
+  vlan_id: number | null
+  vlan: number | null
+  vlan_name: string | null
+  subnet_id: number
+  network: string
+  host: { id: number; hostname: string; device_type: string; subnet_id: number } | null
+}
+
+export interface AddressLookupResult {
+  ip: string
+  matches?: AddressMatch[]
+  error?: string
+}
+
+export interface ConflictPrefix {
+  kind: 'subnet' | 'tunnel'
+  id: number
+  project_id: number
+  network: string
+}
+
+export interface ConflictReport {
+  overlaps: { a: ConflictPrefix; b: ConflictPrefix }[]
+  duplicates: {
+    ip: string
+    owners: { kind: 'host' | 'tunnel_a' | 'tunnel_b'; id: number; project_id: number; name: string }[]
+  }[]
+  counts: { overlaps: number; duplicates: number }
+  truncated: boolean
+}
+
+export type AllocationStrategy = 'sequential' | 'eui64' | 'random'
+
 // Paginated response
 export interface PaginatedResponse<T> {
   count: number
@@ -239,3 +287,61 @@ export interface AuditLog {
   project_id: number | null
   timestamp: string
 }
+
+// Batch
+export type BatchResource = 'project' | 'site' | 'vlan' | 'subnet' | 'dhcp_pool' | 'host' | 'tunnel'
+
+export interface BatchOperation {
+  op: 'create' | 'update' | 'delete'
+  resource: BatchResource
+  id?: number | string
+  ref?: string
+  data?: Record<string, unknown>
+}
+
+export interface BatchResult {
+  op: BatchOperation['op']
+  resource: BatchResource
+  id: number
+  ref?: string | null
+}
+
+// Templates
+export interface ProjectTemplate {
+  id: number
+  name: string
+  description: string
+  structure: Record<string, unknown>
+  created_by: number | null
+  created_by_username: string | null
+  created_at: string
+  updated_at: string
+}
+
+export interface NewTemplateSite {
+  name: string
+  address?: string
+  supernet?: string | null
+}
+
+export interface TemplateApplyResult {
+  created: Record<'sites' | 'vlans' | 'subnets' | 'dhcp_pools' | 'hosts', number>
+  sites: { id: number; name: string; supernet: string | null; subnets: string[] }[]
+}
+
+// Deletion jobs
+export interface DeletionJob {
+  id: number
+  kind: 'project' | 'site'
+  target_id: number
+  target_name: string
+  project_id: number
+  status: 'pending' | 'running' | 'done' | 'failed'
+  progress: number
+  counts: Record<string, number>
+  error: string
+  failed_step: string
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}